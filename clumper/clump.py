@@ -1,12 +1,16 @@
 import csv
+import hashlib
+import heapq
 import itertools as it
 import json
 import pathlib
 import random
+import re
 import urllib.request
 from copy import deepcopy
-from functools import reduce
-from random import choices
+from functools import partial, reduce
+from operator import itemgetter
+from math import log
 from statistics import mean, median, stdev, variance
 from typing import Optional, Tuple, List
 
@@ -17,6 +21,25 @@ from clumper.decorators import (
     return_value_if_empty,
 )
 from clumper.error import raise_yaml_dep_error
+from clumper.sequence import _MISSING, _as_keys, _check_strategy, _fill_gaps
+from clumper.stream import (
+    _check_frac,
+    _check_k,
+    _check_sorted,
+    _hash_fraction,
+    _select_k,
+    read_jsonl as _stream_jsonl,
+    write_jsonl as _write_jsonl_stream,
+    reservoir_sample,
+)
+from clumper.parallel import (
+    _n_jobs,
+    chunk_items,
+    map_chunks,
+    run_tasks,
+    should_parallelize,
+    split_chunks,
+)
 
 
 def _flatten(items):
@@ -29,6 +52,489 @@ def _flatten(items):
             yield x
 
 
+def _sample_indices(rng, n_items, k, weights=None):
+    """
+    Draws `k` distinct indices out of `n_items`, optionally weighted. Weighted
+    sampling uses the keys from Efraimidis and Spirakis; every index gets the key
+    `log(u) / weight` and the `k` largest keys form the sample. Keeping these in a
+    heap makes this O(n log k) and the indices come out in the order that drawing
+    them one at a time would have picked them.
+    """
+    if weights is None:
+        return rng.sample(range(n_items), k)
+    keys = ((log(1.0 - rng.random()) / w, i) for i, w in enumerate(weights) if w > 0)
+    sampled = heapq.nlargest(k, keys)
+    if len(sampled) < k:
+        raise ValueError(
+            f"Cannot sample {k} items without replacement, only {len(sampled)} have a positive weight."
+        )
+    return [i for _, i in sampled]
+
+
+def _alias_table(weights):
+    """
+    Builds the tables for Vose's alias method. Each bucket `i` holds a probability
+    of keeping `i` and an alias to use otherwise, such that every draw takes O(1).
+    """
+    total = sum(weights)
+    if total <= 0:
+        raise ValueError("The total of the weights must be positive.")
+    n = len(weights)
+    prob = [w * n / total for w in weights]
+    alias = list(range(n))
+    small = [i for i, p in enumerate(prob) if p < 1.0]
+    large = [i for i, p in enumerate(prob) if p >= 1.0]
+    while small and large:
+        s, g = small.pop(), large.pop()
+        alias[s] = g
+        prob[g] -= 1.0 - prob[s]
+        (small if prob[g] < 1.0 else large).append(g)
+    # Whatever is left over is only there due to rounding errors.
+    for i in small + large:
+        prob[i] = 1.0
+    return prob, alias
+
+
+def _sample_indices_with_replacement(rng, n_items, k, weights=None):
+    """Draws `k` indices out of `n_items` with replacement, optionally weighted via the alias method."""
+    if n_items == 0 and k > 0:
+        raise ValueError("Cannot sample from an empty collection.")
+    if weights is None:
+        return [int(rng.random() * n_items) for _ in range(k)]
+    prob, alias = _alias_table(weights)
+    indices = []
+    for _ in range(k):
+        i = int(rng.random() * n_items)
+        indices.append(i if rng.random() < prob[i] else alias[i])
+    return indices
+
+
+def _sample_rows(rng, rows, n, replace, weights):
+    """Samples `n` rows from a list of rows, used by `sample` and `sample_frac`."""
+    prob_sample = None
+    if weights:
+        if not isinstance(weights, str):
+            raise TypeError("weights must be specified as string")
+
+        prob_sample = []
+        for row in rows:
+            if weights not in row:
+                raise KeyError(
+                    f"The weight key {weights} couldn't be found in the collection"
+                )
+            row_prob = row[weights]
+            if row_prob is None:
+                row_prob = 0
+            if row_prob < 0:
+                raise ValueError(
+                    "When weights is assigned, each row must have positive weight"
+                )
+            prob_sample.append(row_prob)
+
+    if replace:
+        indices = _sample_indices_with_replacement(
+            rng, len(rows), n, weights=prob_sample
+        )
+    else:
+        if n > len(rows):
+            raise ValueError("n cannot be larger than the collection")
+        indices = _sample_indices(rng, len(rows), n, weights=prob_sample)
+    return [rows[i] for i in indices]
+
+
+def _allocate(sizes, frac):
+    """
+    Splits `int(frac * sum(sizes))` over groups in proportion to their sizes. Every
+    group gets the rounded down share and the items that are left over go to
+    the groups with the largest remainders.
+    """
+    shares = [frac * size for size in sizes]
+    counts = [int(share) for share in shares]
+    left_over = max(int(frac * sum(sizes)) - sum(counts), 0)
+    by_remainder = sorted(
+        range(len(sizes)), key=lambda i: shares[i] - counts[i], reverse=True
+    )
+    for i in by_remainder[:left_over]:
+        counts[i] += 1
+    return counts
+
+
+_summary_funcs = {
+    "mean": mean,
+    "count": lambda d: len(d),
+    "unique": lambda d: list(set(d)),
+    "n_unique": lambda d: len(set(d)),
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "median": median,
+    "var": variance,
+    "std": stdev,
+    "values": lambda d: d,
+    "first": lambda d: d[0],
+    "last": lambda d: d[-1],
+}
+
+
+def _summary_func(func):
+    """Fetches the summary function that belongs to a name, functions are passed along as is."""
+    if isinstance(func, str):
+        if func not in _summary_funcs.keys():
+            raise ValueError(
+                f"Passed `func` must be in {_summary_funcs.keys()}, got {func}."
+            )
+        return _summary_funcs[func]
+    return func
+
+
+def _bootstrap_replicates(task):
+    """
+    Calculates the summaries for a batch of bootstrap replicates. Every replicate
+    has its own seed, such that the results do not depend on how the replicates
+    are spread over workers. Only the resampled indices are drawn, the summaries
+    are calculated on the resampled values without creating collections.
+    """
+    columns, specs, seeds = task
+    n_rows = len(next(iter(columns.values()), []))
+    indices = range(n_rows)
+    complete = {
+        col: all(v is not _MISSING for v in values) for col, values in columns.items()
+    }
+    replicates = []
+    for seed in seeds:
+        sample = random.Random(seed).choices(indices, k=n_rows)
+        stats = {}
+        for name, (col, func) in specs.items():
+            values = [columns[col][i] for i in sample]
+            if not complete[col]:
+                values = [v for v in values if v is not _MISSING]
+            stats[name] = func(values)
+        replicates.append(stats)
+    return replicates
+
+
+def _percentile(ordered, q):
+    """Linearly interpolated percentile of a sorted list, `q` is between 0 and 1."""
+    pos = q * (len(ordered) - 1)
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def _sort_by(items, keys, ascending, na_position):
+    """
+    Sorts dictionaries on one or more keys, used by `sort`. If all keys are sorted
+    in the same direction and no values are missing a single sort on a tuple of
+    values does the job. Otherwise the items are sorted once per key, starting
+    with the last one, which works because every sort is stable.
+    """
+    if isinstance(ascending, bool):
+        ascending = [ascending] * len(keys)
+    if len(ascending) != len(keys):
+        raise ValueError(
+            f"`ascending` must have one value per key in `by`, got {ascending}"
+        )
+    complete = all(d.get(k) is not None for d in items for k in keys)
+    if complete and len(set(ascending)) <= 1:
+        return sorted(items, key=itemgetter(*keys), reverse=not ascending[0])
+    items = list(items)
+    for k, asc in reversed(list(zip(keys, ascending))):
+        present = [d for d in items if d.get(k) is not None]
+        missing = [d for d in items if d.get(k) is None]
+        present.sort(key=itemgetter(k), reverse=not asc)
+        items = missing + present if na_position == "first" else present + missing
+    return items
+
+
+def _bisect(items, key, value, ascending=True, right=False):
+    """
+    Binary search in dictionaries that are sorted on `key`. Returns the first
+    position where `value` could be inserted, after equal values if `right`.
+    """
+    lo, hi = 0, len(items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        v = items[mid][key]
+        if ascending:
+            before = v <= value if right else v < value
+        else:
+            before = v >= value if right else v > value
+        if before:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _sorted_range(items, key, ascending, lower, upper, inclusive):
+    """Finds the slice of sorted items with values between `lower` and `upper` via binary search."""
+    low_closed = inclusive in ("both", "left")
+    up_closed = inclusive in ("both", "right")
+    if ascending:
+        start = 0 if lower is None else _bisect(items, key, lower, True, not low_closed)
+        stop = (
+            len(items) if upper is None else _bisect(items, key, upper, True, up_closed)
+        )
+    else:
+        start = 0 if upper is None else _bisect(items, key, upper, False, not up_closed)
+        stop = (
+            len(items)
+            if lower is None
+            else _bisect(items, key, lower, False, low_closed)
+        )
+    return start, max(start, stop)
+
+
+def _merge_join_matches(left, right, lkey, rkey, ascending):
+    """
+    Finds the matching right items for every left item when both are sorted on
+    the join key, by walking over both collections at the same time.
+    """
+    matches, j = [], 0
+    for d in left:
+        v = d[lkey]
+        while j < len(right) and (
+            right[j][rkey] < v if ascending else right[j][rkey] > v
+        ):
+            j += 1
+        k = j
+        while k < len(right) and right[k][rkey] == v:
+            k += 1
+        matches.append(right[j:k])
+    return matches
+
+
+def _asof_matches(left, right, direction, tolerance):
+    """
+    Finds the position of the nearest value in `right` for every value in `left`.
+    Both lists need to be sorted in ascending order. The `backward` direction looks
+    for the last value that is not larger, `forward` for the first value that is not
+    smaller and `nearest` for the closest of the two, preferring `backward` on a tie.
+    Values without a match, or with a match further away than `tolerance`, get `None`.
+    """
+    matches, j = [], 0
+    for v in left:
+        while j < len(right) and right[j] < v:
+            j += 1
+        # Right values equal to `v` are valid in both directions.
+        k = j
+        while k < len(right) and right[k] == v:
+            k += 1
+        before = k - 1 if k > 0 else None
+        after = j if j < len(right) else None
+        if direction == "backward":
+            match = before
+        elif direction == "forward":
+            match = after
+        elif before is None or (
+            after is not None and right[after] - v < v - right[before]
+        ):
+            match = after
+        else:
+            match = before
+        if match is not None and tolerance is not None:
+            if abs(right[match] - v) > tolerance:
+                match = None
+        matches.append(match)
+    return matches
+
+
+def _build_index(items, keys):
+    """
+    Maps the tuple of values of `keys` to the list of items that have them, in order.
+    Items that miss one of the keys are left out.
+    """
+    index = {}
+    for d in items:
+        try:
+            values = tuple(d[k] for k in keys)
+        except KeyError:
+            continue
+        index.setdefault(values, []).append(d)
+    return index
+
+
+def _index_matches(index, items, keys):
+    """Looks up the matching items in an index for every item, using the values of `keys`."""
+    matches = []
+    for d in items:
+        try:
+            values = tuple(d[k] for k in keys)
+        except KeyError:
+            matches.append([])
+            continue
+        matches.append(index.get(values, []))
+    return matches
+
+
+def _tokenize(text):
+    """Splits text into lowercase word tokens."""
+    return re.findall(r"\w+", text.lower())
+
+
+def _ngrams(text, n):
+    """Returns the set of all substrings of length `n` of a text."""
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+def _build_text_index(values, n):
+    """
+    Builds an inverted index for a list of texts. It maps every token, and every
+    n-gram, to the sorted positions of the texts that contain it. Values that are
+    not strings are left out.
+    """
+    tokens, ngrams = {}, {}
+    for i, text in enumerate(values):
+        if not isinstance(text, str):
+            continue
+        for token in set(_tokenize(text)):
+            tokens.setdefault(token, []).append(i)
+        for gram in _ngrams(text, n):
+            ngrams.setdefault(gram, []).append(i)
+    return {"n": n, "tokens": tokens, "ngrams": ngrams}
+
+
+def _intersect(postings):
+    """Intersects sorted lists of positions, starting with the shortest one."""
+    postings = sorted(postings, key=len)
+    result = set(postings[0]) if postings else set()
+    for posting in postings[1:]:
+        result.intersection_update(posting)
+    return sorted(result)
+
+
+def _fingerprint(values):
+    """A hash of the indexed texts, used to check that a stored index belongs to the data."""
+    text = json.dumps(values, default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _concat_chunks(chunks):
+    """Combines the results of `map_chunks` into a single list."""
+    return [item for chunk in chunks for item in chunk]
+
+
+def _map_items(func, items):
+    """Applies a function to each item, used by `map` and `flatmap`."""
+    return [func(item) for item in items]
+
+
+def _keep_items(funcs, items):
+    """Only keeps the items for which all functions return true, used by `keep`."""
+    for func in funcs:
+        items = [d for d in items if func(d)]
+    return items
+
+
+def _mutate_items(kwargs, items):
+    """Adds the new key-value pairs to a copy of each item, used by `mutate`."""
+    data = []
+    for d in items:
+        new = {k: v for k, v in d.items()}
+        for key, func in kwargs.items():
+            new[key] = func(new)
+        data.append(new)
+    return data
+
+
+def _needs_all_rows(func):
+    """Checks if a function passed to `mutate` needs to see all rows at once, like `over`."""
+    return getattr(func, "needs_all_rows", False)
+
+
+def _mutate_columns(kwargs, items):
+    """
+    Evaluates `mutate` one key at a time instead of one row at a time, which gives
+    the same result but allows functions to see all rows at once. Windows that
+    share the same partition and order also share the work of finding their layout.
+    """
+    data = [{k: v for k, v in d.items()} for d in items]
+    layouts = {}
+    for key, func in kwargs.items():
+        if hasattr(func, "layout"):
+            if func.spec not in layouts:
+                layouts[func.spec] = (func, func.layout(data))
+            values = func.evaluate(data, layout=layouts[func.spec][1])
+        elif _needs_all_rows(func):
+            values = func.evaluate(data)
+        else:
+            values = [func(d) for d in data]
+        for d, value in zip(data, values):
+            d[key] = value
+        # Writing to a key that a window depends on changes its layout.
+        layouts = {s: v for s, v in layouts.items() if not v[0].reads(key)}
+    return data
+
+
+def _is_stateful(func):
+    """Checks if a function passed to `mutate` keeps state between rows."""
+    return hasattr(func, "state") or hasattr(func, "get_state")
+
+
+def _can_scan(kwargs):
+    """
+    Checks if the stateful functions in a `mutate` call can be evaluated on
+    chunks. This requires the prefix-scan protocol from `clumper.sequence` and
+    that the functions only read keys that existed before the `mutate` call,
+    both for the values (`key`) and for the timestamps (`time_key`).
+    """
+    for i, (name, func) in enumerate(kwargs.items()):
+        if not _is_stateful(func):
+            continue
+        if not all(
+            hasattr(func, m) for m in ["get_state", "set_state", "combine", "reset"]
+        ):
+            return False
+        for key in (getattr(func, "key", None), getattr(func, "time_key", None)):
+            if key is not None and (
+                not isinstance(key, str) or key in list(kwargs)[:i]
+            ):
+                return False
+    return True
+
+
+def _chunk_states(funcs, items):
+    """Runs fresh copies of stateful functions over a chunk and returns their checkpoints."""
+    states = {}
+    for name, func in funcs.items():
+        func = deepcopy(func)
+        func.reset()
+        for d in items:
+            func(d)
+        states[name] = func.get_state()
+    return states
+
+
+def _resume_mutate(kwargs, task):
+    """Runs `mutate` on a chunk after resuming the stateful functions from their checkpoints."""
+    states, items = task
+    kwargs = deepcopy(kwargs)
+    for name, state in states.items():
+        kwargs[name].set_state(state)
+    return _mutate_items(kwargs, items), {k: kwargs[k].get_state() for k in states}
+
+
+def _scan_mutate(kwargs, items):
+    """
+    Evaluates `mutate` in parallel chunks, including stateful functions. First the
+    checkpoint of each chunk is calculated, these are combined into the state at
+    the start of each chunk after which all chunks are evaluated independently.
+    """
+    stateful = {k: f for k, f in kwargs.items() if _is_stateful(f)}
+    chunks = chunk_items(items)
+    chunk_states = run_tasks(partial(_chunk_states, stateful), chunks[:-1])
+    prefixes = [{k: f.get_state() for k, f in stateful.items()}]
+    for states in chunk_states:
+        prefixes.append(
+            {k: f.combine(prefixes[-1][k], states[k]) for k, f in stateful.items()}
+        )
+    results = run_tasks(partial(_resume_mutate, kwargs), list(zip(prefixes, chunks)))
+    # The functions that were passed in should end up in the same state as after a serial run.
+    for name, state in results[-1][1].items():
+        stateful[name].set_state(state)
+    return _concat_chunks([rows for rows, _ in results])
+
+
 class Clumper:
     """
     This object adds methods to a list of dictionaries that make
@@ -51,12 +557,20 @@ class Clumper:
     ```
     """
 
-    def __init__(self, blob, groups=tuple(), listify=True):
+    def __init__(self, blob, groups=tuple(), listify=True, sorted_by=None):
         self.blob = blob.copy()
         if listify:
             if isinstance(blob, dict):
                 self.blob = [blob.copy()]
         self.groups = groups
+        # Either `None` or a `(key, ascending)` pair when the items are known to be
+        # sorted on that key. Verbs that keep the order pass it on via `_create_new`.
+        self.sorted_by = sorted_by
+        # Hash indexes that were built via `index_on`, by tuple of keys. New
+        # collections start without indexes, so they can never be out of date.
+        self._indexes = {}
+        # Inverted indexes on text keys that were built via `index_text`, by key.
+        self._text_indexes = {}
 
     def __len__(self):
         return 1 if isinstance(self.blob, dict) else len(self.blob)
@@ -260,7 +774,7 @@ class Clumper:
 
     @classmethod
     @multifile()
-    def read_jsonl(cls, path, n=None, listify=True, add_path=False):
+    def read_jsonl(cls, path, n=None, listify=True, add_path=False, sorted_by=None):
         """
         Reads in a jsonl file. Can also read files from url.
 
@@ -273,6 +787,9 @@ class Clumper:
                      before passing it along to the Clumper.
             add_path: Adds the name of the filepath to each item in the Clumper. Is useful when using wildcards to
                       read in multiple files at once.
+            sorted_by: A key that each file is sorted on, from small to large. Files that match a wildcard are
+                       then merged into a single sorted collection, instead of being concatenated, and the
+                       collection is marked as sorted. An error is raised when a file is not sorted.
 
         Usage:
 
@@ -315,9 +832,45 @@ class Clumper:
         if add_path:
             for d in data_array:
                 d["read_path"] = path
+        if sorted_by is not None:
+            # Reading the file through the check raises an error if it isn't sorted.
+            get = itemgetter(sorted_by)
+            data_array = list(_check_sorted(data_array, get, True, path))
+            return Clumper(data_array, listify=listify, sorted_by=(sorted_by, True))
         # Return it
         return Clumper(data_array, listify=listify)
 
+    @classmethod
+    def read_jsonl_sample(
+        cls, path, n, weights=None, random_state=None, add_path=False
+    ):
+        """
+        Reads a random sample of `n` items from one or more jsonl files. The files are
+        read one line at a time and only the sample is kept in memory, so this also works
+        for files that are much larger than memory. The sample is uniform across all files
+        that match a wildcard.
+
+        Arguments:
+            path: filename, url, `pathlib.Path` or list of `pathlib.Path`. Filenames can include a wildcard `*`.
+            n: the number of items to sample
+            weights: key with the weight of each item, items with weight `0` or `None` are never sampled
+            random_state: seed for reproducible results
+            add_path: Adds the name of the filepath to each item in the Clumper.
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        clump = Clumper.read_jsonl_sample("tests/data/cards*.jsonl", n=3, random_state=42)
+        assert len(clump) == 3
+        ```
+        """
+        stream = _stream_jsonl(path, add_path=add_path)
+        return Clumper(
+            reservoir_sample(stream, n, weights=weights, random_state=random_state)
+        )
+
     @classmethod
     @multifile()
     def read_yaml(cls, path, n=None, listify=True, add_path=False, encoding="utf-8"):
@@ -408,12 +961,16 @@ class Clumper:
         Usage:
 
         ```python
+        import tempfile
+        from pathlib import Path
         from clumper import Clumper
         clump_orig = Clumper.read_yaml("tests/data/demo-flat-1.yaml")
-        clump_orig.write_json("tests/data/demo-flat-copy.json")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "demo-flat-copy.json")
+            clump_orig.write_json(path)
 
-        clump_copy = Clumper.read_json("tests/data/demo-flat-copy.json")
-        assert clump_copy.collect() == clump_orig.collect()
+            clump_copy = Clumper.read_json(path)
+            assert clump_copy.collect() == clump_orig.collect()
         ```
         """
         try:
@@ -437,12 +994,16 @@ class Clumper:
         Usage:
 
         ```python
+        import tempfile
+        from pathlib import Path
         from clumper import Clumper
         clump_orig = Clumper.read_json("tests/data/pokemon.json")
-        clump_orig.write_json("tests/data/pokemon_copy.json")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "pokemon_copy.json")
+            clump_orig.write_json(path)
 
-        clump_copy = Clumper.read_json("tests/data/pokemon_copy.json")
-        assert clump_copy.collect() == clump_orig.collect()
+            clump_copy = Clumper.read_json(path)
+            assert clump_copy.collect() == clump_orig.collect()
         ```
         """
         # Create a new file and open it for writing
@@ -459,11 +1020,7 @@ class Clumper:
             indent: If indent is a non-negative integer (default: None), then JSON array elements members will be pretty-printed with that indent level.
         """
         # Create a new file and open it for writing
-        with open(path, "x") as f:
-            for current_line_nr, json_dict in enumerate(self.collect()):
-                f.write(
-                    json.dumps(json_dict, sort_keys=sort_keys, indent=indent) + "\n"
-                )
+        _write_jsonl_stream(self, path, mode="x", sort_keys=sort_keys, indent=indent)
 
     def write_csv(self, path, mode="w"):
         """
@@ -497,12 +1054,22 @@ class Clumper:
             for row in self:
                 writer.writerow(row)
 
-    def _create_new(self, blob):
+    def _create_new(self, blob, sorted_by=None):
         """
         Creates a new collection of data while preserving settings of the
-        current collection (most notably, `groups`).
+        current collection (most notably, `groups`). The new collection is
+        only marked as sorted when `sorted_by` is passed.
+        """
+        return Clumper(blob, groups=self.groups, sorted_by=sorted_by)
+
+    def _sorted_after(self, changed=()):
         """
-        return Clumper(blob, groups=self.groups)
+        Returns the sortedness that is left after an order preserving verb,
+        which is lost when the verb changed the sorted key.
+        """
+        if self.sorted_by is None or self.sorted_by[0] in changed:
+            return None
+        return self.sorted_by
 
     def group_by(self, *cols):
         """
@@ -639,7 +1206,7 @@ class Clumper:
         for d in self:
             if d not in uniques:
                 uniques.append(d)
-        return self._create_new(uniques)
+        return self._create_new(uniques, sorted_by=self.sorted_by)
 
     @staticmethod
     def _merge_dicts(d1, d2, mapping, suffix1, suffix2):
@@ -654,6 +1221,53 @@ class Clumper:
         d2_new = {(k + suffix2 if k in keys_to_suffix else k): v for k, v in d2.items()}
         return {**d1_new, **d2_new}
 
+    def _join_matches(self, other, mapping):
+        """
+        Returns a list with the matching items of `other` for every item in this
+        collection. If `other` has an index on the right keys it is used for the
+        lookups. If both collections are sorted on a single join key, in the same
+        direction, a merge join is used. Otherwise a hash index is built on `other`
+        for this join. Only if the values can't be hashed every pair of items is compared.
+        """
+        right_keys = tuple(mapping.values())
+        if right_keys in other._indexes:
+            try:
+                return _index_matches(
+                    other._indexes[right_keys], self.blob, tuple(mapping.keys())
+                )
+            except TypeError:
+                # Unhashable values can't be looked up, only compared.
+                pass
+        if len(mapping) == 1 and self.sorted_by and other.sorted_by:
+            ((lkey, rkey),) = mapping.items()
+            if (lkey, rkey) == (self.sorted_by[0], other.sorted_by[0]):
+                ascending = self.sorted_by[1]
+                if ascending == other.sorted_by[1]:
+                    try:
+                        return _merge_join_matches(
+                            self.blob, other.blob, lkey, rkey, ascending
+                        )
+                    except TypeError:
+                        # Values of different types can't be compared, only matched.
+                        pass
+        try:
+            index = _build_index(other.blob, right_keys)
+            return _index_matches(index, self.blob, tuple(mapping.keys()))
+        except TypeError:
+            # Unhashable values, like lists, can only be compared.
+            pass
+        matches = []
+        for d_i in self:
+            values_i = [d_i[k] for k in mapping.keys() if k in d_i.keys()]
+            matches_i = []
+            for d_j in other:
+                values_j = [d_j[k] for k in mapping.values() if k in d_j.keys()]
+                if len(mapping) == len(values_i) == len(values_j):
+                    if values_i == values_j:
+                        matches_i.append(d_j)
+            matches.append(matches_i)
+        return matches
+
     @dict_collection_only
     def left_join(self, other, mapping, lsuffix="", rsuffix="_joined"):
         """
@@ -699,19 +1313,10 @@ class Clumper:
         ```
         """
         result = []
-        # This is a naive implementation. Speedup seems possible.
-        for d_i in self:
-            values_i = [d_i[k] for k in mapping.keys() if k in d_i.keys()]
-            d_i_added = False
-            for d_j in other:
-                values_j = [d_j[k] for k in mapping.values() if k in d_j.keys()]
-                if len(mapping) == len(values_i) == len(values_j):
-                    if values_i == values_j:
-                        result.append(
-                            Clumper._merge_dicts(d_i, d_j, mapping, lsuffix, rsuffix)
-                        )
-                        d_i_added = True
-            if not d_i_added:
+        for d_i, matches in zip(self, self._join_matches(other, mapping)):
+            for d_j in matches:
+                result.append(Clumper._merge_dicts(d_i, d_j, mapping, lsuffix, rsuffix))
+            if not matches:
                 result.append(d_i)
         return self._create_new(result)
 
@@ -755,135 +1360,495 @@ class Clumper:
         ```
         """
         result = []
-        # This is a naive implementation. Speedup seems possible.
-        for d_i in self:
-            values_i = [d_i[k] for k in mapping.keys() if k in d_i.keys()]
-            for d_j in other:
-                values_j = [d_j[k] for k in mapping.values() if k in d_j.keys()]
-                if len(mapping) == len(values_i) == len(values_j):
-                    if values_i == values_j:
-                        result.append(
-                            Clumper._merge_dicts(d_i, d_j, mapping, lsuffix, rsuffix)
-                        )
+        for d_i, matches in zip(self, self._join_matches(other, mapping)):
+            for d_j in matches:
+                result.append(Clumper._merge_dicts(d_i, d_j, mapping, lsuffix, rsuffix))
         return self._create_new(result)
 
-    @property
-    def only_has_dictionaries(self):
-        """Boolean, confirms if each item in the clumper is a dictionary."""
-        return all([isinstance(d, dict) for d in self])
-
     @dict_collection_only
-    @grouped
-    def agg(self, **kwargs):
+    def asof_join(
+        self,
+        other,
+        on,
+        by=None,
+        direction="backward",
+        tolerance=None,
+        lsuffix="",
+        rsuffix="_joined",
+    ):
         """
-        Does an aggregation on a collection of dictionaries. If there are no groups active
-        then this method will create a single dictionary containing a summary. If there are
-        groups active then the dataset will first split up, then apply the summaries after
-        which everything is combined again into a single collection.
-
-        When defining a summary to apply you'll need to pass three things:
-
-        1. the name of the new key
-        2. the key you'd like to summarise (first item in the tuple)
-        3. the summary you'd like to calculate on that key (second item in the tuple)
-
-        It can also accept a string and it will try to fetch an appropriate function
-        for you. If you pass a string it must be either: `mean`, `count`, `unique`,
-        `n_unique`, `sum`, `min`, `max`, `median`, `values`, `var`, `std`, `first` or `last`.
-
-        ![](../img/split-apply-combine.png)
+        Performs an as-of join on two collections. Instead of matching on equal values
+        every item from the left set is joined with the item from the right set that has
+        the nearest value for the `on` key. This is typically used to attach the most
+        recent price or setting to an event.
 
-        Warning:
-            This method is aware of groups. There may be different results if a group is active.
+        Both collections are sorted once on the `on` key after which the matches are
+        found by walking over both at the same time. Each item from the left set appears
+        exactly once, in the original order, and items without a match are kept as-is,
+        just like in a `left_join`. The `on` key of the right set is only kept when it
+        has a different name than the one of the left set.
 
         Arguments:
-            kwargs: keyword arguments that represent the aggregation that is about to happen, see usage below.
+            other: another collection to join with
+            on: the key to find the nearest value for, or a dictionary of **left-key**:**right-key** if the names differ
+            by: keys that need to match exactly, either a key, a list of keys or a dictionary of **left-keys**:**right-keys**
+            direction: either `backward` for the last value that is not larger, `forward` for the first value that is not smaller or `nearest`
+            tolerance: the maximum distance between the values, `None` means no maximum
+            lsuffix: a suffix to add to the left keys in case of an overlap
+            rsuffix: a suffix to add to the right keys in case of an overlap
 
         Usage:
 
         ```python
         from clumper import Clumper
 
-        list_dicts = [
-            {'a': 1, 'b': 2},
-            {'a': 2, 'b': 3},
-            {'a': 3}
-        ]
+        trades = Clumper([
+            {"ts": 3, "stock": "a", "n": 10},
+            {"ts": 5, "stock": "b", "n": 20},
+            {"ts": 1, "stock": "a", "n": 30},
+            {"ts": 8, "stock": "a", "n": 40},
+        ])
 
-        (Clumper(list_dicts)
-          .agg(mean_a=('a', 'mean'),
-               min_b=('b', 'min'),
-               max_b=('b', 'max'))
-          .collect())
+        prices = Clumper([
+            {"ts": 2, "stock": "a", "price": 100},
+            {"ts": 4, "stock": "b", "price": 200},
+            {"ts": 6, "stock": "a", "price": 110},
+        ])
 
-        another_list_dicts = [
-            {'a': 1, 'c': 'a'},
-            {'a': 2, 'c': 'b'},
-            {'a': 3, 'c': 'a'}
+        result = trades.asof_join(prices, on="ts", by="stock")
+        expected = [
+            {"ts": 3, "stock": "a", "n": 10, "price": 100},
+            {"ts": 5, "stock": "b", "n": 20, "price": 200},
+            {"ts": 1, "stock": "a", "n": 30},
+            {"ts": 8, "stock": "a", "n": 40, "price": 110},
         ]
+        assert result.collect() == expected
 
-        (Clumper(another_list_dicts)
-          .group_by('c')
-          .agg(mean_a=('a', 'mean'),
-               uniq_a=('a', 'unique'))
-          .collect())
+        result = trades.asof_join(prices, on="ts", by="stock", tolerance=1)
+        assert [d.get("price") for d in result] == [100, 200, None, None]
+
+        result = trades.asof_join(prices, on="ts", by="stock", direction="forward")
+        assert [d.get("price") for d in result] == [110, None, 100, None]
         ```
+        """
+        if direction not in ("backward", "forward", "nearest"):
+            raise ValueError(
+                f"`direction` must be in ('backward', 'forward', 'nearest'), got {direction}"
+            )
+        if tolerance is not None and tolerance < tolerance * 0:
+            raise ValueError(f"`tolerance` must not be negative, got {tolerance}.")
+        lkey, rkey = next(iter(on.items())) if isinstance(on, dict) else (on, on)
+        if by is None:
+            by = {}
+        elif isinstance(by, str):
+            by = {by: by}
+        elif not isinstance(by, dict):
+            by = {k: k for k in by}
+        left_by, right_by = tuple(by.keys()), tuple(by.values())
+
+        # Items with a missing or empty `on` value can't be matched.
+        right_groups = {}
+        for d in other:
+            if d.get(rkey) is not None and all(k in d for k in right_by):
+                right_groups.setdefault(tuple(d[k] for k in right_by), []).append(d)
+        left_groups = {}
+        for i, d in enumerate(self.blob):
+            if d.get(lkey) is not None and all(k in d for k in left_by):
+                left_groups.setdefault(tuple(d[k] for k in left_by), []).append(i)
+
+        matches = [None] * len(self)
+        for values, idx in left_groups.items():
+            right = right_groups.get(values)
+            if not right:
+                continue
+            # Sorting is stable, so ties keep the original order.
+            right = sorted(right, key=lambda d: d[rkey])
+            idx = sorted(idx, key=lambda i: self.blob[i][lkey])
+            found = _asof_matches(
+                [self.blob[i][lkey] for i in idx],
+                [d[rkey] for d in right],
+                direction,
+                tolerance,
+            )
+            for i, j in zip(idx, found):
+                if j is not None:
+                    matches[i] = right[j]
 
-        Advanced Usage:
+        result = []
+        for d_i, d_j in zip(self.blob, matches):
+            if d_j is None:
+                result.append(d_i)
+                continue
+            if rkey == lkey:
+                d_j = {k: v for k, v in d_j.items() if k != rkey}
+            result.append(Clumper._merge_dicts(d_i, d_j, by, lsuffix, rsuffix))
+        return self._create_new(result)
 
-        You can also supply this verb your own functions if you'd like.
+    def _has_match(self, other, mapping):
+        """
+        Returns a list of booleans that tells if an item of this collection has a
+        match in `other`, without merging items. A set of key values is built on
+        `other` for this, unless the values can't be hashed.
+        """
+        left_keys, right_keys = tuple(mapping.keys()), tuple(mapping.values())
+        if right_keys in other._indexes:
+            keys = other._indexes[right_keys]
+        else:
+            keys = set()
+            for d in other:
+                if all(k in d for k in right_keys):
+                    try:
+                        keys.add(tuple(d[k] for k in right_keys))
+                    except TypeError:
+                        return [len(m) > 0 for m in self._join_matches(other, mapping)]
+        try:
+            return [
+                all(k in d for k in left_keys) and tuple(map(d.get, left_keys)) in keys
+                for d in self.blob
+            ]
+        except TypeError:
+            return [len(m) > 0 for m in self._join_matches(other, mapping)]
+
+    @dict_collection_only
+    def semi_join(self, other, mapping):
+        """
+        Keeps the items that have a match in another collection. Unlike `inner_join`,
+        the items are not merged and every item appears at most once.
+
+        Arguments:
+            other: another collection to match with
+            mapping: a dictionary of **left-keys**:**right-keys** that explain how to match
+
+        Usage:
 
         ```python
         from clumper import Clumper
 
-        data = [
-            {"a": 7, "grp": "a"},
-            {"a": 2, "grp": "b"},
-            {"a": 7, "grp": "a"},
-            {"a": 9, "grp": "b"},
-            {"a": 5, "grp": "a"}
-        ]
-
-        tfm_clump = (Clumper(data)
-                        .group_by("grp")
-                        .transform(s=("a", sum),
-                                    u=("a", lambda x: set(x))))
+        orders = Clumper([
+            {"order": 1, "user": "a"},
+            {"order": 2, "user": "b"},
+            {"order": 3, "user": "a"},
+        ])
 
-        expected = [
-            {'a': 7, 'grp': 'a', 's': 19, 'u': {5, 7}},
-            {'a': 7, 'grp': 'a', 's': 19, 'u': {5, 7}},
-            {'a': 5, 'grp': 'a', 's': 19, 'u': {5, 7}},
-            {'a': 2, 'grp': 'b', 's': 11, 'u': {2, 9}},
-            {'a': 9, 'grp': 'b', 's': 11, 'u': {2, 9}}
-        ]
+        vips = Clumper([{"name": "a"}, {"name": "a"}, {"name": "c"}])
 
-        assert tfm_clump.equals(expected)
+        result = orders.semi_join(vips, mapping={"user": "name"})
+        assert result.collect() == [{"order": 1, "user": "a"}, {"order": 3, "user": "a"}]
         ```
         """
-        res = {
-            name: self.summarise_col(func_str, col)
-            for name, (col, func_str) in kwargs.items()
-        }
-        return Clumper([res], groups=self.groups)
+        has_match = self._has_match(other, mapping)
+        return self._create_new(
+            [d for d, m in zip(self.blob, has_match) if m], sorted_by=self.sorted_by
+        )
 
     @dict_collection_only
-    def _subsets(self):
-        """
-        Subsets the data into groups, specified by `.group_by()`.
-        Only subsets that have length > 0 are returned.
+    def anti_join(self, other, mapping):
         """
-        result = []
-        for gc in self._group_combos():
-            subset = self.copy()
-            for key, value in gc.items():
-                subset = subset.keep(lambda d: d[key] == value)
-            if len(subset) > 0:
-                result.append(subset)
-        return result
+        Keeps the items that don't have a match in another collection. Items that
+        miss one of the keys have no match, so they are kept.
 
-    def concat(self, *other):
-        """
-        Concatenate two or more `Clumper` objects together.
+        Arguments:
+            other: another collection to match with
+            mapping: a dictionary of **left-keys**:**right-keys** that explain how to match
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        orders = Clumper([
+            {"order": 1, "user": "a"},
+            {"order": 2, "user": "b"},
+            {"order": 3, "user": "a"},
+        ])
+
+        banned = Clumper([{"name": "a"}])
+
+        result = orders.anti_join(banned, mapping={"user": "name"})
+        assert result.collect() == [{"order": 2, "user": "b"}]
+        ```
+        """
+        has_match = self._has_match(other, mapping)
+        return self._create_new(
+            [d for d, m in zip(self.blob, has_match) if not m],
+            sorted_by=self.sorted_by,
+        )
+
+    @dict_collection_only
+    def outer_join(self, other, mapping, lsuffix="", rsuffix="_joined"):
+        """
+        Performs a full outer join on two collections.
+
+        This gives the same result as `left_join`, followed by the items from the right
+        set that could not be joined with any item of the left set.
+
+        Arguments:
+            other: another collection to join with
+            mapping: a dictionary of **left-keys**:**right-keys** that explain how to join
+            lsuffix: a suffix to add to the left keys in case of an overlap
+            rsuffix: a suffix to add to the right keys in case of an overlap
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        left = Clumper([
+            {"a": 1, "b": 4},
+            {"a": 2, "b": 6},
+            {"a": 3, "b": 8},
+        ])
+
+        right = Clumper([
+            {"c": 9, "b": 4},
+            {"c": 8, "b": 5},
+            {"c": 7, "b": 6},
+        ])
+
+        result = left.outer_join(right, mapping={"b": "b"})
+        expected = [
+            {"a": 1, "b": 4, "c": 9},
+            {"a": 2, "b": 6, "c": 7},
+            {"a": 3, "b": 8},
+            {"c": 8, "b": 5},
+        ]
+
+        assert result.equals(expected)
+        ```
+        """
+        result, joined = [], set()
+        for d_i, matches in zip(self, self._join_matches(other, mapping)):
+            for d_j in matches:
+                result.append(Clumper._merge_dicts(d_i, d_j, mapping, lsuffix, rsuffix))
+                joined.add(id(d_j))
+            if not matches:
+                result.append(d_i)
+        result.extend(d_j for d_j in other if id(d_j) not in joined)
+        return self._create_new(result)
+
+    @property
+    def only_has_dictionaries(self):
+        """Boolean, confirms if each item in the clumper is a dictionary."""
+        return all([isinstance(d, dict) for d in self])
+
+    @dict_collection_only
+    @grouped
+    def agg(self, **kwargs):
+        """
+        Does an aggregation on a collection of dictionaries. If there are no groups active
+        then this method will create a single dictionary containing a summary. If there are
+        groups active then the dataset will first split up, then apply the summaries after
+        which everything is combined again into a single collection.
+
+        When defining a summary to apply you'll need to pass three things:
+
+        1. the name of the new key
+        2. the key you'd like to summarise (first item in the tuple)
+        3. the summary you'd like to calculate on that key (second item in the tuple)
+
+        It can also accept a string and it will try to fetch an appropriate function
+        for you. If you pass a string it must be either: `mean`, `count`, `unique`,
+        `n_unique`, `sum`, `min`, `max`, `median`, `values`, `var`, `std`, `first` or `last`.
+
+        ![](../img/split-apply-combine.png)
+
+        Warning:
+            This method is aware of groups. There may be different results if a group is active.
+
+        Arguments:
+            kwargs: keyword arguments that represent the aggregation that is about to happen, see usage below.
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        list_dicts = [
+            {'a': 1, 'b': 2},
+            {'a': 2, 'b': 3},
+            {'a': 3}
+        ]
+
+        (Clumper(list_dicts)
+          .agg(mean_a=('a', 'mean'),
+               min_b=('b', 'min'),
+               max_b=('b', 'max'))
+          .collect())
+
+        another_list_dicts = [
+            {'a': 1, 'c': 'a'},
+            {'a': 2, 'c': 'b'},
+            {'a': 3, 'c': 'a'}
+        ]
+
+        (Clumper(another_list_dicts)
+          .group_by('c')
+          .agg(mean_a=('a', 'mean'),
+               uniq_a=('a', 'unique'))
+          .collect())
+        ```
+
+        Advanced Usage:
+
+        You can also supply this verb your own functions if you'd like.
+
+        ```python
+        from clumper import Clumper
+
+        data = [
+            {"a": 7, "grp": "a"},
+            {"a": 2, "grp": "b"},
+            {"a": 7, "grp": "a"},
+            {"a": 9, "grp": "b"},
+            {"a": 5, "grp": "a"}
+        ]
+
+        tfm_clump = (Clumper(data)
+                        .group_by("grp")
+                        .transform(s=("a", sum),
+                                    u=("a", lambda x: set(x))))
+
+        expected = [
+            {'a': 7, 'grp': 'a', 's': 19, 'u': {5, 7}},
+            {'a': 7, 'grp': 'a', 's': 19, 'u': {5, 7}},
+            {'a': 5, 'grp': 'a', 's': 19, 'u': {5, 7}},
+            {'a': 2, 'grp': 'b', 's': 11, 'u': {2, 9}},
+            {'a': 9, 'grp': 'b', 's': 11, 'u': {2, 9}}
+        ]
+
+        assert tfm_clump.equals(expected)
+        ```
+        """
+        res = {
+            name: self.summarise_col(func_str, col)
+            for name, (col, func_str) in kwargs.items()
+        }
+        return Clumper([res], groups=self.groups)
+
+    @dict_collection_only
+    @grouped
+    def bootstrap(self, n_replicates=1000, ci=0.95, random_state=None, **kwargs):
+        """
+        Estimates the uncertainty of summaries by bootstrapping. The summaries are
+        defined just like in `.agg()`, and every summary is calculated on
+        `n_replicates` resamples (with replacement) of the collection.
+
+        For every summary `name` the result contains:
+
+        - `name`: the summary of the original collection
+        - `name_lower` and `name_upper`: the percentile confidence interval
+        - `name_replicates`: the summary of every replicate
+
+        The resamples are drawn as lists of indices and the summaries are calculated
+        directly on the resampled values, no collection is created per replicate.
+        Every replicate gets its own seed, so with a `random_state` the results are the
+        same no matter if the replicates are spread over multiple workers, see `clumper.parallel`.
+
+        Warning:
+            This method is aware of groups. There may be different results if a group is active.
+
+        Arguments:
+            n_replicates: the number of resamples
+            ci: the size of the confidence interval
+            random_state: seed for reproducible results
+            kwargs: keyword arguments that represent the summaries, see `.agg()`. The
+                    summaries need to return numbers to calculate the confidence interval.
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        list_dicts = [{'a': i % 10, 'grp': i % 2} for i in range(100)]
+
+        result = (Clumper(list_dicts)
+                    .bootstrap(n_replicates=200, random_state=42, mean_a=('a', 'mean'))
+                    .collect())[0]
+
+        assert result['mean_a'] == 4.5
+        assert result['mean_a_lower'] < 4.5 < result['mean_a_upper']
+        assert len(result['mean_a_replicates']) == 200
+
+        grouped = (Clumper(list_dicts)
+                    .group_by('grp')
+                    .bootstrap(n_replicates=200, random_state=42, max_a=('a', 'max')))
+        assert [d['max_a'] for d in grouped] == [8, 9]
+        ```
+        """
+        if not isinstance(n_replicates, int) or n_replicates <= 0:
+            raise ValueError(
+                f"`n_replicates` must be a positive integer, got {n_replicates}"
+            )
+        if not 0 < ci < 1:
+            raise ValueError(f"`ci` must be between 0 and 1, got {ci}")
+        specs = {
+            name: (col, _summary_func(func)) for name, (col, func) in kwargs.items()
+        }
+        columns = {
+            col: [d.get(col, _MISSING) for d in self.blob] for col, _ in specs.values()
+        }
+        rng = random.Random(random_state)
+        seeds = [rng.getrandbits(64) for _ in range(n_replicates)]
+        if should_parallelize(len(self) * n_replicates):
+            batches = split_chunks(seeds, _n_jobs() * 4)
+        else:
+            batches = [seeds]
+        replicates = _concat_chunks(
+            run_tasks(_bootstrap_replicates, [(columns, specs, b) for b in batches])
+        )
+
+        res = {}
+        for name, (col, func) in specs.items():
+            values = [stats[name] for stats in replicates]
+            ordered = sorted(values)
+            res[name] = func([v for v in columns[col] if v is not _MISSING])
+            res[f"{name}_lower"] = _percentile(ordered, (1 - ci) / 2)
+            res[f"{name}_upper"] = _percentile(ordered, (1 + ci) / 2)
+            res[f"{name}_replicates"] = values
+        return Clumper([res], groups=self.groups)
+
+    @dict_collection_only
+    def _subsets(self):
+        """
+        Subsets the data into groups, specified by `.group_by()`.
+        Only subsets that have length > 0 are returned.
+        """
+        return [subset for _, subset in self._partition()]
+
+    @dict_collection_only
+    def _partition(self):
+        """
+        Splits the data into groups in a single pass. Returns a list of
+        (group-values, subset)-pairs in the same order as `._group_combos()`.
+        Only subsets that have length > 0 are returned.
+        """
+        buckets = {}
+        for d in self.blob:
+            buckets.setdefault(tuple(d[g] for g in self.groups), []).append(d)
+        return [
+            (dict(zip(self.groups, values)), self._create_new(buckets[values]))
+            for values in self._group_order(buckets)
+        ]
+
+    def _group_order(self, group_values):
+        """
+        Sorts tuples with the values of the group keys as if we went over all
+        the combinations of unique values, like `._group_combos()` does.
+        """
+        ranks = [{v: i for i, v in enumerate(self.unique(g))} for g in self.groups]
+        return sorted(group_values, key=lambda k: [r[v] for r, v in zip(ranks, k)])
+
+    def _group_rank(self):
+        """
+        Returns a function that gives the position of the group of an item in the
+        order of `._group_combos()`. Sorting on it puts the groups in that order.
+        """
+        ranks = [{v: i for i, v in enumerate(self.unique(g))} for g in self.groups]
+        return lambda d: [r[d[g]] for r, g in zip(ranks, self.groups)]
+
+    def concat(self, *other):
+        """
+        Concatenate two or more `Clumper` objects together.
 
         ![](../img/concat.png)
 
@@ -933,10 +1898,349 @@ class Clumper:
         assert clump.equals(expected)
         ```
         """
-        data = self.blob.copy()
-        for func in funcs:
-            data = [d for d in data if func(d)]
-        return self._create_new(data)
+        data = _concat_chunks(map_chunks(partial(_keep_items, funcs), self.blob))
+        return self._create_new(data, sorted_by=self.sorted_by)
+
+    @dict_collection_only
+    def between(self, key, lower=None, upper=None, inclusive="both"):
+        """
+        Keeps the items that have a value for `key` between `lower` and `upper`. Items that
+        don't have the key, or have `None` as a value, are removed.
+
+        If the collection is sorted on `key`, via `.sort(by=key)`, the items are found with a
+        binary search instead of checking every item.
+
+        Arguments:
+            key: the key to filter on
+            lower: the lower bound, `None` means no lower bound
+            upper: the upper bound, `None` means no upper bound
+            inclusive: which bounds to include, either `both`, `left`, `right` or `neither`
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        list_dicts = [{'ts': 5}, {'ts': 1}, {'ts': 3}, {'ts': 4}, {'ts': 2}]
+
+        clump = Clumper(list_dicts).sort(by='ts')
+        assert clump.between('ts', 2, 4).collect() == [{'ts': 2}, {'ts': 3}, {'ts': 4}]
+        assert clump.between('ts', 2, 4, inclusive='left').collect() == [{'ts': 2}, {'ts': 3}]
+        assert clump.between('ts', upper=1).collect() == [{'ts': 1}]
+        ```
+        """
+        if inclusive not in ("both", "left", "right", "neither"):
+            raise ValueError(
+                f"`inclusive` must be in ('both', 'left', 'right', 'neither'), got {inclusive}"
+            )
+        if self.sorted_by is not None and self.sorted_by[0] == key:
+            try:
+                start, stop = _sorted_range(
+                    self.blob, key, self.sorted_by[1], lower, upper, inclusive
+                )
+                return self._create_new(self.blob[start:stop], sorted_by=self.sorted_by)
+            except TypeError:
+                # Bounds of another type fall back to checking every item.
+                pass
+        low_closed = inclusive in ("both", "left")
+        up_closed = inclusive in ("both", "right")
+        data = []
+        for d in self.blob:
+            v = d.get(key)
+            if v is None:
+                continue
+            if lower is not None and (v < lower if low_closed else v <= lower):
+                continue
+            if upper is not None and (v > upper if up_closed else v >= upper):
+                continue
+            data.append(d)
+        return self._create_new(data, sorted_by=self.sorted_by)
+
+    @dict_collection_only
+    def where(self, **kwargs):
+        """
+        Keeps the items that have the given values for the given keys. This is a
+        shorthand for `.keep()` with equality checks on keys.
+
+        If the collection has an index on some of the keys, via `.index_on()`, the items are
+        looked up in the index. Otherwise, if the collection is sorted on one of the keys, via
+        `.sort(by=key)`, the items with that value are found with a binary search. Only when
+        neither is available every item is checked.
+
+        Arguments:
+            kwargs: keyword arguments with the value that each key should have
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        list_dicts = [
+            {'user': 'a', 'day': 1},
+            {'user': 'b', 'day': 1},
+            {'user': 'a', 'day': 2},
+        ]
+
+        clump = Clumper(list_dicts)
+        assert clump.where(user='a').collect() == [{'user': 'a', 'day': 1}, {'user': 'a', 'day': 2}]
+        assert clump.sort(by='day').where(day=1, user='b').collect() == [{'user': 'b', 'day': 1}]
+        ```
+        """
+        candidates = self.blob
+        indexed = [keys for keys in self._indexes if set(keys) <= set(kwargs)]
+        if indexed:
+            keys = max(indexed, key=len)
+            try:
+                candidates = self._indexes[keys].get(tuple(kwargs[k] for k in keys), [])
+                kwargs = {k: v for k, v in kwargs.items() if k not in keys}
+            except TypeError:
+                # Unhashable values can't be looked up, only compared.
+                pass
+        elif self.sorted_by is not None and kwargs.get(self.sorted_by[0]) is not None:
+            value = kwargs[self.sorted_by[0]]
+            try:
+                candidates = self.between(self.sorted_by[0], value, value).blob
+                kwargs = {k: v for k, v in kwargs.items() if k != self.sorted_by[0]}
+            except TypeError:
+                # Values that can't be ordered against the sorted key, only compared.
+                pass
+        data = [
+            d
+            for d in candidates
+            if all(k in d and d[k] == v for k, v in kwargs.items())
+        ]
+        return self._create_new(data, sorted_by=self.sorted_by)
+
+    @dict_collection_only
+    def index_on(self, *keys):
+        """
+        Builds a hash index on one or more keys, which makes lookups via `.get()`, filters
+        via `.where()` and joins where this collection is on the right side take constant
+        time per lookup instead of a scan over all items. Items that miss one of the keys
+        are not part of the index.
+
+        The index belongs to the collection that is returned. Verbs create new collections
+        and these start without an index, so an index is never out of date. Build the index
+        once and reuse the collection for repeated lookups.
+
+        Arguments:
+            keys: the keys to index on
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        list_dicts = [
+            {'user': 1, 'day': 'mon', 'clicks': 3},
+            {'user': 2, 'day': 'mon', 'clicks': 1},
+            {'user': 1, 'day': 'tue', 'clicks': 5},
+        ]
+
+        clump = Clumper(list_dicts).index_on('user')
+        assert clump.get(1).collect() == [list_dicts[0], list_dicts[2]]
+        assert len(clump.where(user=2)) == 1
+
+        clump = clump.index_on('user', 'day')
+        assert clump.get(1, 'tue', on=('user', 'day')).collect() == [list_dicts[2]]
+        ```
+        """
+        if len(keys) == 0:
+            raise ValueError("Pass at least one key to index on.")
+        result = self._create_new(self.blob, sorted_by=self.sorted_by)
+        result._indexes = {**self._indexes, keys: _build_index(self.blob, keys)}
+        result._text_indexes = self._text_indexes
+        return result
+
+    def get(self, *values, on=None):
+        """
+        Looks up the items that have the given values for the keys of an index,
+        which needs to be built first via `.index_on()`.
+
+        Arguments:
+            values: the values to look up, one for every key of the index
+            on: the keys of the index to use, only needed when there are multiple indexes
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        clump = Clumper([{'id': i, 'even': i % 2 == 0} for i in range(100)]).index_on('id')
+
+        assert clump.get(42).collect() == [{'id': 42, 'even': True}]
+        assert len(clump.get(1000)) == 0
+        ```
+        """
+        if on is None:
+            if len(self._indexes) != 1:
+                raise ValueError(
+                    f"Pass the keys of the index to use via `on`, found indexes on {list(self._indexes)}."
+                )
+            (on,) = self._indexes
+        on = _as_keys(on)
+        if on not in self._indexes:
+            raise ValueError(f"There is no index on {on}, build one via `.index_on()`.")
+        if len(values) != len(on):
+            raise ValueError(f"The index on {on} needs {len(on)} values, got {values}.")
+        return self._create_new(
+            self._indexes[on].get(tuple(values), []), sorted_by=self.sorted_by
+        )
+
+    @dict_collection_only
+    def index_text(self, *keys, ngram=3):
+        """
+        Builds an inverted index on text keys, which makes `.search()` on these keys fast.
+        The index maps every lowercase word, and every substring of `ngram` characters, to
+        the items that contain it. Items without a string value for the key are not indexed.
+
+        Just like with `.index_on()`, the index belongs to the collection that is returned
+        and collections that are created by verbs start without an index. The index can be
+        stored next to the data with `.write_text_index()` and loaded in a later session with
+        `.read_text_index()`.
+
+        Arguments:
+            keys: the keys with text to index
+            ngram: the length of the substrings that are indexed for substring searches
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        logs = Clumper([
+            {'message': 'Connection timeout after 30s'},
+            {'message': 'Request served'},
+            {'message': 'Read timed out'},
+        ]).index_text('message')
+
+        assert len(logs.search('message', 'TIMEOUT')) == 1
+        assert len(logs.search('message', 'time', substring=True)) == 2
+        ```
+        """
+        if len(keys) == 0:
+            raise ValueError("Pass at least one key to index.")
+        if not isinstance(ngram, int) or ngram < 1:
+            raise ValueError(f"`ngram` must be a positive integer, got {ngram}")
+        result = self._create_new(self.blob, sorted_by=self.sorted_by)
+        result._indexes = self._indexes
+        result._text_indexes = {
+            **self._text_indexes,
+            **{
+                key: _build_text_index([d.get(key) for d in self.blob], ngram)
+                for key in keys
+            },
+        }
+        return result
+
+    @dict_collection_only
+    def search(self, key, query, substring=False):
+        """
+        Keeps the items where the text in `key` matches a query. By default all the words in
+        the query need to appear as words in the text, ignoring case. With `substring=True`
+        the query needs to appear literally in the text, just like `query in text`.
+
+        If there is an index on the key, via `.index_text()`, only the candidate items from
+        the index are checked. Otherwise every item is checked.
+
+        Arguments:
+            key: the key with the text to search in
+            query: the words, or the literal substring, to search for
+            substring: search for a literal substring instead of words
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        logs = Clumper([
+            {'message': 'Disk full on /var'},
+            {'message': 'disk quota exceeded'},
+            {'message': 'Network unreachable'},
+        ])
+
+        assert len(logs.search('message', 'disk')) == 2
+        assert len(logs.search('message', 'Disk', substring=True)) == 1
+        assert len(logs.index_text('message').search('message', 'disk full')) == 1
+        ```
+        """
+        index = self._text_indexes.get(key)
+        if substring:
+            grams = _ngrams(query, index["n"]) if index is not None else set()
+            if grams:
+                positions = _intersect([index["ngrams"].get(g, []) for g in grams])
+                candidates = [self.blob[i] for i in positions]
+            else:
+                candidates = self.blob
+            data = [
+                d for d in candidates if isinstance(d.get(key), str) and query in d[key]
+            ]
+        else:
+            tokens = set(_tokenize(query))
+            if index is not None and tokens:
+                positions = _intersect([index["tokens"].get(t, []) for t in tokens])
+                data = [self.blob[i] for i in positions]
+            else:
+                data = [
+                    d
+                    for d in self.blob
+                    if isinstance(d.get(key), str) and tokens <= set(_tokenize(d[key]))
+                ]
+        return self._create_new(data, sorted_by=self.sorted_by)
+
+    def write_text_index(self, path):
+        """
+        Writes the text indexes of the collection, built via `.index_text()`, to a json file.
+        Together with a fingerprint of the indexed texts, such that `.read_text_index()` can
+        check that the index belongs to the data.
+
+        Arguments:
+            path: filename
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        logs = Clumper([{'message': 'Connection timeout'}, {'message': 'All good'}])
+        logs.index_text('message').write_text_index('/tmp/logs.index.json')
+
+        reloaded = logs.read_text_index('/tmp/logs.index.json')
+        assert reloaded.search('message', 'timeout').collect() == [{'message': 'Connection timeout'}]
+        ```
+        """
+        stored = {
+            key: {
+                **index,
+                "fingerprint": _fingerprint([d.get(key) for d in self.blob]),
+            }
+            for key, index in self._text_indexes.items()
+        }
+        with open(path, "w") as f:
+            json.dump(stored, f)
+
+    def read_text_index(self, path):
+        """
+        Reads text indexes that were written by `.write_text_index()` and returns the
+        collection with these indexes. Raises an error if the data has changed since the
+        index was written. See `.write_text_index()` for an example.
+
+        Arguments:
+            path: filename
+        """
+        with open(path) as f:
+            stored = json.load(f)
+        result = self._create_new(self.blob, sorted_by=self.sorted_by)
+        result._indexes = self._indexes
+        result._text_indexes = dict(self._text_indexes)
+        for key, index in stored.items():
+            fingerprint = index.pop("fingerprint")
+            if fingerprint != _fingerprint([d.get(key) for d in self.blob]):
+                raise ValueError(
+                    f"The text index on '{key}' in {path} does not belong to this data."
+                )
+            result._text_indexes[key] = index
+        return result
 
     def head(self, n=5):
         """
@@ -965,110 +2269,181 @@ class Clumper:
         if n < 0:
             raise ValueError(f"`n` must be a positive integer, got {n}")
         n = min(n, len(self))
-        return self._create_new([self.blob[i] for i in range(n)])
+        return self._create_new(self.blob[:n], sorted_by=self.sorted_by)
 
     def sample(
         self,
         n: int,
-        replace: bool,
+        replace: bool = False,
         random_state: Optional[int] = None,
         weights: str = None,
     ):
-        """Samples n data from the collection
-
-        Args:
-            n (int): The number of items to sample
-            replace (bool): Have duplicate items or not. Defaults to False.
-            weights (str, optional): The key used for calculate sample probability. Defaults to None which means equal probability
-            random_state (int, optional): Random seed for reproducible results. Defaults to None.
-
-        Raises:
-            ValueError: Raises error when sampling more than size of collection
-
-        Returns:
-            Clumper: Sampled Clumper instance
         """
+        Samples `n` items from the collection. If groups are active then `n` items
+        are sampled from every group, which gives a stratified sample.
 
-        if random_state:
-            random.seed(random_state)
+        Sampling uses its own random number generator, so setting a `random_state`
+        does not affect the global `random` module.
 
-        # Default: Sample uniformly
-        prob_sample = list(it.accumulate([1] * len(self)))
+        Warning:
+            This method is aware of groups. There may be different results if a group is active.
 
-        # If weights key assigned, use it to for
-        if weights:
-            if not isinstance(weights, str):
-                raise TypeError("weights must be specified as string")
+        Arguments:
+            n: the number of items to sample, per group if groups are active
+            replace: allow the same item to be sampled more than once
+            random_state: seed for reproducible results
+            weights: key with the weight of each item, items with weight `0` or `None` are
+                     never sampled. If `None` every item is equally likely.
 
-            try:
-                self.select(weights)
-            except KeyError:
-                raise KeyError(
-                    f"The weight key {weights} couldn't be found in the collection"
-                )
+        Raises:
+            ValueError: when sampling more items than there are without replacement
 
-            for i, row in enumerate(self.blob):
-                row_prob = row[weights]
-                if row_prob < 0:
-                    raise ValueError(
-                        "When weights is assigned, each row must have positive weight"
-                    )
+        Usage:
 
-                if row_prob is None:
-                    row_prob = 0
+        ```python
+        from clumper import Clumper
 
-                prob_sample[i] = row_prob
+        list_dicts = [{'a': i, 'w': i % 3, 'grp': i % 2} for i in range(100)]
 
-        if replace:
-            random_blob = choices(population=self.collect(), k=n, weights=prob_sample)
-        else:
+        clump = Clumper(list_dicts)
+        sampled = clump.sample(10, weights='w', random_state=42)
 
-            if n > len(self):
-                raise ValueError("n cannot be larger than the collection")
+        assert len(sampled) == 10
+        assert all(d['w'] > 0 for d in sampled)
+        assert sampled.equals(clump.sample(10, weights='w', random_state=42))
 
-            index_list = list(range(len(self)))
-            selected_indices = self._weighted_sample_without_replacement(
-                index_list=index_list, weights=prob_sample, k=n
+        stratified = clump.group_by('grp').sample(3, random_state=42)
+        assert [d['grp'] for d in stratified] == [0, 0, 0, 1, 1, 1]
+        ```
+        """
+        rng = random.Random(random_state)
+        if not self.groups:
+            return self._create_new(_sample_rows(rng, self.blob, n, replace, weights))
+        strata = [subset.blob for _, subset in self._partition()]
+        return self._create_new(
+            _concat_chunks(
+                [_sample_rows(rng, rows, n, replace, weights) for rows in strata]
             )
-            random_blob = [self.blob[i] for i in selected_indices]
-
-        return self._create_new(random_blob)
-
-    def _weighted_sample_without_replacement(self, index_list, weights, k):
-        if k > len(index_list):
-            raise ValueError(f" {k}= is invalid for {len(index_list)}")
-        selected_indices = []
-
-        for _ in range(k):
-            # Critical that only 1 element is sampled
-            value = random.choices(index_list, weights, k=1)
-            # Take the first element as random.choices returns a list
-            value = value[0]
-            selected_indices.append(value)
-            removed_index = index_list.index(value)
-            index_list.pop(removed_index)
-            weights.pop(removed_index)
-        return selected_indices
+        )
 
     def sample_frac(
         self,
         frac: float,
-        replace: bool,
+        replace: bool = False,
         random_state: Optional[int] = None,
         weights: str = None,
     ):
-        """Samples fraction of items from the collection
+        """
+        Samples a fraction of the items from the collection. If groups are active then
+        every group is sampled in proportion to its size, which gives a stratified sample.
+        The number of items to sample from each group is rounded such that the total
+        is the same as without groups.
+
+        Warning:
+            This method is aware of groups. There may be different results if a group is active.
 
         Arguments:
-            frac (float): : The fraction of items to sample
-            replace (bool): Have duplicate items or not. Defaults to False.
-            weights (str, optional): The key(s) used for calculate sample probability. Defaults to None which means equal probability
-            random_state (int, optional): Random seed for reproducible results. Defaults to None.
-        """
-        n = int(frac * len(self))
-        return self.sample(
-            n=n, replace=replace, weights=weights, random_state=random_state
+            frac: the fraction of items to sample
+            replace: allow the same item to be sampled more than once
+            random_state: seed for reproducible results
+            weights: key with the weight of each item, items with weight `0` or `None` are
+                     never sampled. If `None` every item is equally likely.
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        list_dicts = [{'a': i, 'label': 'rare' if i < 10 else 'common'} for i in range(100)]
+
+        sampled = (Clumper(list_dicts)
+                    .group_by('label')
+                    .sample_frac(0.2, random_state=42))
+
+        assert len(sampled) == 20
+        assert len(sampled.keep(lambda d: d['label'] == 'rare')) == 2
+        ```
+        """
+        rng = random.Random(random_state)
+        strata = (
+            [subset.blob for _, subset in self._partition()]
+            if self.groups
+            else [self.blob]
         )
+        sizes = _allocate([len(rows) for rows in strata], frac)
+        return self._create_new(
+            _concat_chunks(
+                [
+                    _sample_rows(rng, rows, n, replace, weights)
+                    for rows, n in zip(strata, sizes)
+                ]
+            )
+        )
+
+    def split(self, frac=0.8, key=None, salt=""):
+        """
+        Splits the collection into a train and a test collection by a stable hash of a key.
+        Unlike `sample_frac` this doesn't depend on random state; items with the same key
+        value always end up on the same side, also across runs and when data is added.
+        The order of the items is kept.
+
+        Arguments:
+            frac: the fraction of items that go to the train collection
+            key: key, list of keys or function to hash, `None` hashes the whole item
+            salt: a string that is added to the hash, use a different salt for a different split
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        clump = Clumper([{'user': i % 50, 'click': i} for i in range(500)])
+        train, test = clump.split(frac=0.8, key='user')
+
+        assert len(train) + len(test) == 500
+        assert not set(train.unique('user')) & set(test.unique('user'))
+        ```
+        """
+        _check_frac(frac)
+        train, test = [], []
+        for d in self.blob:
+            (train if _hash_fraction(d, key, salt) < frac else test).append(d)
+        return self._create_new(train), self._create_new(test)
+
+    def kfold(self, k=5, key=None, salt=""):
+        """
+        Splits the collection into `k` folds by a stable hash of a key and returns a list
+        with a `(train, test)` pair of collections for every fold. Every item is in the test
+        collection of exactly one fold, and items with the same key value are always in the
+        same fold. The order of the items is kept.
+
+        Arguments:
+            k: the number of folds
+            key: key, list of keys or function to hash, `None` hashes the whole item
+            salt: a string that is added to the hash, use a different salt for different folds
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        clump = Clumper([{'user': i % 50, 'click': i} for i in range(500)])
+        folds = clump.kfold(k=5, key='user')
+
+        assert len(folds) == 5
+        assert sum(len(test) for _, test in folds) == 500
+        assert all(len(train) + len(test) == 500 for train, test in folds)
+        ```
+        """
+        _check_k(k)
+        folds = [int(_hash_fraction(d, key, salt) * k) for d in self.blob]
+        return [
+            (
+                self._create_new([d for d, f in zip(self.blob, folds) if f != i]),
+                self._create_new([d for d, f in zip(self.blob, folds) if f == i]),
+            )
+            for i in range(k)
+        ]
 
     def tail(self, n=5):
         """
@@ -1096,7 +2471,9 @@ class Clumper:
         if n < 0:
             raise ValueError(f"`n` must be positive, got {n}")
         n = min(n, len(self))
-        return self._create_new(self.blob[len(self) - n : len(self)])
+        return self._create_new(
+            self.blob[len(self) - n : len(self)], sorted_by=self.sorted_by
+        )
 
     @dict_collection_only
     def unpack(self, name):
@@ -1158,7 +2535,11 @@ class Clumper:
         assert all(["c" not in d.keys() for d in clump])
         ```
         """
-        return self._create_new([{k: d[k] for k in keys} for d in self.blob])
+        kept = self.sorted_by is not None and self.sorted_by[0] in keys
+        return self._create_new(
+            [{k: d[k] for k in keys} for d in self.blob],
+            sorted_by=self.sorted_by if kept else None,
+        )
 
     @dict_collection_only
     def drop(self, *keys):
@@ -1185,7 +2566,8 @@ class Clumper:
         ```
         """
         return self._create_new(
-            [{k: v for k, v in d.items() if k not in keys} for d in self.blob]
+            [{k: v for k, v in d.items() if k not in keys} for d in self.blob],
+            sorted_by=self._sorted_after(keys),
         )
 
     @grouped
@@ -1224,27 +2606,178 @@ class Clumper:
         assert result.equals(expected)
         ```
         """
-        data = []
-        for d in self.blob.copy():
-            new = {k: v for k, v in d.items()}
-            for key, func in kwargs.items():
-                new[key] = func(new)
-            data.append(new)
-        return self._create_new(data)
+        sorted_by = self._sorted_after(kwargs)
+        if any(_needs_all_rows(func) for func in kwargs.values()):
+            data = _mutate_columns(kwargs, self.blob)
+        elif not any(_is_stateful(func) for func in kwargs.values()):
+            mutate_items = partial(_mutate_items, kwargs)
+            data = _concat_chunks(map_chunks(mutate_items, self.blob))
+        # Stateful functions, like `row_number`, need to see all rows in order
+        # unless we can resume them from a checkpoint at the start of each chunk.
+        elif should_parallelize(len(self.blob)) and _can_scan(kwargs):
+            data = _scan_mutate(kwargs, self.blob)
+        else:
+            data = _mutate_items(kwargs, self.blob)
+        return self._create_new(data, sorted_by=sorted_by)
 
     @grouped
-    def sort(self, key, reverse=False):
+    @dict_collection_only
+    def impute(self, *keys, strategy="prev", fallback=None):
+        """
+        Fills in the values of keys that are missing from items in the collection.
+
+        Each key is scanned once to find the gaps, after which each gap is filled
+        at once. Only the items that have a gap are copied.
+
+        Arguments:
+            keys: the keys to impute
+            strategy: the strategy to apply, one of;
+                - `prev`: use the previous value that was present
+                - `next`: use the next value that is present
+                - `nearest`: use the closest present value, preferring the previous one on a tie
+                - `linear`: interpolate linearly between the previous and next value
+                - `value`: use the `fallback` value
+            fallback: if the strategy fails, what value to use
+
+        Warning:
+            This method is aware of groups. There may be different results if a group is active.
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        list_dicts = [
+            {'grp': 'a', 'v': 1},
+            {'grp': 'a'},
+            {'grp': 'a', 'v': 4},
+            {'grp': 'b'},
+            {'grp': 'b', 'v': 10},
+        ]
+
+        result = Clumper(list_dicts).impute('v', strategy='linear', fallback=0)
+        assert [d['v'] for d in result] == [1, 2.5, 4, 7, 10]
+
+        result = Clumper(list_dicts).group_by('grp').impute('v', strategy='prev', fallback=0)
+        assert result.equals([
+            {'grp': 'a', 'v': 1},
+            {'grp': 'a', 'v': 1},
+            {'grp': 'a', 'v': 4},
+            {'grp': 'b', 'v': 0},
+            {'grp': 'b', 'v': 10},
+        ])
+        ```
+        """
+        _check_strategy(strategy)
+        data = list(self.blob)
+        for key in keys:
+            values = [d.get(key, _MISSING) for d in data]
+            filled = _fill_gaps(values, strategy, fallback)
+            for i, value in enumerate(values):
+                if value is _MISSING:
+                    data[i] = {**data[i], key: filled[i]}
+        return self._create_new(data)
+
+    def top_k(self, n, key):
+        """
+        Selects the `n` items with the largest value for `key`, largest first. This is
+        like `.sort(key, reverse=True).head(n)` but it only keeps `n` items in a heap
+        instead of sorting the whole collection. If groups are active, the top
+        items of every group are found in a single pass with a heap per group.
+        Ties are broken by the order in the collection and items without the key are skipped.
+
+        Warning:
+            This method is aware of groups. There may be different results if a group is active.
+
+        Arguments:
+            n: the number of items to select, per group if groups are active
+            key: the key, or a function, that gives the value to compare
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        list_dicts = [
+            {'a': 1, 'grp': 'a'},
+            {'a': 5, 'grp': 'b'},
+            {'a': 3, 'grp': 'a'},
+            {'a': 4, 'grp': 'b'},
+            {'a': 2, 'grp': 'a'},
+        ]
+
+        assert Clumper(list_dicts).top_k(2, 'a').collect() == [
+            {'a': 5, 'grp': 'b'},
+            {'a': 4, 'grp': 'b'},
+        ]
+
+        result = Clumper(list_dicts).group_by('grp').top_k(1, lambda d: d['a'])
+        assert result.equals([{'a': 3, 'grp': 'a'}, {'a': 5, 'grp': 'b'}])
+        ```
+        """
+        return self._keep_k(n, key, largest=True)
+
+    def bottom_k(self, n, key):
+        """
+        Selects the `n` items with the smallest value for `key`, smallest first.
+        See `.top_k()` for the details.
+
+        Warning:
+            This method is aware of groups. There may be different results if a group is active.
+
+        Arguments:
+            n: the number of items to select, per group if groups are active
+            key: the key, or a function, that gives the value to compare
+
+        Usage:
+
+        ```python
+        from clumper import Clumper
+
+        list_dicts = [{'a': 3}, {'a': 1}, {'a': 2}, {'b': 0}]
+
+        result = Clumper(list_dicts).bottom_k(2, 'a')
+        assert result.collect() == [{'a': 1}, {'a': 2}]
+        ```
         """
-        Allows you to sort the collection of dictionaries.
+        return self._keep_k(n, key, largest=False)
+
+    def _keep_k(self, n, key, largest):
+        """Shared implementation of `top_k` and `bottom_k`."""
+        selected = _select_k(self.blob, n, key, self.groups, largest)
+        return self._create_new(
+            [d for group in self._group_order(selected) for d in selected[group]]
+        )
+
+    def sort(
+        self, key=None, reverse=False, by=None, ascending=True, na_position="last"
+    ):
+        """
+        Allows you to sort the collection of dictionaries. You can either sort with a
+        `key` function or on the values of one or more keys via `by`.
+
+        When sorting `by` keys, items that miss a key, or have `None` as a value, are put
+        at the end (or the start) instead of raising an error. The sort is stable, so
+        items that have the same values stay in their original order.
+
+        After sorting `by` keys the collection remembers that it is sorted on the first key,
+        as long as no group is active and no values are missing. Verbs that keep the order,
+        like `keep`, `head` and `mutate`, pass this along. The `between` and `where` verbs
+        use it to find items with a binary search and joins on the key use a merge join.
 
         ![](../img/sort.png)
 
         Arguments:
-            key: the number of items to grab
-            reverse: the number of items to grab
+            key: a function that gives the value to sort an item on
+            reverse: sort from large to small, only used together with `key`
+            by: a key, or list of keys, to sort on
+            ascending: sort from small to large, either one setting for all keys or a list with one per key in `by`
+            na_position: put items with missing values `first` or `last`
 
         Warning:
             This method is aware of groups. Expect different results if a group is active.
+            The groups are kept together, in the same order as `agg` reports them, and
+            the items within each group are sorted.
 
         Usage:
 
@@ -1263,9 +2796,43 @@ class Clumper:
         (Clumper(list_dicts)
           .sort(lambda d: d['b'], reverse=True)
           .collect())
+
+        list_dicts = [
+            {'grp': 'a', 'score': 2},
+            {'grp': 'b', 'score': 5},
+            {'grp': 'a'},
+            {'grp': 'b', 'score': 3},
+            {'grp': 'a', 'score': 4}]
+
+        result = Clumper(list_dicts).sort(by=['grp', 'score'], ascending=[True, False])
+        assert result.collect() == [
+            {'grp': 'a', 'score': 4},
+            {'grp': 'a', 'score': 2},
+            {'grp': 'a'},
+            {'grp': 'b', 'score': 5},
+            {'grp': 'b', 'score': 3}]
         ```
         """
-        return self._create_new(sorted(self.blob, key=key, reverse=reverse))
+        if (key is None) == (by is None):
+            raise ValueError("Pass either a `key` function or the keys to sort `by`.")
+        if na_position not in ("first", "last"):
+            raise ValueError(
+                f"`na_position` must be either 'first' or 'last', got {na_position}"
+            )
+        sorted_by = None
+        if key is not None:
+            blob = sorted(self.blob, key=key, reverse=reverse)
+        else:
+            by = _as_keys(by)
+            blob = _sort_by(self.blob, by, ascending, na_position)
+            # Remember the order so that filters on the first key can use binary search.
+            if not self.groups and all(d.get(by[0]) is not None for d in blob):
+                first = ascending if isinstance(ascending, bool) else ascending[0]
+                sorted_by = (by[0], first)
+        if self.groups:
+            # One stable sort on the groups keeps the items within a group sorted.
+            blob.sort(key=self._group_rank())
+        return self._create_new(blob, sorted_by=sorted_by)
 
     def map(self, func):
         """
@@ -1290,7 +2857,9 @@ class Clumper:
           .collect())
         ```
         """
-        return self._create_new([func(d) for d in self.blob])
+        return self._create_new(
+            _concat_chunks(map_chunks(partial(_map_items, func), self.blob))
+        )
 
     def flatmap(self, func):
         """
@@ -1308,7 +2877,10 @@ class Clumper:
         assert expected == returned
         ```
         """
-        return self._create_new([func(item) for item in _flatten(self.blob)])
+        items = list(_flatten(self.blob))
+        return self._create_new(
+            _concat_chunks(map_chunks(partial(_map_items, func), items))
+        )
 
     def flatten(self):
         """
@@ -1413,6 +2985,9 @@ class Clumper:
         result = self.copy()
         for new_name, old_name in kwargs.items():
             result = result.mutate(**{new_name: lambda d: d[old_name]}).drop(old_name)
+        if self.sorted_by is not None and self.sorted_by[0] in kwargs.values():
+            new_names = {old: new for new, old in kwargs.items()}
+            result.sorted_by = (new_names[self.sorted_by[0]], self.sorted_by[1])
         return result
 
     def implode(self, **kwargs):
@@ -1535,7 +3110,7 @@ class Clumper:
         assert id(c1) != id(c2)
         ```
         """
-        return self._create_new([d for d in self.blob])
+        return self._create_new([d for d in self.blob], sorted_by=self.sorted_by)
 
     def flatten_keys(self, keyname="key"):
         """
@@ -1622,27 +3197,7 @@ class Clumper:
         assert clump.summarise_col(lambda d: d[-1], "a") == 3
         ```
         """
-        funcs = {
-            "mean": mean,
-            "count": lambda d: len(d),
-            "unique": lambda d: list(set(d)),
-            "n_unique": lambda d: len(set(d)),
-            "sum": sum,
-            "min": min,
-            "max": max,
-            "median": median,
-            "var": variance,
-            "std": stdev,
-            "values": lambda d: d,
-            "first": lambda d: d[0],
-            "last": lambda d: d[-1],
-        }
-        if isinstance(func, str):
-            if func not in funcs.keys():
-                raise ValueError(
-                    f"Passed `func` must be in {funcs.keys()}, got {func}."
-                )
-            func = funcs[func]
+        func = _summary_func(func)
         array = [d[key] for d in self if key in d.keys()]
         return func(array)
 
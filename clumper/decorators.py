@@ -1,9 +1,13 @@
-from functools import wraps, reduce
+from functools import partial, wraps, reduce
 from copy import deepcopy
+import heapq
 import inspect
+from operator import itemgetter
 from glob import glob
 from pathlib import Path
 
+from clumper.parallel import run_tasks, should_parallelize
+
 
 def return_value_if_empty(value=None):
     """
@@ -23,6 +27,35 @@ def return_value_if_empty(value=None):
     return decorator_return
 
 
+def _apply_to_group(name, args, task):
+    """
+    Applies the original (non-grouped) method with name `name` to a single group.
+    The method is looked up by name such that only the name needs to be sent to
+    a worker process. The stateful functions in `kwargs` are reset first, both in
+    a serial loop and in a worker, such that every group starts fresh.
+    """
+    subset, kwargs = task
+    kwargs = _fresh_kwargs(kwargs)
+    return getattr(type(subset), name)._grouped_method(subset, *args, **kwargs)
+
+
+def _fresh_kwargs(kwargs):
+    """
+    Makes sure that state-ful functions (like `row_number`) start fresh for
+    every group. Functions that support it are `reset()`, anything else is copied.
+    The `kwargs` should be a copy, the objects that were passed in by the user
+    are never touched.
+    """
+    fresh = {}
+    for name, value in kwargs.items():
+        if hasattr(value, "reset"):
+            value.reset()
+            fresh[name] = value
+        else:
+            fresh[name] = deepcopy(value)
+    return fresh
+
+
 def grouped(method):
     """
     Handles the behavior when a group is present on a clumper object.
@@ -33,16 +66,25 @@ def grouped(method):
         if len(clumper.groups) == 0:
             return method(clumper, *args, **kwargs)
 
-        # You may note the deepcopy() here in the keyword arguments. This is done
-        # such that state-ful functions (like `row_number`) automatically reset.
-        results = [method(s, *args, **deepcopy(kwargs)) for s in clumper._subsets()]
-        blob = reduce(lambda a, b: a + b, [c.collect() for c in results])
+        partition = clumper._partition()
+        combos, subsets = [c for c, _ in partition], [s for _, s in partition]
+        apply = partial(_apply_to_group, method.__name__, args)
+        if should_parallelize(len(clumper)):
+            # Every task gets its own copy of the keyword arguments, workers may
+            # run at the same time so they can't share one.
+            tasks = [(s, deepcopy(kwargs)) for s in subsets]
+            results = run_tasks(apply, tasks, sizes=[len(s) for s in subsets])
+        else:
+            copied = deepcopy(kwargs)
+            results = [apply((s, copied)) for s in subsets]
+        blob = reduce(lambda a, b: a + b, [c.collect() for c in results], [])
 
         # We need to make sure the grouping keys are still available when we do "agg".
-        if method.__name__ == "agg":
-            blob = [{**s, **b} for s, b in zip(clumper._group_combos(), blob)]
+        if method.__name__ in ("agg", "bootstrap"):
+            blob = [{**s, **b} for s, b in zip(combos, blob)]
         return clumper._create_new(blob)
 
+    wrapped._grouped_method = method
     return wrapped
 
 
@@ -131,6 +173,18 @@ def multifile(param_name="path"):
                 return collected_clumpers[0]
             # More than one object found
             elif len(collected_clumpers) > 1:
+                sorted_by = bound_arguments.arguments.get("sorted_by")
+                if sorted_by is not None:
+                    # Every file is sorted, so a k-way merge keeps the result sorted.
+                    blob = list(
+                        heapq.merge(
+                            *[c.blob for c in collected_clumpers],
+                            key=itemgetter(sorted_by),
+                        )
+                    )
+                    return collected_clumpers[0]._create_new(
+                        blob, sorted_by=(sorted_by, True)
+                    )
                 # Combine them by concating their dict
                 return reduce(lambda a, b: a.concat(b), collected_clumpers)
 
@@ -7,3 +7,14 @@ def raise_yaml_dep_error():
     > python -m pip install clumper[yaml]
     """
     raise RuntimeError(msg)
+
+
+def raise_cloudpickle_dep_error():
+    """Raises an appropriate error when functions can't be sent to worker processes."""
+    msg = """
+    If you want to run lambda functions in parallel processes you need to install cloudpickle.
+    To install, run:
+
+    > python -m pip install clumper[parallel]
+    """
+    raise RuntimeError(msg)
@@ -0,0 +1,223 @@
+"""
+Settings and helpers that allow row-wise verbs to spread their work over multiple workers.
+
+By default everything runs serially. You can change this globally via `set_config`
+or temporarily via the `config_context` context manager.
+
+```python
+from clumper import Clumper
+from clumper.parallel import config_context
+
+list_dicts = [{'a': i} for i in range(100)]
+
+with config_context(n_jobs=2, min_size=10):
+    result = Clumper(list_dicts).mutate(b=lambda d: d['a'] * 2)
+
+assert result.collect() == Clumper(list_dicts).mutate(b=lambda d: d['a'] * 2).collect()
+```
+"""
+
+import os
+import pickle
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+from clumper.error import raise_cloudpickle_dep_error
+
+_config = {"n_jobs": 1, "backend": "auto", "min_size": 10_000}
+
+_allowed_backends = ("auto", "process", "thread")
+
+# Threads share `_config`, so a flag per thread marks the workers.
+_worker = threading.local()
+
+
+def get_config():
+    """
+    Returns a copy of the current parallel settings.
+
+    Usage:
+
+    ```python
+    from clumper.parallel import get_config
+
+    assert get_config()["n_jobs"] == 1
+    ```
+    """
+    return dict(_config)
+
+
+def set_config(n_jobs=None, backend=None, min_size=None):
+    """
+    Globally sets how row-wise verbs (`map`, `mutate`, `keep` and `flatmap`) are executed.
+    These settings also allow verbs that are aware of groups to handle the groups in parallel.
+
+    Arguments:
+        n_jobs: number of workers to use, `1` means serial execution and `-1` means one worker per cpu core
+        backend: either `process`, `thread` or `auto`. The `auto` backend uses threads on free-threaded
+                 python builds and processes otherwise.
+        min_size: collections with fewer items than this are always handled serially
+
+    Usage:
+
+    ```python
+    from clumper.parallel import set_config, get_config
+
+    set_config(n_jobs=2)
+    assert get_config()["n_jobs"] == 2
+    set_config(n_jobs=1)
+    ```
+    """
+    if n_jobs is not None:
+        if not isinstance(n_jobs, int) or n_jobs == 0 or n_jobs < -1:
+            raise ValueError(
+                f"`n_jobs` must be a positive integer or -1, got {n_jobs}."
+            )
+        _config["n_jobs"] = n_jobs
+    if backend is not None:
+        if backend not in _allowed_backends:
+            raise ValueError(
+                f"`backend` must be in {_allowed_backends}, got: '{backend}'."
+            )
+        _config["backend"] = backend
+    if min_size is not None:
+        if min_size < 0:
+            raise ValueError(f"`min_size` must be positive, got {min_size}.")
+        _config["min_size"] = min_size
+
+
+@contextmanager
+def config_context(n_jobs=None, backend=None, min_size=None):
+    """
+    Temporarily changes the parallel settings, see `set_config` for the arguments.
+
+    Usage:
+
+    ```python
+    from clumper.parallel import config_context, get_config
+
+    with config_context(n_jobs=4):
+        assert get_config()["n_jobs"] == 4
+    assert get_config()["n_jobs"] == 1
+    ```
+    """
+    old_config = get_config()
+    set_config(n_jobs=n_jobs, backend=backend, min_size=min_size)
+    try:
+        yield get_config()
+    finally:
+        _config.update(old_config)
+
+
+def _n_jobs():
+    """Resolves the `n_jobs` setting into an actual number of workers."""
+    if getattr(_worker, "active", False):
+        return 1
+    if _config["n_jobs"] == -1:
+        return os.cpu_count() or 1
+    return _config["n_jobs"]
+
+
+def _use_threads():
+    """Checks if the configured backend should use threads instead of processes."""
+    if _config["backend"] == "auto":
+        return not getattr(sys, "_is_gil_enabled", lambda: True)()
+    return _config["backend"] == "thread"
+
+
+def _dumps(obj):
+    """
+    Serialises an object for a worker process. We use `cloudpickle` because
+    the functions that users pass to verbs are typically lambdas.
+    """
+    try:
+        import cloudpickle
+
+        return cloudpickle.dumps(obj)
+    except ImportError:
+        try:
+            return pickle.dumps(obj)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            raise_cloudpickle_dep_error()
+
+
+def _call_pickled(payload):
+    """Runs inside of a worker process, unpacks a function with its argument and calls it."""
+    # Workers never start workers of their own.
+    _config["n_jobs"] = 1
+    func, arg = pickle.loads(payload)
+    return func(arg)
+
+
+def _call_in_thread(func, arg):
+    """Runs inside of a worker thread, marks the thread such that it never starts workers of its own."""
+    _worker.active = True
+    try:
+        return func(arg)
+    finally:
+        _worker.active = False
+
+
+def should_parallelize(n_items):
+    """Checks if a collection of `n_items` is large enough to be handled by multiple workers."""
+    return _n_jobs() > 1 and n_items >= max(_config["min_size"], 2)
+
+
+def split_chunks(items, n_chunks):
+    """Splits a list into at most `n_chunks` contiguous chunks of nearly equal size."""
+    n_chunks = max(1, min(n_chunks, len(items)))
+    size, rest = divmod(len(items), n_chunks)
+    chunks, start = [], 0
+    for i in range(n_chunks):
+        stop = start + size + (1 if i < rest else 0)
+        chunks.append(items[start:stop])
+        start = stop
+    return chunks
+
+
+def run_tasks(func, args, sizes=None):
+    """
+    Calls `func` on every argument using the configured workers and returns
+    the results in the same order as the arguments.
+
+    If the `sizes` of the tasks are given then the largest tasks are started
+    first. This prevents one large task from being the only thing that is
+    still running at the end.
+    """
+    if len(args) <= 1 or _n_jobs() <= 1:
+        return [func(arg) for arg in args]
+    order = list(range(len(args)))
+    if sizes is not None:
+        order.sort(key=lambda i: sizes[i], reverse=True)
+    n_workers = min(_n_jobs(), len(args))
+    if _use_threads():
+        with ThreadPoolExecutor(n_workers) as executor:
+            results = list(
+                executor.map(partial(_call_in_thread, func), [args[i] for i in order])
+            )
+    else:
+        payloads = [_dumps((func, args[i])) for i in order]
+        with ProcessPoolExecutor(n_workers) as executor:
+            results = list(executor.map(_call_pickled, payloads))
+    ordered = [None] * len(args)
+    for i, result in zip(order, results):
+        ordered[i] = result
+    return ordered
+
+
+def chunk_items(items):
+    """
+    Splits `items` into the contiguous chunks that are sent to the workers. Small
+    collections, or a serial configuration, result in a single chunk.
+    """
+    if not should_parallelize(len(items)):
+        return [items]
+    return split_chunks(items, _n_jobs() * 4)
+
+
+def map_chunks(func, items):
+    """Applies `func` to each chunk of `items` and returns a list with the result per chunk, in order."""
+    return run_tasks(func, chunk_items(items))
@@ -1,11 +1,82 @@
 """
 A collection of functions to be used in `mutate`/`map`-verbs.
+
+The functions in this module are stateful; they see the rows one at a time
+and remember what they've seen. To make them usable on chunks of data that
+are handled in parallel, or on separate batches of a stream, they all share
+a prefix-scan protocol:
+
+- `get_state()` returns a checkpoint that summarises all rows seen since the last `reset()`
+- `set_state(state)` resumes from such a checkpoint
+- `combine(left, right)` merges the checkpoints of two consecutive chunks of rows
+- `reset()` forgets all rows seen so far
+
+The `over` function uses `reset()` to apply these functions per partition of the data.
+
+```python
+from clumper import Clumper
+from clumper.sequence import row_number
+
+batch1 = Clumper([{'a': 1}, {'a': 2}]).mutate(r=row_number())
+
+# Resume the numbering in the next batch from a checkpoint.
+rn = row_number()
+rn.set_state(len(batch1))
+batch2 = Clumper([{'a': 3}, {'a': 4}]).mutate(r=rn)
+
+assert [d['r'] for d in batch2] == [3, 4]
+```
 """
 
+from collections import deque
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from functools import lru_cache
+from math import sqrt
 from typing import Callable
 
 
-class row_number:
+class _Stateful:
+    """
+    Base class for the stateful functions in this module. Subclasses need to
+    implement `_initial_state`, `get_state`, `set_state` and `combine`.
+    """
+
+    def _initial_state(self):
+        raise NotImplementedError
+
+    def get_state(self):
+        """Returns a checkpoint that summarises all rows seen since the last reset."""
+        raise NotImplementedError
+
+    def set_state(self, state):
+        """Resumes from a checkpoint that was created via `get_state` or `combine`."""
+        raise NotImplementedError
+
+    def combine(self, left, right):
+        """Merges the checkpoints of two consecutive chunks of rows into one."""
+        raise NotImplementedError
+
+    # Functions that need to see all rows at once, instead of one at a time,
+    # set this to `True`. The `mutate` verb will then call `evaluate` instead.
+    needs_all_rows = False
+
+    def reset(self):
+        """Forgets all rows seen so far."""
+        self.set_state(self._initial_state())
+
+    def evaluate(self, rows):
+        """Applies the function to a list of rows, in order, and returns a list with the results."""
+        return [self(row) for row in rows]
+
+    def _apply_key(self, new):
+        if isinstance(self.key, str):
+            return new[self.key]
+        if isinstance(self.key, Callable):
+            return self.key(new)
+
+
+class row_number(_Stateful):
     """
     This stateful function can be used to calculate row numbers.
 
@@ -33,12 +104,153 @@ class row_number:
     def __init__(self):
         self.state = 0
 
+    def _initial_state(self):
+        return 0
+
+    def get_state(self):
+        """Returns the number of rows seen so far."""
+        return self.state
+
+    def set_state(self, state):
+        """Continues counting from `state`."""
+        self.state = state
+
+    def combine(self, left, right):
+        """Adds up the number of rows of two chunks."""
+        return left + right
+
     def __call__(self, _):
         self.state += 1
         return self.state
 
 
-class rolling:
+@lru_cache(maxsize=2**16)
+def _parse_timestamp(text):
+    """Parses an ISO formatted timestamp into seconds since the epoch."""
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    return datetime.fromisoformat(text).timestamp()
+
+
+def _to_seconds(t):
+    """Turns a datetime, an ISO formatted string or a number into seconds since the epoch."""
+    if isinstance(t, datetime):
+        return t.timestamp()
+    if isinstance(t, str):
+        return _parse_timestamp(t)
+    return t
+
+
+class _RollingWindow(_Stateful):
+    """
+    Keeps the values of a key that are in the window in a deque. The window either
+    contains the last `window` rows, or all the rows with a timestamp less than
+    `duration` before the current one. Subclasses keep track of a summary by
+    updating it whenever a value enters or leaves the window.
+    """
+
+    def __init__(self, window=5, key=None, duration=None, time_key=None):
+        if duration is None and window < 1:
+            raise ValueError(f"The `window` must be at least 1, got: {window}.")
+        if isinstance(duration, timedelta):
+            duration = duration.total_seconds()
+        if duration is not None and duration <= 0:
+            raise ValueError(f"The `duration` must be positive, got: {duration}.")
+        if duration is not None and time_key is None:
+            raise ValueError("A `time_key` is required when a `duration` is given.")
+        self.window = window
+        self.key = key
+        self.duration = duration
+        self.time_key = time_key
+        self.reset()
+
+    def _initial_state(self):
+        return []
+
+    def get_state(self):
+        """
+        Returns the values that are currently in the window. For time based
+        windows these are `(timestamp, value)`-pairs.
+        """
+        if self.duration is None:
+            return list(self.state)
+        return list(zip(self._times, self.state))
+
+    def set_state(self, state):
+        """Resumes with the values of `state` in the window."""
+        self.state = deque()
+        self._times = deque()
+        self._n_seen = 0
+        self._n_removed = 0
+        self._clear()
+        if self.duration is None:
+            for value in list(state)[-self.window :]:
+                self._push(value)
+        else:
+            for t, value in state:
+                self._push(value, t)
+
+    def combine(self, left, right):
+        """Only the values of both chunks that are in the last window matter."""
+        entries = list(left) + list(right)
+        if self.duration is None:
+            return entries[-self.window :]
+        if len(entries) == 0:
+            return entries
+        start = entries[-1][0] - self.duration
+        return [(t, value) for t, value in entries if t > start]
+
+    def _clear(self):
+        pass
+
+    def _added(self, value):
+        pass
+
+    def _removed(self, value):
+        pass
+
+    def _recalculate(self):
+        pass
+
+    def _pop(self):
+        self._removed(self.state.popleft())
+        # Recalculate now and then such that floating point errors can't pile up.
+        self._n_removed += 1
+        if self._n_removed >= max(len(self.state), 1):
+            self._n_removed = 0
+            self._recalculate()
+
+    def _push(self, value, t=None):
+        self.state.append(value)
+        self._n_seen += 1
+        self._added(value)
+        if self.duration is None:
+            if len(self.state) > self.window:
+                self._pop()
+            return
+        if self._times and t < self._times[-1]:
+            raise ValueError(
+                f"Time based windows need sorted timestamps, got {t} after {self._times[-1]}."
+            )
+        self._times.append(t)
+        while self._times[0] <= t - self.duration:
+            self._times.popleft()
+            self._pop()
+
+    def _result(self):
+        raise NotImplementedError
+
+    def __call__(self, new):
+        if self.duration is None:
+            self._push(self._apply_key(new))
+        elif isinstance(self.time_key, str):
+            self._push(self._apply_key(new), _to_seconds(new[self.time_key]))
+        else:
+            self._push(self._apply_key(new), _to_seconds(self.time_key(new)))
+        return self._result()
+
+
+class rolling(_RollingWindow):
     """
     This stateful function can be used to create a moving window
     over a key.
@@ -48,6 +260,13 @@ class rolling:
     Arguments:
         key: the key to apply the smoothing to
         window: the size of the window to create
+        duration: instead of a number of rows, keep all rows with a timestamp less than
+                  `duration` before the current one. Can be a number of seconds or a `timedelta`.
+        time_key: the key with the timestamp, which must be sorted, required with `duration`.
+                  Timestamps can be a `datetime`, seconds since the epoch or an ISO formatted string.
+
+    If you only need a summary of the window, like the mean, then the
+    `rolling_<summary>` functions are much faster for large windows.
 
     Usage:
 
@@ -65,29 +284,296 @@ class rolling:
     (Clumper(list_dicts)
       .mutate(r=rolling(window=2, key='a'))
       .collect())
+
+    events = [
+        {'ts': '2021-01-01T10:00:00', 'a': 1},
+        {'ts': '2021-01-01T10:03:00', 'a': 2},
+        {'ts': '2021-01-01T10:09:00', 'a': 3},
+    ]
+
+    result = Clumper(events).mutate(r=rolling(key='a', duration=300, time_key='ts'))
+    assert [d['r'] for d in result] == [[1], [1, 2], [3]]
     ```
     """
 
-    def __init__(self, window=5, key=None):
-        self.state = []
-        self.window = window
-        self.key = key
+    def _result(self):
+        # Every row needs its own list, the window itself keeps changing.
+        return list(self.state)
 
-    def _apply_key(self, new):
-        if isinstance(self.key, str):
-            return new[self.key]
-        if isinstance(self.key, Callable):
-            return self.key(new)
 
-    def __call__(self, new):
-        # we can't append because of mutable state
-        self.state = self.state + [self._apply_key(new)]
-        if len(self.state) > self.window:
-            self.state = self.state[1:]
-        return self.state
+class rolling_sum(_RollingWindow):
+    """
+    This stateful function calculates the sum over a moving window of a key.
+    The sum is updated as values enter and leave the window.
+
+    Arguments:
+        key: the key to sum
+        window: the size of the window
+        duration: instead of a number of rows, keep all rows with a timestamp less than
+                  `duration` before the current one. Can be a number of seconds or a `timedelta`.
+        time_key: the key with the timestamp, which must be sorted, required with `duration`.
+                  Timestamps can be a `datetime`, seconds since the epoch or an ISO formatted string.
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import rolling_sum
+
+    list_dicts = [{'a': 1}, {'a': 2}, {'a': 3}, {'a': 4}]
+
+    result = Clumper(list_dicts).mutate(s=rolling_sum(window=2, key='a'))
+    assert [d['s'] for d in result] == [1, 3, 5, 7]
+    ```
+    """
+
+    def _clear(self):
+        self._sum = 0
+
+    def _added(self, value):
+        self._sum += value
+
+    def _removed(self, value):
+        self._sum -= value
+
+    def _recalculate(self):
+        self._sum = sum(self.state)
+
+    def _result(self):
+        return self._sum
+
+
+class rolling_mean(rolling_sum):
+    """
+    This stateful function calculates the mean over a moving window of a key.
+
+    Arguments:
+        key: the key to average
+        window: the size of the window
+        duration: instead of a number of rows, keep all rows with a timestamp less than
+                  `duration` before the current one. Can be a number of seconds or a `timedelta`.
+        time_key: the key with the timestamp, which must be sorted, required with `duration`.
+                  Timestamps can be a `datetime`, seconds since the epoch or an ISO formatted string.
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import rolling_mean
+
+    list_dicts = [{'a': 1}, {'a': 2}, {'a': 3}, {'a': 4}]
+
+    result = Clumper(list_dicts).mutate(m=rolling_mean(window=2, key='a'))
+    assert [d['m'] for d in result] == [1, 1.5, 2.5, 3.5]
+    ```
+    """
+
+    def _result(self):
+        return self._sum / len(self.state)
+
+
+class rolling_count(_RollingWindow):
+    """
+    This stateful function counts the rows in a moving window. This is mostly
+    useful for time based windows, where the number of rows varies.
+
+    Arguments:
+        window: the size of the window
+        duration: instead of a number of rows, keep all rows with a timestamp less than
+                  `duration` before the current one. Can be a number of seconds or a `timedelta`.
+        time_key: the key with the timestamp, which must be sorted, required with `duration`.
+                  Timestamps can be a `datetime`, seconds since the epoch or an ISO formatted string.
+
+    Usage:
+
+    ```python
+    from datetime import datetime, timedelta
+    from clumper import Clumper
+    from clumper.sequence import rolling_count
+
+    events = [
+        {'ts': datetime(2021, 1, 1, 10, 0)},
+        {'ts': datetime(2021, 1, 1, 10, 3)},
+        {'ts': datetime(2021, 1, 1, 10, 4)},
+        {'ts': datetime(2021, 1, 1, 10, 8)},
+    ]
+
+    counter = rolling_count(duration=timedelta(minutes=5), time_key='ts')
+    result = Clumper(events).mutate(n=counter)
+    assert [d['n'] for d in result] == [1, 2, 3, 2]
+    ```
+    """
+
+    def _result(self):
+        return len(self.state)
+
+
+class rolling_std(_RollingWindow):
+    """
+    This stateful function calculates the sample standard deviation over a moving
+    window of a key. The first row in the window gives `None`.
+
+    Arguments:
+        key: the key to use
+        window: the size of the window
+        duration: instead of a number of rows, keep all rows with a timestamp less than
+                  `duration` before the current one. Can be a number of seconds or a `timedelta`.
+        time_key: the key with the timestamp, which must be sorted, required with `duration`.
+                  Timestamps can be a `datetime`, seconds since the epoch or an ISO formatted string.
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import rolling_std
 
+    list_dicts = [{'a': 1}, {'a': 3}, {'a': 5}, {'a': 5}]
 
-class expanding:
+    result = Clumper(list_dicts).mutate(s=rolling_std(window=2, key='a'))
+    assert [d['s'] for d in result] == [None, 2 ** 0.5, 2 ** 0.5, 0]
+    ```
+    """
+
+    def _clear(self):
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _added(self, value):
+        # Welford's update, which is more stable than keeping a sum of squares.
+        n = len(self.state)
+        delta = value - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (value - self._mean)
+
+    def _removed(self, value):
+        n = len(self.state)
+        delta = value - self._mean
+        self._mean -= delta / n
+        self._m2 -= delta * (value - self._mean)
+
+    def _recalculate(self):
+        if len(self.state) > 0:
+            self._mean = sum(self.state) / len(self.state)
+            self._m2 = sum((v - self._mean) ** 2 for v in self.state)
+
+    def _result(self):
+        if len(self.state) < 2:
+            return None
+        return sqrt(max(self._m2, 0.0) / (len(self.state) - 1))
+
+
+class rolling_max(_RollingWindow):
+    """
+    This stateful function calculates the maximum over a moving window of a key.
+    It keeps a monotonic queue of candidates, so each row costs amortised O(1).
+
+    Arguments:
+        key: the key to use
+        window: the size of the window
+        duration: instead of a number of rows, keep all rows with a timestamp less than
+                  `duration` before the current one. Can be a number of seconds or a `timedelta`.
+        time_key: the key with the timestamp, which must be sorted, required with `duration`.
+                  Timestamps can be a `datetime`, seconds since the epoch or an ISO formatted string.
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import rolling_max
+
+    list_dicts = [{'a': 3}, {'a': 1}, {'a': 2}, {'a': 0}]
+
+    result = Clumper(list_dicts).mutate(m=rolling_max(window=2, key='a'))
+    assert [d['m'] for d in result] == [3, 3, 2, 2]
+    ```
+    """
+
+    def _dominates(self, old, new):
+        return old <= new
+
+    def _clear(self):
+        self._candidates = deque()
+
+    def _added(self, value):
+        # Values that can never be the answer again are removed from the back.
+        while self._candidates and self._dominates(self._candidates[-1][1], value):
+            self._candidates.pop()
+        self._candidates.append((self._n_seen, value))
+
+    def _removed(self, value):
+        removed_index = self._n_seen - len(self.state)
+        if self._candidates[0][0] == removed_index:
+            self._candidates.popleft()
+
+    def _result(self):
+        return self._candidates[0][1]
+
+
+class rolling_min(rolling_max):
+    """
+    This stateful function calculates the minimum over a moving window of a key.
+    It keeps a monotonic queue of candidates, so each row costs amortised O(1).
+
+    Arguments:
+        key: the key to use
+        window: the size of the window
+        duration: instead of a number of rows, keep all rows with a timestamp less than
+                  `duration` before the current one. Can be a number of seconds or a `timedelta`.
+        time_key: the key with the timestamp, which must be sorted, required with `duration`.
+                  Timestamps can be a `datetime`, seconds since the epoch or an ISO formatted string.
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import rolling_min
+
+    list_dicts = [{'a': 3}, {'a': 1}, {'a': 2}, {'a': 0}]
+
+    result = Clumper(list_dicts).mutate(m=rolling_min(window=2, key='a'))
+    assert [d['m'] for d in result] == [3, 1, 1, 0]
+    ```
+    """
+
+    def _dominates(self, old, new):
+        return old >= new
+
+
+class _ExpandingView(Sequence):
+    """
+    A read-only view on the first `n` values of a list that only grows. This
+    allows `expanding` to hand out the history without copying it for every row.
+    """
+
+    def __init__(self, values, n):
+        self._values = values
+        self._n = n
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._values[j] for j in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("expanding view index out of range")
+        return self._values[i]
+
+    def __iter__(self):
+        return iter(self._values[: self._n])
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, Sequence)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self._values[: self._n])
+
+
+class expanding(_Stateful):
     """
     This stateful function can be used to expand a key into a large list containing all the seen values.
 
@@ -95,6 +581,11 @@ class expanding:
 
     Arguments:
         key: the key to apply the smoothing to
+        view: if `True`, each row gets a read-only view on the values seen so far instead
+              of a new list. This prevents a copy of the full history for every row. If you
+              only need a summary of the history, consider the `cum<summary>` functions.
+              A view is not a list, so turn it into one before you write the rows to a
+              file, for example via `.mutate(r=lambda d: list(d['r']))`.
 
     Usage:
 
@@ -112,153 +603,1015 @@ class expanding:
     (Clumper(list_dicts)
       .mutate(r=expanding(key='a'))
       .collect())
+
+    result = Clumper(list_dicts).mutate(r=expanding(key='a', view=True))
+    assert result.collect()[2]['r'] == [1, 2, 3]
+
+    # Views need to become lists before they can be written to json.
+    result = result.mutate(r=lambda d: list(d['r']))
+    assert result.collect()[2]['r'] == [1, 2, 3]
     ```
     """
 
-    def __init__(self, key=None):
+    def __init__(self, key=None, view=False):
         self.state = []
         self.key = key
+        self.view = view
 
-    def _apply_key(self, new):
-        if isinstance(self.key, str):
-            return new[self.key]
-        if isinstance(self.key, Callable):
-            return self.key(new)
+    def _initial_state(self):
+        return []
+
+    def get_state(self):
+        """Returns all the values seen so far."""
+        return list(self.state)
+
+    def set_state(self, state):
+        """Resumes as if the values in `state` were seen before."""
+        self.state = list(state)
+
+    def combine(self, left, right):
+        """Concatenates the values of both chunks."""
+        return list(left) + list(right)
 
     def __call__(self, new):
+        if self.view:
+            # Appending is safe because each view only looks at the values before it.
+            self.state.append(self._apply_key(new))
+            return _ExpandingView(self.state, len(self.state))
         self.state = self.state + [self._apply_key(new)]
         return self.state
 
 
-class smoothing:
+class cumsum(_Stateful):
     """
-    This stateful function can be used to calculate row numbers. Uses exponential smoothing.
-
-    ![](../img/smoothing.png)
+    This stateful function calculates the cumulative sum of a key.
 
     Arguments:
-        key: the key to apply the smoothing to
-        weight: exponential smoothing parameter, if 1.0 then we don't listen to the past anymore
+        key: the key to sum
 
     Usage:
 
     ```python
     from clumper import Clumper
-    from clumper.sequence import smoothing
+    from clumper.sequence import cumsum
 
-    list_dicts = [
-        {'a': 1, 'b': 2},
-        {'a': 2, 'b': 3},
-        {'a': 3},
-        {'a': 4}
-    ]
+    list_dicts = [{'a': 1}, {'a': 2}, {'a': 3}, {'a': 4}]
 
-    (Clumper(list_dicts)
-      .mutate(s1=smoothing(key='a', weight=0.5),
-              s2=smoothing(key='a', weight=0.9))
-      .collect())
+    result = Clumper(list_dicts).mutate(s=cumsum(key='a'))
+    assert [d['s'] for d in result] == [1, 3, 6, 10]
     ```
     """
 
-    def __init__(self, key=None, weight=0.5):
+    def __init__(self, key=None):
         self.key = key
-        self.state = None
-        if (weight < 0) | (weight > 1):
-            raise ValueError(
-                f"The `weight` param for `smoothing` needs to be in [0, 1]. Got: {weight}."
-            )
-        self.weight = weight
+        self.reset()
 
-    def _apply_key(self, new):
-        if isinstance(self.key, str):
-            return new[self.key]
-        if isinstance(self.key, Callable):
-            return self.key(new)
+    def _initial_state(self):
+        return 0
+
+    def get_state(self):
+        """Returns the sum so far."""
+        return self.state
+
+    def set_state(self, state):
+        """Continues summing from `state`."""
+        self.state = state
+
+    def combine(self, left, right):
+        """Adds the sums of two chunks."""
+        return left + right
 
     def __call__(self, new):
-        new = self._apply_key(new)
-        if not self.state:
-            self.state = new
-        self.state = self.state * (1 - self.weight) + new * self.weight
+        self.state += self._apply_key(new)
         return self.state
 
 
-class impute:
+class cummean(_Stateful):
     """
-    This stateful function can be used to calculate row numbers. Uses exponential smoothing.
+    This stateful function calculates the cumulative mean of a key.
 
     Arguments:
-        key: the key to apply the smoothing to
-        strategy: the strategy to apply
-        fallback: if the strategy fails, what value to use
+        key: the key to average
 
     Usage:
 
     ```python
     from clumper import Clumper
-    from clumper.sequence import impute
-
-    list_dicts = [
-        {'a': 1, 'b': 2},
-        {'a': 2, 'b': 3},
-        {'a': 3},
-        {'a': 4, 'b': 6},
-        {'a': 5},
-    ]
+    from clumper.sequence import cummean
 
-    (Clumper(list_dicts)
-      .mutate(b=impute('b', strategy='prev'),
-              c=lambda d: d['a'] + d['b'])
-      .collect())
+    list_dicts = [{'a': 1}, {'a': 2}, {'a': 3}, {'a': 4}]
 
-    (Clumper(list_dicts)
-      .mutate(b=impute('b', strategy='value', fallback=0))
-      .collect())
+    result = Clumper(list_dicts).mutate(m=cummean(key='a'))
+    assert [d['m'] for d in result] == [1, 1.5, 2, 2.5]
     ```
     """
 
-    def __init__(self, key, strategy="prev", fallback=None):
+    def __init__(self, key=None):
         self.key = key
-        self.strategy = strategy
-        allowed_strategies = ["prev", "value"]
-        if strategy not in allowed_strategies:
-            raise ValueError(
-                f"`impute` only allows {allowed_strategies} as strategies, got: '{strategy}'.'"
-            )
-        self.fallback = fallback
-        self.state = None
+        self.reset()
 
-    def _grab_key(self, new):
-        if isinstance(self.key, str):
-            return new[self.key]
-        if isinstance(self.key, Callable):
-            return self.key(new)
+    def _initial_state(self):
+        return 0, 0
+
+    def get_state(self):
+        """Returns a `(count, sum)`-tuple."""
+        return self._n, self.state
+
+    def set_state(self, state):
+        """Resumes from a `(count, sum)`-tuple."""
+        self._n, self.state = state
+
+    def combine(self, left, right):
+        """Adds the counts and sums of two chunks."""
+        return left[0] + right[0], left[1] + right[1]
+
+    def __call__(self, new):
+        self._n += 1
+        self.state += self._apply_key(new)
+        return self.state / self._n
+
+
+class cummax(_Stateful):
+    """
+    This stateful function calculates the cumulative maximum of a key.
+
+    Arguments:
+        key: the key to use
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import cummax
+
+    list_dicts = [{'a': 2}, {'a': 1}, {'a': 3}, {'a': 0}]
+
+    result = Clumper(list_dicts).mutate(m=cummax(key='a'))
+    assert [d['m'] for d in result] == [2, 2, 3, 3]
+    ```
+    """
+
+    _pick = staticmethod(max)
+
+    def __init__(self, key=None):
+        self.key = key
+        self.reset()
+
+    def _initial_state(self):
+        return None
+
+    def get_state(self):
+        """Returns the value so far, `None` if nothing has been seen."""
+        return self.state
+
+    def set_state(self, state):
+        """Resumes from `state`."""
+        self.state = state
+
+    def combine(self, left, right):
+        """Picks the value of the two chunks."""
+        if left is None or right is None:
+            return right if left is None else left
+        return self._pick(left, right)
+
+    def __call__(self, new):
+        self.state = self.combine(self.state, self._apply_key(new))
+        return self.state
+
+
+class cummin(cummax):
+    """
+    This stateful function calculates the cumulative minimum of a key.
+
+    Arguments:
+        key: the key to use
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import cummin
+
+    list_dicts = [{'a': 2}, {'a': 1}, {'a': 3}, {'a': 0}]
+
+    result = Clumper(list_dicts).mutate(m=cummin(key='a'))
+    assert [d['m'] for d in result] == [2, 1, 1, 0]
+    ```
+    """
+
+    _pick = staticmethod(min)
+
+
+class cumcount(_Stateful):
+    """
+    This stateful function counts the rows seen so far. If a key is given
+    it only counts the rows where that key is present and not `None`.
+
+    Arguments:
+        key: the key to count, if `None` all rows are counted
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import cumcount
+
+    list_dicts = [{'a': 2}, {'b': 1}, {'a': 3}, {'a': None}]
+
+    result = Clumper(list_dicts).mutate(n=cumcount(key='a'))
+    assert [d['n'] for d in result] == [1, 1, 2, 2]
+    ```
+    """
+
+    def __init__(self, key=None):
+        self.key = key
+        self.reset()
+
+    def _initial_state(self):
+        return 0
+
+    def get_state(self):
+        """Returns the count so far."""
+        return self.state
+
+    def set_state(self, state):
+        """Continues counting from `state`."""
+        self.state = state
+
+    def combine(self, left, right):
+        """Adds the counts of two chunks."""
+        return left + right
+
+    def __call__(self, new):
+        if self.key is None:
+            self.state += 1
+        elif isinstance(self.key, str):
+            self.state += new.get(self.key) is not None
+        else:
+            self.state += self._apply_key(new) is not None
+        return self.state
+
+
+class cumvar(_Stateful):
+    """
+    This stateful function calculates the cumulative sample variance of a key.
+    The first row gives `None`.
+
+    Arguments:
+        key: the key to use
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import cumvar
+
+    list_dicts = [{'a': 1}, {'a': 3}, {'a': 5}]
+
+    result = Clumper(list_dicts).mutate(v=cumvar(key='a'))
+    assert [d['v'] for d in result] == [None, 2, 4]
+    ```
+    """
+
+    def __init__(self, key=None):
+        self.key = key
+        self.reset()
+
+    def _initial_state(self):
+        return 0, 0.0, 0.0
+
+    def get_state(self):
+        """Returns a `(count, mean, sum of squared differences)`-tuple."""
+        return self._n, self._mean, self.state
+
+    def set_state(self, state):
+        """Resumes from a `(count, mean, sum of squared differences)`-tuple."""
+        self._n, self._mean, self.state = state
+
+    def combine(self, left, right):
+        """Combines two chunks with the parallel variant of Welford's algorithm."""
+        n_l, mean_l, m2_l = left
+        n_r, mean_r, m2_r = right
+        n = n_l + n_r
+        if n == 0:
+            return left
+        delta = mean_r - mean_l
+        return n, mean_l + delta * n_r / n, m2_l + m2_r + delta**2 * n_l * n_r / n
+
+    def __call__(self, new):
+        value = self._apply_key(new)
+        self._n += 1
+        delta = value - self._mean
+        self._mean += delta / self._n
+        self.state += delta * (value - self._mean)
+        return self.state / (self._n - 1) if self._n > 1 else None
+
+
+class smoothing(_Stateful):
+    """
+    This stateful function can be used to calculate row numbers. Uses exponential smoothing.
+
+    ![](../img/smoothing.png)
+
+    Arguments:
+        key: the key to apply the smoothing to
+        weight: exponential smoothing parameter, if 1.0 then we don't listen to the past anymore
+
+    Results that are combined from checkpoints, like in parallel `mutate` calls, add
+    up the same terms in a different order. They can differ from a single pass in the
+    last digits.
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import smoothing
+
+    list_dicts = [
+        {'a': 1, 'b': 2},
+        {'a': 2, 'b': 3},
+        {'a': 3},
+        {'a': 4}
+    ]
+
+    (Clumper(list_dicts)
+      .mutate(s1=smoothing(key='a', weight=0.5),
+              s2=smoothing(key='a', weight=0.9))
+      .collect())
+    ```
+    """
+
+    def __init__(self, key=None, weight=0.5):
+        self.key = key
+        if (weight < 0) | (weight > 1):
+            raise ValueError(
+                f"The `weight` param for `smoothing` needs to be in [0, 1]. Got: {weight}."
+            )
+        self.weight = weight
+        self.reset()
+
+    def _initial_state(self):
+        return None, 1.0, None
+
+    def get_state(self):
+        """
+        Returns a tuple with the smoothed value, the total decay `(1 - weight) ** n`
+        and the first value that was seen. The last two allow us to combine chunks.
+        """
+        return self.state, self._decay, self._first
+
+    def set_state(self, state):
+        """Resumes from a `(value, decay, first)`-tuple."""
+        self.state, self._decay, self._first = state
+
+    def combine(self, left, right):
+        """
+        When a chunk starts from a smoothed value `s` instead of nothing, its end
+        result shifts by `(s - first) * decay`.
+        """
+        value_l, decay_l, first_l = left
+        value_r, decay_r, first_r = right
+        if value_l is None:
+            return right
+        if value_r is None:
+            return left
+        return value_r + (value_l - first_r) * decay_r, decay_l * decay_r, first_l
+
+    def __call__(self, new):
+        new = self._apply_key(new)
+        if self.state is None:
+            self.state = new
+        if self._first is None:
+            self._first = new
+        self.state = self.state * (1 - self.weight) + new * self.weight
+        self._decay *= 1 - self.weight
+        return self.state
+
+
+_MISSING = object()
+
+
+def _check_strategy(strategy):
+    """Raises an error for a strategy that `impute` doesn't know about."""
+    if strategy not in impute.allowed_strategies:
+        raise ValueError(
+            f"`impute` only allows {impute.allowed_strategies} as strategies, got: '{strategy}'."
+        )
+
+
+def _fill_gaps(values, strategy, fallback):
+    """
+    Fills the `_MISSING` entries in a list of values. The first pass finds the
+    positions of the present values, the second pass fills each gap between them
+    at once. Returns a new list.
+    """
+    present = [i for i, v in enumerate(values) if v is not _MISSING]
+    filled = list(values)
+    if len(present) == len(values):
+        return filled
+    if len(present) == 0:
+        return [fallback] * len(values)
+    bounds = [None] + present + [None]
+    for prev_i, next_i in zip(bounds, bounds[1:]):
+        start = 0 if prev_i is None else prev_i + 1
+        stop = len(values) if next_i is None else next_i
+        if start == stop:
+            continue
+        prev_v = fallback if prev_i is None else values[prev_i]
+        next_v = fallback if next_i is None else values[next_i]
+        if strategy == "value":
+            filled[start:stop] = [fallback] * (stop - start)
+        elif strategy == "prev":
+            filled[start:stop] = [prev_v] * (stop - start)
+        elif strategy == "next":
+            filled[start:stop] = [next_v] * (stop - start)
+        elif strategy == "nearest":
+            for i in range(start, stop):
+                if next_i is None or (prev_i is not None and i - prev_i <= next_i - i):
+                    filled[i] = prev_v
+                else:
+                    filled[i] = next_v
+        elif prev_i is None or next_i is None:
+            filled[start:stop] = [fallback] * (stop - start)
+        else:
+            step = (next_v - prev_v) / (next_i - prev_i)
+            for i in range(start, stop):
+                filled[i] = prev_v + step * (i - prev_i)
+    return filled
+
+
+class impute(_Stateful):
+    """
+    This function fills in the values of a key when it is missing from a row.
+
+    The `prev` and `value` strategies handle one row at a time. The other strategies
+    need to look ahead, so they are applied to all the rows (of a group) at once.
+
+    Arguments:
+        key: the key to impute
+        strategy: the strategy to apply, one of;
+            - `prev`: use the previous value that was present
+            - `next`: use the next value that is present
+            - `nearest`: use the closest present value, preferring the previous one on a tie
+            - `linear`: interpolate linearly between the previous and next value
+            - `value`: use the `fallback` value
+        fallback: if the strategy fails, what value to use
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import impute
+
+    list_dicts = [
+        {'a': 1, 'b': 2},
+        {'a': 2, 'b': 3},
+        {'a': 3},
+        {'a': 4, 'b': 6},
+        {'a': 5},
+    ]
+
+    (Clumper(list_dicts)
+      .mutate(b=impute('b', strategy='prev'),
+              c=lambda d: d['a'] + d['b'])
+      .collect())
+
+    (Clumper(list_dicts)
+      .mutate(b=impute('b', strategy='value', fallback=0))
+      .collect())
+
+    result = Clumper(list_dicts).mutate(b=impute('b', strategy='linear'))
+    assert [d['b'] for d in result] == [2, 3, 4.5, 6, None]
+    ```
+    """
+
+    allowed_strategies = ["prev", "next", "nearest", "linear", "value"]
+
+    def __init__(self, key, strategy="prev", fallback=None):
+        self.key = key
+        self.strategy = strategy
+        _check_strategy(strategy)
+        self.needs_all_rows = strategy not in ["prev", "value"]
+        self.fallback = fallback
+        self.reset()
+
+    def _initial_state(self):
+        return False, None
+
+    def get_state(self):
+        """Returns a tuple that says if a value has been seen and what the last value was."""
+        return self._seen, self.state
+
+    def set_state(self, state):
+        """Resumes from a `(seen, value)`-tuple."""
+        self._seen, self.state = state
+
+    def combine(self, left, right):
+        """The last seen value of the right chunk wins, if it saw one."""
+        return right if right[0] else left
+
+    def _lookup(self, new):
+        """Returns the value of the key, or `_MISSING` if the key is not there."""
+        if isinstance(self.key, str):
+            return new.get(self.key, _MISSING)
+        if isinstance(self.key, Callable):
+            try:
+                return self.key(new)
+            except KeyError:
+                return _MISSING
         raise ValueError(
             f"The `imputer` saw {new} and could not apply key: {self.key}."
         )
 
-    def _is_missing(self, new):
-        try:
-            _ = self._grab_key(new)
-            return False
-        except KeyError:
-            return True
+    def evaluate(self, rows):
+        """Imputes the missing values for a list of rows at once."""
+        if not self.needs_all_rows:
+            return super().evaluate(rows)
+        return _fill_gaps([self._lookup(d) for d in rows], self.strategy, self.fallback)
 
-    def _handle_missing(self):
-        if self.strategy == "prev":
-            return self.fallback if not self.state else self.state
-        if self.strategy == "value":
+    def __call__(self, new):
+        if self.needs_all_rows:
+            raise ValueError(
+                f"The `{self.strategy}` strategy needs to see all rows, it can only be used in `mutate` or `over`."
+            )
+        value = self._lookup(new)
+        if value is _MISSING:
+            if self.strategy == "prev" and self._seen:
+                return self.state
             return self.fallback
-
-    def _update(self, new):
         if self.strategy == "prev":
-            self.state = self._grab_key(new)
+            self._seen, self.state = True, value
+        return value
+
+
+class lag(_Stateful):
+    """
+    This stateful function returns the value of a key from `n` rows earlier.
+    It keeps the last `n` values in a ring buffer.
+
+    Arguments:
+        key: the key to look up
+        n: how many rows to look back
+        default: the value to use when there is no earlier row
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import lag
+
+    list_dicts = [{'a': 1}, {'a': 2}, {'a': 4}, {'a': 7}]
+
+    result = Clumper(list_dicts).mutate(prev=lag('a'),
+                                        diff=lambda d: d['a'] - d['prev'] if d['prev'] else None)
+    assert [d['prev'] for d in result] == [None, 1, 2, 4]
+    assert [d['diff'] for d in result] == [None, 1, 2, 3]
+    ```
+    """
+
+    def __init__(self, key, n=1, default=None):
+        if n < 1:
+            raise ValueError(f"`lag` needs `n` to be at least 1, got: {n}.")
+        self.key = key
+        self.n = n
+        self.default = default
+        self.reset()
+
+    def _initial_state(self):
+        return []
+
+    def get_state(self):
+        """Returns the last `n` values."""
+        return list(self.state)
+
+    def set_state(self, state):
+        """Resumes with the values of `state` in the buffer."""
+        self.state = deque(state, maxlen=self.n)
+
+    def combine(self, left, right):
+        """Only the last `n` values of both chunks matter."""
+        return (list(left) + list(right))[-self.n :]
+
+    def __call__(self, new):
+        result = self.state[0] if len(self.state) == self.n else self.default
+        self.state.append(self._apply_key(new))
+        return result
+
+
+class _Lookahead:
+    """
+    Base class for functions that need to see the rows that follow the current one.
+    They can't work on one row at a time, so `mutate` hands them all rows via `evaluate`.
+    """
+
+    needs_all_rows = True
+
+    def reset(self):
+        """These functions don't keep state between calls to `evaluate`."""
+        pass
+
+    def evaluate(self, rows):
+        """Applies the function to a list of rows, in order, and returns a list with the results."""
+        raise NotImplementedError
 
     def __call__(self, new):
-        if self._is_missing(new):
-            return self._handle_missing()
-        self._update(new)
-        return self._grab_key(new)
+        raise ValueError(
+            f"`{type(self).__name__}` needs to see all rows, it can only be used in `mutate` or `over`."
+        )
+
+    def _apply_key(self, new):
+        if isinstance(self.key, str):
+            return new[self.key]
+        if isinstance(self.key, Callable):
+            return self.key(new)
+
+
+class lead(_Lookahead):
+    """
+    This function returns the value of a key from `n` rows later. Because it
+    needs to look ahead, it sees all the rows (of a group or partition) at once.
+
+    Arguments:
+        key: the key to look up
+        n: how many rows to look ahead
+        default: the value to use when there is no later row
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import lead, over
+
+    list_dicts = [
+        {'grp': 'a', 'a': 1},
+        {'grp': 'b', 'a': 2},
+        {'grp': 'a', 'a': 4},
+        {'grp': 'b', 'a': 7},
+    ]
+
+    result = Clumper(list_dicts).mutate(nxt=lead('a', default=0))
+    assert [d['nxt'] for d in result] == [2, 4, 7, 0]
+
+    result = Clumper(list_dicts).group_by('grp').mutate(nxt=lead('a', default=0))
+    assert result.equals([
+        {'grp': 'a', 'a': 1, 'nxt': 4},
+        {'grp': 'a', 'a': 4, 'nxt': 0},
+        {'grp': 'b', 'a': 2, 'nxt': 7},
+        {'grp': 'b', 'a': 7, 'nxt': 0},
+    ])
+
+    result = Clumper(list_dicts).mutate(nxt=over(lead('a'), partition_by='grp'))
+    assert [d['nxt'] for d in result] == [4, 7, None, None]
+    ```
+    """
+
+    def __init__(self, key, n=1, default=None):
+        if n < 1:
+            raise ValueError(f"`lead` needs `n` to be at least 1, got: {n}.")
+        self.key = key
+        self.n = n
+        self.default = default
+
+    def evaluate(self, rows):
+        """Looks up the value `n` rows ahead for every row."""
+        values = [self._apply_key(d) for d in rows]
+        return values[self.n :] + [self.default] * min(self.n, len(values))
+
+
+class _Ranking(_Lookahead):
+    """
+    Base class for the ranking functions. The rows are sorted once by the key,
+    after which the ranks are written back to the original position of each row.
+    """
+
+    def __init__(self, key, descending=False):
+        self.key = key
+        self.descending = descending
+
+    def _tied_runs(self, rows):
+        """Yields the start position and row indices of each run of tied values, in sorted order."""
+        values = [self._apply_key(d) for d in rows]
+        order = sorted(
+            range(len(values)), key=values.__getitem__, reverse=self.descending
+        )
+        start = 0
+        while start < len(order):
+            stop = start + 1
+            while stop < len(order) and values[order[stop]] == values[order[start]]:
+                stop += 1
+            yield start, order[start:stop]
+            start = stop
+
+
+class rank(_Ranking):
+    """
+    This function ranks the rows by a key. The lowest value gets rank 1, unless
+    `descending=True`. Use it with `group_by` or `over` to rank within groups.
+
+    Arguments:
+        key: the key to rank by
+        descending: if `True` the highest value gets rank 1
+        ties: how to rank tied values, either `min`, `max`, `average` or `first`.
+              The `first` option ranks ties in the order in which they appear.
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import rank
+
+    list_dicts = [
+        {'grp': 'a', 'score': 3},
+        {'grp': 'a', 'score': 7},
+        {'grp': 'a', 'score': 3},
+        {'grp': 'b', 'score': 5},
+        {'grp': 'b', 'score': 1},
+    ]
+
+    result = Clumper(list_dicts).mutate(r=rank('score'), r_avg=rank('score', ties='average'))
+    assert [d['r'] for d in result] == [2, 5, 2, 4, 1]
+    assert [d['r_avg'] for d in result] == [2.5, 5, 2.5, 4, 1]
+
+    top_per_group = (Clumper(list_dicts)
+      .group_by('grp')
+      .mutate(r=rank('score', descending=True, ties='first'))
+      .keep(lambda d: d['r'] == 1))
+    assert top_per_group.equals([
+        {'grp': 'a', 'score': 7, 'r': 1},
+        {'grp': 'b', 'score': 5, 'r': 1},
+    ])
+    ```
+    """
+
+    allowed_ties = ["min", "max", "average", "first"]
+
+    def __init__(self, key, descending=False, ties="min"):
+        super().__init__(key=key, descending=descending)
+        if ties not in self.allowed_ties:
+            raise ValueError(
+                f"`rank` only allows {self.allowed_ties} as ties, got: '{ties}'."
+            )
+        self.ties = ties
+
+    def evaluate(self, rows):
+        """Calculates the rank of every row."""
+        ranks = [None] * len(rows)
+        for start, idx in self._tied_runs(rows):
+            for offset, i in enumerate(idx):
+                if self.ties == "min":
+                    ranks[i] = start + 1
+                elif self.ties == "max":
+                    ranks[i] = start + len(idx)
+                elif self.ties == "average":
+                    ranks[i] = start + (len(idx) + 1) / 2
+                else:
+                    ranks[i] = start + offset + 1
+        return ranks
+
+
+class dense_rank(_Ranking):
+    """
+    This function ranks the rows by a key without gaps; tied values share a rank
+    and the next value gets the next rank.
+
+    Arguments:
+        key: the key to rank by
+        descending: if `True` the highest value gets rank 1
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import dense_rank
+
+    list_dicts = [{'score': 3}, {'score': 7}, {'score': 3}, {'score': 5}]
+
+    result = Clumper(list_dicts).mutate(r=dense_rank('score'))
+    assert [d['r'] for d in result] == [1, 3, 1, 2]
+    ```
+    """
+
+    def evaluate(self, rows):
+        """Calculates the dense rank of every row."""
+        ranks = [None] * len(rows)
+        for dense, (_, idx) in enumerate(self._tied_runs(rows)):
+            for i in idx:
+                ranks[i] = dense + 1
+        return ranks
+
+
+class percent_rank(_Ranking):
+    """
+    This function calculates the relative rank of each row, `(rank - 1) / (n_rows - 1)`,
+    where tied values get the lowest rank. The result lies between 0 and 1.
+
+    Arguments:
+        key: the key to rank by
+        descending: if `True` the highest value gets 0
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import percent_rank
+
+    list_dicts = [{'score': 3}, {'score': 7}, {'score': 3}, {'score': 5}, {'score': 9}]
+
+    result = Clumper(list_dicts).mutate(p=percent_rank('score'))
+    assert [d['p'] for d in result] == [0, 0.75, 0, 0.5, 1]
+    ```
+    """
+
+    def evaluate(self, rows):
+        """Calculates the percent rank of every row."""
+        ranks = [None] * len(rows)
+        denominator = max(len(rows) - 1, 1)
+        for start, idx in self._tied_runs(rows):
+            for i in idx:
+                ranks[i] = start / denominator
+        return ranks
+
+
+class ntile(_Ranking):
+    """
+    This function splits the rows into `n` buckets of (almost) equal size and
+    returns the bucket number, starting at 1. Tied values may end up in different buckets.
+
+    Arguments:
+        n: the number of buckets
+        key: the key to order by, if `None` the current order of the rows is used
+        descending: if `True` the highest values end up in the first bucket
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import ntile
+
+    list_dicts = [{'score': s} for s in [5, 1, 4, 2, 3]]
+
+    result = Clumper(list_dicts).mutate(q=ntile(2, key='score'))
+    assert [d['q'] for d in result] == [2, 1, 2, 1, 1]
+    ```
+    """
+
+    def __init__(self, n, key=None, descending=False):
+        if n < 1:
+            raise ValueError(f"`ntile` needs at least one bucket, got: {n}.")
+        super().__init__(key=key, descending=descending)
+        self.n = n
+
+    def evaluate(self, rows):
+        """Calculates the bucket of every row."""
+        if self.key is None:
+            order = list(range(len(rows)))
+        else:
+            values = [self._apply_key(d) for d in rows]
+            order = sorted(
+                range(len(rows)), key=values.__getitem__, reverse=self.descending
+            )
+        # Just like in SQL, the first `rest` buckets get one extra row.
+        size, rest = divmod(len(rows), self.n)
+        buckets = [None] * len(rows)
+        for position, i in enumerate(order):
+            if position < rest * (size + 1):
+                buckets[i] = position // (size + 1) + 1
+            else:
+                buckets[i] = rest + (position - rest * (size + 1)) // size + 1
+        return buckets
+
+
+def _as_keys(keys):
+    """Turns `None`, a single key or a list of keys into a tuple of keys."""
+    if keys is None:
+        return tuple()
+    if isinstance(keys, (list, tuple)):
+        return tuple(keys)
+    return (keys,)
+
+
+class over:
+    """
+    Applies a function from this module to each partition of the data separately,
+    in a specified order. The data is partitioned in a single pass, the function
+    is `reset()` at the start of every partition and the results are written back
+    to the original position of each row.
+
+    Arguments:
+        func: the function to apply. You can also pass the class, like `row_number`,
+              and a new instance will be created for every partition.
+        partition_by: key, or list of keys, that define the partitions
+        order_by: key, list of keys or function that defines the order within each partition
+        descending: if `True` the order within each partition is reversed
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.sequence import over, row_number, cumsum
+
+    list_dicts = [
+        {'grp': 'a', 't': 2, 'v': 1},
+        {'grp': 'b', 't': 1, 'v': 2},
+        {'grp': 'a', 't': 1, 'v': 3},
+        {'grp': 'b', 't': 2, 'v': 4},
+    ]
+
+    result = (Clumper(list_dicts)
+      .mutate(r=over(row_number(), partition_by='grp', order_by='t'),
+              s=over(cumsum(key='v'), partition_by='grp', order_by='t')))
+
+    assert [d['r'] for d in result] == [2, 1, 1, 2]
+    assert [d['s'] for d in result] == [4, 2, 3, 6]
+    ```
+    """
+
+    needs_all_rows = True
+
+    def __init__(self, func, partition_by=None, order_by=None, descending=False):
+        self.func = func
+        self.partition_by = _as_keys(partition_by)
+        self.order_by = order_by if callable(order_by) else _as_keys(order_by)
+        self.descending = descending
+
+    @property
+    def spec(self):
+        """The partition and order of this window, windows with the same spec share their layout."""
+        return self.partition_by, self.order_by, self.descending
+
+    def reads(self, key):
+        """Checks if the layout of this window depends on a key."""
+        return key in self.partition_by or (
+            not callable(self.order_by) and key in self.order_by
+        )
+
+    def reset(self):
+        """Resets the wrapped function. Classes are created anew for every partition anyway."""
+        if not isinstance(self.func, type) and hasattr(self.func, "reset"):
+            self.func.reset()
+
+    def layout(self, rows):
+        """Returns a list of partitions, each is a list of row indices in the right order."""
+        partitions = {}
+        for i, d in enumerate(rows):
+            partitions.setdefault(tuple(d[k] for k in self.partition_by), []).append(i)
+        if self.order_by == tuple():
+            return list(partitions.values())
+        if callable(self.order_by):
+            sort_keys = [self.order_by(d) for d in rows]
+        else:
+            sort_keys = [tuple(d[k] for k in self.order_by) for d in rows]
+        return [
+            sorted(idx, key=sort_keys.__getitem__, reverse=self.descending)
+            for idx in partitions.values()
+        ]
+
+    def _fresh_func(self):
+        if isinstance(self.func, type):
+            return self.func()
+        if hasattr(self.func, "reset"):
+            self.func.reset()
+        return self.func
+
+    def evaluate(self, rows, layout=None):
+        """Applies the function per partition and returns the results in the original row order."""
+        if layout is None:
+            layout = self.layout(rows)
+        results = [None] * len(rows)
+        for idx in layout:
+            func = self._fresh_func()
+            partition = [rows[i] for i in idx]
+            if hasattr(func, "evaluate"):
+                values = func.evaluate(partition)
+            else:
+                values = [func(d) for d in partition]
+            for i, value in zip(idx, values):
+                results[i] = value
+        return results
 
 
-__all__ = ("row_number", "rolling", "expanding", "impute")
+__all__ = (
+    "row_number",
+    "rolling",
+    "rolling_sum",
+    "rolling_mean",
+    "rolling_count",
+    "rolling_std",
+    "rolling_min",
+    "rolling_max",
+    "expanding",
+    "cumsum",
+    "cummean",
+    "cummax",
+    "cummin",
+    "cumcount",
+    "cumvar",
+    "impute",
+    "lag",
+    "lead",
+    "rank",
+    "dense_rank",
+    "percent_rank",
+    "ntile",
+    "over",
+)
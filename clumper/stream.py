@@ -0,0 +1,765 @@
+"""
+Functions that handle data as a stream of dictionaries instead of a collection.
+
+The readers in this module are generators, the stages accept an iterable of
+dictionaries and yield dictionaries and the writers consume an iterable. This
+allows you to process files that do not fit in memory, or data that is still
+being produced, with bounded memory.
+
+```python
+from clumper.stream import read_jsonl, write_jsonl, window_agg
+
+events = [{'t': i, 'user': i % 3} for i in range(10)]
+write_jsonl(events, '/tmp/events.jsonl')
+
+per_window = window_agg(read_jsonl('/tmp/events.jsonl'), time_key='t', size=5,
+                        n=('user', 'count'), users=('user', 'n_unique'))
+write_jsonl(per_window, '/tmp/per_window.jsonl')
+
+assert list(read_jsonl('/tmp/per_window.jsonl')) == [
+    {'window_start': 0, 'window_end': 5, 'n': 5, 'users': 3},
+    {'window_start': 5, 'window_end': 10, 'n': 5, 'users': 3},
+]
+```
+"""
+
+import hashlib
+import heapq
+import itertools as it
+import json
+import os
+import pathlib
+import pickle
+import random
+import tempfile
+import urllib.request
+from datetime import datetime, timedelta
+from glob import glob
+from math import exp, floor, log, log1p
+from statistics import median, stdev, variance
+
+from clumper.sequence import _MISSING, _as_keys, _to_seconds
+
+
+def _expand_paths(path):
+    """Turns a filename, url, `pathlib.Path`, wildcard or list of paths into a list of paths."""
+    if isinstance(path, (list, tuple)):
+        return [str(p) for p in path]
+    path = str(path)
+    if "*" not in path:
+        return [path]
+    paths = sorted(glob(path))
+    if len(paths) == 0:
+        raise ValueError(f"No files found given pattern : {path}")
+    return paths
+
+
+def _open(path):
+    """Opens a local file or a url for reading."""
+    if path.startswith("https:") or path.startswith("http:"):
+        return urllib.request.urlopen(path)  # nosec
+    return open(path)
+
+
+def _read_file(path, add_path):
+    """Lazily reads the dictionaries from a single jsonl file, skipping empty lines."""
+    with _open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            d = json.loads(line)
+            if add_path:
+                d["read_path"] = path
+            yield d
+
+
+def _check_sorted(items, get, ascending, path):
+    """Passes items along and raises an error as soon as they turn out not to be sorted."""
+    previous = _MISSING
+    for d in items:
+        value = get(d)
+        if previous is not _MISSING and (
+            value < previous if ascending else value > previous
+        ):
+            raise ValueError(
+                f"The file {path} is not sorted, found {value} after {previous}."
+            )
+        previous = value
+        yield d
+
+
+def read_jsonl(path, n=None, add_path=False, sorted_by=None, ascending=True):
+    """
+    Lazily reads the dictionaries from one or more jsonl files, one line at a time.
+
+    If the files are each sorted on a key, pass it as `sorted_by`. The files are then
+    merged into a single sorted stream, while only keeping one item per file in memory.
+    An error is raised when a file turns out not to be sorted.
+
+    Arguments:
+        path: filename, url, `pathlib.Path` or list of paths. Filenames can include a wildcard `*`,
+              the files that match are read in alphabetical order.
+        n: maximum number of lines to read, if `None` will read all
+        add_path: adds the name of the filepath to each dictionary under the `read_path` key
+        sorted_by: the key, or a function, that each file is sorted on
+        ascending: if the files are sorted from small to large, only used with `sorted_by`
+
+    Usage:
+
+    ```python
+    from clumper import Clumper
+    from clumper.stream import read_jsonl, write_jsonl
+
+    stream = read_jsonl('tests/data/cards.jsonl')
+    first = next(stream)
+
+    assert first == Clumper.read_jsonl('tests/data/cards.jsonl', n=1).collect()[0]
+
+    write_jsonl([{'ts': 1}, {'ts': 4}, {'ts': 5}], '/tmp/shard-1.jsonl')
+    write_jsonl([{'ts': 2}, {'ts': 3}, {'ts': 6}], '/tmp/shard-2.jsonl')
+
+    merged = read_jsonl('/tmp/shard-*.jsonl', sorted_by='ts')
+    assert [d['ts'] for d in merged] == [1, 2, 3, 4, 5, 6]
+    ```
+    """
+    if n is not None and n <= 0:
+        raise ValueError("Number of lines to read must be > 0.")
+    paths = _expand_paths(path)
+    if sorted_by is None:
+        items = it.chain.from_iterable(_read_file(p, add_path) for p in paths)
+    else:
+        get = _key_func(sorted_by)
+        shards = [
+            _check_sorted(_read_file(p, add_path), get, ascending, p) for p in paths
+        ]
+        items = heapq.merge(*shards, key=get, reverse=not ascending)
+    yield from it.islice(items, n)
+
+
+def write_jsonl(stream, path, mode="w", sort_keys=False, indent=None):
+    """
+    Writes the dictionaries of a stream to a jsonl file as they arrive and returns
+    the number of lines that were written.
+
+    Arguments:
+        stream: an iterable of dictionaries, like a `Clumper` or a generator
+        path: filename or `pathlib.Path` to write to
+        mode: `w` to overwrite the file, `a` to append to it or `x` to only write a new file
+        sort_keys: if true the keys of the dictionaries are sorted
+        indent: if a non-negative integer, the dictionaries are pretty-printed with that indent level
+
+    Usage:
+
+    ```python
+    from clumper.stream import read_jsonl, write_jsonl
+
+    stream = ({'a': i} for i in range(3))
+    assert write_jsonl(stream, '/tmp/stream.jsonl') == 3
+    assert list(read_jsonl('/tmp/stream.jsonl')) == [{'a': 0}, {'a': 1}, {'a': 2}]
+    ```
+    """
+    n_written = 0
+    with open(pathlib.Path(path), mode) as f:
+        for d in stream:
+            f.write(json.dumps(d, sort_keys=sort_keys, indent=indent) + "\n")
+            n_written += 1
+    return n_written
+
+
+def _write_run(items, tmpdir):
+    """Pickles a sorted run of items to a file in `tmpdir` and returns its path."""
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmpdir)
+    with os.fdopen(fd, "wb") as f:
+        pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+        for d in items:
+            pickler.dump(d)
+            # The memo would keep a reference to every item that was written.
+            pickler.clear_memo()
+    return path
+
+
+def _read_run(path):
+    """Lazily reads the items of a run that was written by `_write_run`."""
+    with open(path, "rb") as f:
+        unpickler = pickle.Unpickler(f)
+        while True:
+            try:
+                yield unpickler.load()
+            except EOFError:
+                return
+
+
+def external_sort(stream, key, reverse=False, run_size=100_000, tmpdir=None):
+    """
+    Sorts a stream that may be much larger than memory. The stream is cut into runs of
+    at most `run_size` items, every run is sorted in memory and written to a temporary
+    file in a binary format. The sorted runs are then merged back into a single stream,
+    keeping only one item per run in memory. The sort is stable and the temporary files
+    are removed once the stream is consumed or closed.
+
+    If the stream fits into a single run nothing is written to disk.
+
+    Arguments:
+        stream: an iterable of dictionaries, like a `Clumper` or a generator
+        key: the key, or a function, that gives the value to sort on
+        reverse: sort from large to small
+        run_size: the maximum number of items that are kept in memory
+        tmpdir: directory for the temporary files, defaults to the temporary directory of the system
+
+    Usage:
+
+    ```python
+    from clumper.stream import read_jsonl, write_jsonl, external_sort
+
+    write_jsonl(({'ts': (i * 37) % 100} for i in range(100)), '/tmp/unsorted.jsonl')
+
+    stream = external_sort(read_jsonl('/tmp/unsorted.jsonl'), key='ts', run_size=10)
+    write_jsonl(stream, '/tmp/sorted.jsonl')
+
+    assert [d['ts'] for d in read_jsonl('/tmp/sorted.jsonl')] == list(range(100))
+    ```
+    """
+    if not isinstance(run_size, int) or run_size <= 0:
+        raise ValueError(f"`run_size` must be a positive integer, got {run_size}")
+    get = _key_func(key)
+    items = iter(stream)
+    run = sorted(it.islice(items, run_size), key=get, reverse=reverse)
+    if len(run) < run_size:
+        yield from run
+        return
+    with tempfile.TemporaryDirectory(dir=tmpdir) as run_dir:
+        paths = []
+        while run:
+            paths.append(_write_run(run, run_dir))
+            run = sorted(it.islice(items, run_size), key=get, reverse=reverse)
+        yield from heapq.merge(*[_read_run(p) for p in paths], key=get, reverse=reverse)
+
+
+class _Count:
+    def __init__(self):
+        self.n = 0
+
+    def add(self, value):
+        self.n += 1
+
+    def result(self):
+        return self.n
+
+
+class _Sum:
+    def __init__(self):
+        self.total = 0
+
+    def add(self, value):
+        self.total += value
+
+    def result(self):
+        return self.total
+
+
+class _Mean(_Sum):
+    def __init__(self):
+        super().__init__()
+        self.n = 0
+
+    def add(self, value):
+        super().add(value)
+        self.n += 1
+
+    def result(self):
+        # Like `Clumper.mean`, a mean without values is `None`.
+        return self.total / self.n if self.n else None
+
+
+class _Extreme:
+    def __init__(self, pick):
+        self.pick, self.value, self.seen = pick, None, False
+
+    def add(self, value):
+        self.value = self.pick(self.value, value) if self.seen else value
+        self.seen = True
+
+    def result(self):
+        return self.value
+
+
+class _First(_Extreme):
+    def __init__(self):
+        super().__init__(lambda old, new: old)
+
+
+class _Last(_Extreme):
+    def __init__(self):
+        super().__init__(lambda old, new: new)
+
+
+class _Distinct:
+    def __init__(self, summary):
+        self.summary, self.values = summary, set()
+
+    def add(self, value):
+        self.values.add(value)
+
+    def result(self):
+        return self.summary(self.values)
+
+
+class _Collect:
+    """Fallback for summaries that need all the values, like the median or a custom function."""
+
+    def __init__(self, func):
+        self.func, self.values = func, []
+
+    def add(self, value):
+        self.values.append(value)
+
+    def result(self):
+        return self.func(self.values)
+
+
+_accumulators = {
+    "mean": _Mean,
+    "count": _Count,
+    "unique": lambda: _Distinct(list),
+    "n_unique": lambda: _Distinct(len),
+    "sum": _Sum,
+    "min": lambda: _Extreme(min),
+    "max": lambda: _Extreme(max),
+    "median": lambda: _Collect(median),
+    "var": lambda: _Collect(variance),
+    "std": lambda: _Collect(stdev),
+    "values": lambda: _Collect(list),
+    "first": _First,
+    "last": _Last,
+}
+
+
+def _accumulator_factory(func):
+    """Turns a summary name or function, as used in `Clumper.agg`, into an accumulator factory."""
+    if isinstance(func, str):
+        if func not in _accumulators.keys():
+            raise ValueError(
+                f"Passed `func` must be in {_accumulators.keys()}, got {func}."
+            )
+        return _accumulators[func]
+    return lambda: _Collect(func)
+
+
+def _as_seconds(duration):
+    """Turns a number of seconds or a `timedelta` into seconds."""
+    if isinstance(duration, timedelta):
+        return duration.total_seconds()
+    return duration
+
+
+def _time_formatter(value):
+    """
+    Returns a function that turns seconds back into the kind of timestamp
+    that is used in the stream, ISO strings are turned into datetimes.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        return lambda s: datetime.fromtimestamp(s, tz=value.tzinfo)
+    return lambda s: s
+
+
+def window_agg(stream, time_key, size, slide=None, lateness=0, by=None, **kwargs):
+    """
+    Aggregates a stream of dictionaries per window of event time and yields
+    a summary for each window as soon as it is finished.
+
+    The summaries are defined just like in `Clumper.agg`; `name=(key, func)` where
+    `func` is a function or one of `mean`, `count`, `unique`, `n_unique`, `sum`, `min`,
+    `max`, `median`, `values`, `var`, `std`, `first` or `last`. Summaries like `count`,
+    `sum` and `mean` are updated as the rows arrive, the others keep the values of
+    the window until it is finished.
+
+    Windows start at multiples of `slide`. Without a `slide` they do not overlap
+    (tumbling windows), with a `slide` smaller than `size` a row is part of multiple
+    windows (sliding windows). A window is finished once the stream contains a
+    timestamp that is `lateness` past the end of the window. Rows that arrive after
+    all of their windows are finished are dropped. At the end of the stream all
+    remaining windows are emitted.
+
+    Only the windows that are not yet finished are kept in memory.
+
+    Arguments:
+        stream: an iterable of dictionaries, like a `Clumper` or a generator
+        time_key: the key with the event time. Timestamps can be a `datetime`,
+                  seconds since the epoch or an ISO formatted string.
+        size: the length of a window, as a number of seconds or a `timedelta`
+        slide: the time between the start of two windows, defaults to `size`
+        lateness: how long to wait for rows that are out of order before a window is finished
+        by: key, or list of keys, to calculate separate summaries for
+        kwargs: keyword arguments that represent the aggregation, see `Clumper.agg`
+
+    The summaries contain a `window_start` and `window_end` key. They are datetimes if
+    the stream contains datetimes or ISO strings and numbers otherwise.
+
+    Usage:
+
+    ```python
+    from clumper.stream import window_agg
+
+    clicks = [
+        {'ts': 0, 'page': 'home', 'ms': 10},
+        {'ts': 20, 'page': 'docs', 'ms': 30},
+        {'ts': 70, 'page': 'home', 'ms': 20},
+        {'ts': 50, 'page': 'home', 'ms': 40},
+        {'ts': 130, 'page': 'docs', 'ms': 50},
+    ]
+
+    per_minute = window_agg(clicks, time_key='ts', size=60, lateness=30, by='page',
+                            n=('ms', 'count'), total=('ms', 'sum'))
+
+    assert list(per_minute) == [
+        {'window_start': 0, 'window_end': 60, 'page': 'home', 'n': 2, 'total': 50},
+        {'window_start': 0, 'window_end': 60, 'page': 'docs', 'n': 1, 'total': 30},
+        {'window_start': 60, 'window_end': 120, 'page': 'home', 'n': 1, 'total': 20},
+        {'window_start': 120, 'window_end': 180, 'page': 'docs', 'n': 1, 'total': 50},
+    ]
+    ```
+    """
+    size = _as_seconds(size)
+    slide = size if slide is None else _as_seconds(slide)
+    lateness = _as_seconds(lateness)
+    if size <= 0:
+        raise ValueError(f"`size` must be positive, got {size}.")
+    if slide <= 0 or slide > size:
+        raise ValueError(f"`slide` must be positive and at most `size`, got {slide}.")
+    if lateness < 0:
+        raise ValueError(f"`lateness` must not be negative, got {lateness}.")
+    by = _as_keys(by)
+    factories = {
+        name: (col, _accumulator_factory(func)) for name, (col, func) in kwargs.items()
+    }
+
+    # Open windows are kept per start, with the groups in order of appearance.
+    windows, starts = {}, []
+    watermark, fmt = None, None
+
+    def emit(start):
+        for group, accs in windows.pop(start).items():
+            res = {"window_start": fmt(start), "window_end": fmt(start + size)}
+            res.update(zip(by, group))
+            res.update({name: acc.result() for name, acc in accs.items()})
+            yield res
+
+    for d in stream:
+        if fmt is None:
+            fmt = _time_formatter(d[time_key])
+        t = _to_seconds(d[time_key])
+        group = tuple(d.get(k) for k in by)
+        start = floor(t / slide) * slide
+        while start > t - size:
+            if watermark is None or start + size > watermark:
+                if start not in windows:
+                    windows[start] = {}
+                    heapq.heappush(starts, start)
+                if group not in windows[start]:
+                    windows[start][group] = {
+                        name: factory() for name, (_, factory) in factories.items()
+                    }
+                accs = windows[start][group]
+                for name, (col, _) in factories.items():
+                    if col in d:
+                        accs[name].add(d[col])
+            start -= slide
+        if watermark is None or t - lateness > watermark:
+            watermark = t - lateness
+        while starts and starts[0] + size <= watermark:
+            yield from emit(heapq.heappop(starts))
+    while starts:
+        yield from emit(heapq.heappop(starts))
+
+
+def _open_unit(rng):
+    """Draws a random number strictly between zero and one, so it is safe to take its log."""
+    u = rng.random()
+    while u == 0.0:
+        u = rng.random()
+    return u
+
+
+def _weight_of(d, weights):
+    """Fetches the weight of an item, missing weights are an error and `None` counts as zero."""
+    if weights not in d:
+        raise KeyError(f"The weight key {weights} couldn't be found in the item {d}")
+    w = d[weights]
+    if w is None:
+        return 0
+    if w < 0:
+        raise ValueError("When weights is assigned, each row must have positive weight")
+    return w
+
+
+def _uniform_reservoir(items, n, rng):
+    """
+    Algorithm L by Li. Instead of drawing a random number for every item it
+    draws how many items to skip until the next one enters the reservoir.
+    """
+    reservoir = list(it.islice(items, n))
+    if len(reservoir) < n:
+        return reservoir
+    w = exp(log(_open_unit(rng)) / n)
+    while True:
+        skip = floor(log(_open_unit(rng)) / log1p(-w))
+        item = next(it.islice(items, skip, None), _MISSING)
+        if item is _MISSING:
+            return reservoir
+        reservoir[rng.randrange(n)] = item
+        w *= exp(log(_open_unit(rng)) / n)
+
+
+def _weighted_reservoir(items, n, weights, rng):
+    """
+    A-ExpJ by Efraimidis and Spirakis. Every item gets the key `log(u) / weight`
+    and the reservoir keeps the `n` largest keys in a heap. Instead of drawing a
+    key for every item, it draws how much weight to skip until the next item
+    enters the reservoir.
+    """
+    reservoir, counter = [], it.count()
+    for d in items:
+        w = _weight_of(d, weights)
+        if w > 0:
+            heapq.heappush(reservoir, (log(_open_unit(rng)) / w, next(counter), d))
+        if len(reservoir) == n:
+            break
+    jump = log(_open_unit(rng)) / reservoir[0][0] if len(reservoir) == n else None
+    for d in items:
+        w = _weight_of(d, weights)
+        jump -= w
+        if jump > 0 or w == 0:
+            continue
+        # The new key is drawn conditional on beating the smallest key.
+        t = exp(w * reservoir[0][0])
+        key = log(t + (1.0 - t) * _open_unit(rng)) / w
+        heapq.heapreplace(reservoir, (key, next(counter), d))
+        jump = log(_open_unit(rng)) / reservoir[0][0]
+    return [d for _, _, d in sorted(reservoir, reverse=True)]
+
+
+def reservoir_sample(stream, n, weights=None, random_state=None):
+    """
+    Samples `n` items from a stream in a single pass, without knowing the length
+    of the stream up front. Only the sample is kept in memory. If the stream contains
+    fewer than `n` items then all of them are returned.
+
+    Uniform samples use Algorithm L and weighted samples use the A-ExpJ algorithm
+    from Efraimidis and Spirakis. Both skip over most items without drawing random
+    numbers for them. Items are sampled without replacement.
+
+    Arguments:
+        stream: an iterable of dictionaries, like a `Clumper` or a generator
+        n: the number of items to sample
+        weights: key with the weight of each item, items with weight `0` or `None` are never sampled
+        random_state: seed for reproducible results, the global `random` module is not affected
+
+    Usage:
+
+    ```python
+    from clumper.stream import read_jsonl, reservoir_sample
+
+    sampled = reservoir_sample(read_jsonl('tests/data/cards*.jsonl'), n=3, random_state=42)
+    assert len(sampled) == 3
+
+    stream = ({'a': i, 'w': i % 2} for i in range(1000))
+    sampled = reservoir_sample(stream, n=10, weights='w', random_state=42)
+    assert all(d['w'] == 1 for d in sampled)
+    ```
+    """
+    if not isinstance(n, int) or n < 0:
+        raise ValueError(f"`n` must be a positive integer, got {n}")
+    if n == 0:
+        return []
+    rng = random.Random(random_state)
+    items = iter(stream)
+    if weights is None:
+        return _uniform_reservoir(items, n, rng)
+    return _weighted_reservoir(items, n, weights, rng)
+
+
+def _hash_fraction(d, key, salt=""):
+    """
+    Maps the value of `key` in a dictionary to a number in [0, 1) with a stable hash,
+    so the same value gives the same number across runs, processes and machines. The
+    `key` can be a key, a list of keys, a function or `None` to hash the whole item.
+    """
+    if key is None:
+        value = d
+    elif callable(key):
+        value = key(d)
+    elif isinstance(key, (list, tuple)):
+        value = [d[k] for k in key]
+    else:
+        value = d[key]
+    text = salt + json.dumps(value, sort_keys=True, default=str)
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+def _check_frac(frac):
+    """Checks that a fraction to split on is between 0 and 1."""
+    if not 0 <= frac <= 1:
+        raise ValueError(f"`frac` must be between 0 and 1, got {frac}")
+
+
+def _check_k(k):
+    """Checks that the number of folds is an integer of at least 2."""
+    if not isinstance(k, int) or k < 2:
+        raise ValueError(f"`k` must be an integer of at least 2, got {k}")
+
+
+def assign_split(stream, frac=0.8, key=None, name="split", salt=""):
+    """
+    Assigns every item of a stream to `train` or `test` by a stable hash of a key.
+    Items with the same key value always end up on the same side, also across runs,
+    machines and when more data is added.
+
+    Arguments:
+        stream: an iterable of dictionaries, like a `Clumper` or a generator
+        frac: the fraction of items that go to `train`
+        key: key, list of keys or function to hash, `None` hashes the whole item
+        name: the key to store the assignment in
+        salt: a string that is added to the hash, use a different salt for a different split
+
+    Usage:
+
+    ```python
+    from clumper.stream import assign_split
+
+    users = [{'user': i} for i in range(1000)]
+    result = list(assign_split(users, frac=0.8, key='user'))
+
+    assert {d['split'] for d in result} == {'train', 'test'}
+    assert result == list(assign_split(users, frac=0.8, key='user'))
+    ```
+    """
+    _check_frac(frac)
+    for d in stream:
+        side = "train" if _hash_fraction(d, key, salt) < frac else "test"
+        yield {**d, name: side}
+
+
+def assign_fold(stream, k=5, key=None, name="fold", salt=""):
+    """
+    Assigns every item of a stream to one of `k` folds, numbered from `0`, by a stable
+    hash of a key. Items with the same key value always end up in the same fold.
+
+    Arguments:
+        stream: an iterable of dictionaries, like a `Clumper` or a generator
+        k: the number of folds
+        key: key, list of keys or function to hash, `None` hashes the whole item
+        name: the key to store the fold in
+        salt: a string that is added to the hash, use a different salt for different folds
+
+    Usage:
+
+    ```python
+    from clumper.stream import assign_fold
+
+    result = list(assign_fold(({'user': i} for i in range(100)), k=3, key='user'))
+    assert {d['fold'] for d in result} == {0, 1, 2}
+    ```
+    """
+    _check_k(k)
+    for d in stream:
+        yield {**d, name: int(_hash_fraction(d, key, salt) * k)}
+
+
+class _Reversed:
+    """Wraps a value such that it compares the other way around, for heaps that keep the smallest values."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def _key_func(key):
+    """Turns a key or a function into a function that fetches the value to compare."""
+    if callable(key):
+        return key
+    return lambda d: d[key]
+
+
+def _select_k(stream, n, key, by, largest):
+    """
+    Keeps the `n` largest (or smallest) items per group in a bounded heap, in a single pass.
+    Returns a dictionary with the items per group, best first, with the groups in order
+    of appearance. Ties are broken by order of appearance, just like a stable sort.
+    Items that don't have the key are skipped.
+    """
+    if not isinstance(n, int) or n < 0:
+        raise ValueError(f"`n` must be a positive integer, got {n}")
+    by = _as_keys(by)
+    get = _key_func(key)
+    heaps = {}
+    for i, d in enumerate(stream):
+        if not callable(key) and key not in d:
+            continue
+        group = tuple(d.get(k) for k in by)
+        heap = heaps.setdefault(group, [])
+        entry = (get(d), -i) if largest else _Reversed((get(d), i))
+        if len(heap) < n:
+            heapq.heappush(heap, (entry, d))
+        elif n > 0 and heap[0][0] < entry:
+            heapq.heapreplace(heap, (entry, d))
+    return {
+        group: [d for _, d in sorted(heap, key=lambda e: e[0], reverse=True)]
+        for group, heap in heaps.items()
+    }
+
+
+def top_k(stream, n, key, by=None):
+    """
+    Returns the `n` items with the largest value for `key` from a stream, largest first.
+    This keeps a heap of `n` items, which takes O(N log n) time and O(n) memory, instead of
+    sorting all the items. Ties are broken by order of appearance and items without the key
+    are skipped.
+
+    Arguments:
+        stream: an iterable of dictionaries, like a `Clumper` or a generator
+        n: the number of items to keep, per group if `by` is given
+        key: the key, or a function, that gives the value to compare
+        by: key, or list of keys, to keep the top items for separately
+
+    Usage:
+
+    ```python
+    from clumper.stream import top_k
+
+    scores = ({'player': i % 3, 'score': (i * 7) % 10} for i in range(30))
+    best = top_k(scores, n=2, key='score', by='player')
+
+    assert [(d['player'], d['score']) for d in best] == [(0, 9), (0, 8), (1, 9), (1, 8), (2, 9), (2, 8)]
+    ```
+    """
+    return [d for items in _select_k(stream, n, key, by, True).values() for d in items]
+
+
+def bottom_k(stream, n, key, by=None):
+    """
+    Returns the `n` items with the smallest value for `key` from a stream, smallest first.
+    See `top_k` for the details.
+
+    Arguments:
+        stream: an iterable of dictionaries, like a `Clumper` or a generator
+        n: the number of items to keep, per group if `by` is given
+        key: the key, or a function, that gives the value to compare
+        by: key, or list of keys, to keep the bottom items for separately
+
+    Usage:
+
+    ```python
+    from clumper.stream import bottom_k
+
+    scores = ({'player': i, 'score': (i * 7) % 10} for i in range(30))
+    assert [d['score'] for d in bottom_k(scores, n=3, key='score')] == [0, 0, 0]
+    ```
+    """
+    return [d for items in _select_k(stream, n, key, by, False).values() for d in items]
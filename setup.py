@@ -11,6 +11,8 @@ test_packages = [
 
 yaml_packages = ["PyYAML>=5.3.1"]
 
+parallel_packages = ["cloudpickle>=1.6.0"]
+
 util_packages = ["jupyterlab>=2.2.0", "pre-commit>=2.6.0"]
 
 docs_packages = [
@@ -19,9 +21,11 @@ docs_packages = [
     "mkdocstrings>=0.8.0",
 ]
 
-dev_packages = test_packages + util_packages + docs_packages + yaml_packages
+dev_packages = (
+    test_packages + util_packages + docs_packages + yaml_packages + parallel_packages
+)
 
-all_deps = yaml_packages
+all_deps = yaml_packages + parallel_packages
 
 setup(
     name="clumper",
@@ -32,5 +36,6 @@ setup(
         "test": test_packages,
         "all": all_deps,
         "yaml": yaml_packages,
+        "parallel": parallel_packages,
     },
 )
@@ -2,12 +2,75 @@ import pytest
 from mktestdocs import check_docstring, get_codeblock_members
 
 from clumper import Clumper
-from clumper.sequence import row_number, smoothing, expanding, rolling, impute
+from clumper.sequence import (
+    row_number,
+    smoothing,
+    expanding,
+    rolling,
+    rolling_sum,
+    rolling_mean,
+    rolling_count,
+    rolling_std,
+    rolling_min,
+    rolling_max,
+    cumsum,
+    cummean,
+    cummax,
+    cummin,
+    cumcount,
+    cumvar,
+    impute,
+    lag,
+    lead,
+    rank,
+    dense_rank,
+    percent_rank,
+    ntile,
+    over,
+)
+from clumper.parallel import get_config, set_config, config_context
+from clumper import stream
+from clumper.stream import (
+    read_jsonl,
+    write_jsonl,
+    window_agg,
+    reservoir_sample,
+    assign_split,
+    assign_fold,
+    top_k,
+    bottom_k,
+    external_sort,
+)
 
 
 @pytest.mark.parametrize(
     "func",
-    [row_number, smoothing, expanding, rolling, impute],
+    [
+        row_number,
+        smoothing,
+        expanding,
+        rolling,
+        rolling_sum,
+        rolling_mean,
+        rolling_count,
+        rolling_std,
+        rolling_min,
+        rolling_max,
+        cumsum,
+        cummean,
+        cummax,
+        cummin,
+        cumcount,
+        cumvar,
+        impute,
+        lag,
+        lead,
+        rank,
+        dense_rank,
+        percent_rank,
+        ntile,
+        over,
+    ],
     ids=lambda d: d.__name__,
 )
 def test_docstring(func):
@@ -15,6 +78,35 @@ def test_docstring(func):
     check_docstring(obj=func)
 
 
+@pytest.mark.parametrize(
+    "func", [get_config, set_config, config_context], ids=lambda d: d.__name__
+)
+def test_parallel_docstring(func):
+    """Check docstring of each parallel setting."""
+    check_docstring(obj=func)
+
+
+@pytest.mark.parametrize(
+    "func",
+    [
+        stream,
+        read_jsonl,
+        write_jsonl,
+        window_agg,
+        reservoir_sample,
+        assign_split,
+        assign_fold,
+        top_k,
+        bottom_k,
+        external_sort,
+    ],
+    ids=lambda d: d.__name__,
+)
+def test_stream_docstring(func):
+    """Check docstring of the stream module and its functions."""
+    check_docstring(obj=func)
+
+
 @pytest.mark.parametrize(
     "m", get_codeblock_members(Clumper), ids=lambda d: d.__qualname__
 )
@@ -0,0 +1,96 @@
+import pytest
+
+from clumper import Clumper
+from clumper.parallel import config_context
+from clumper.sequence import row_number, rolling, expanding, smoothing, impute
+
+data = [{"a": i % 5 + 1, "b": i} if i % 3 else {"a": i % 5 + 1} for i in range(50)]
+
+
+@pytest.mark.parametrize(
+    "make_func",
+    [
+        lambda: row_number(),
+        lambda: rolling(window=3, key="a"),
+        lambda: expanding(key="a"),
+        lambda: impute("b", strategy="prev", fallback=-1),
+        lambda: impute("b", strategy="value", fallback=-1),
+    ],
+)
+@pytest.mark.parametrize("split", [0, 1, 17, 40])
+def test_combined_chunks_match_single_pass(make_func, split):
+    """Resuming from the combined checkpoint of earlier chunks should give the serial result."""
+    serial = make_func()
+    expected = [serial(d) for d in data]
+
+    first, second = make_func(), make_func()
+    for d in data[:split]:
+        first(d)
+    for d in data[split:40]:
+        second(d)
+    resumed = make_func()
+    resumed.set_state(resumed.combine(first.get_state(), second.get_state()))
+    result = [resumed(d) for d in data[40:]]
+    assert result == expected[40:]
+    assert resumed.get_state() == serial.get_state()
+
+
+@pytest.mark.parametrize("split", [0, 1, 17, 40])
+def test_smoothing_chunks_match_single_pass(split):
+    """Smoothing can be resumed from combined checkpoints, up to rounding."""
+    serial = smoothing(key="a", weight=0.3)
+    expected = [serial(d) for d in data]
+
+    first, second = smoothing(key="a", weight=0.3), smoothing(key="a", weight=0.3)
+    for d in data[:split]:
+        first(d)
+    for d in data[split:40]:
+        second(d)
+    resumed = smoothing(key="a", weight=0.3)
+    resumed.set_state(resumed.combine(first.get_state(), second.get_state()))
+    assert [resumed(d) for d in data[40:]] == pytest.approx(expected[40:])
+
+
+@pytest.mark.parametrize("backend", ["process", "thread"])
+def test_parallel_smoothing_with_zeros(backend):
+    """A smoothed value of zero is a state like any other, also at a chunk boundary."""
+    zeros = [{"a": (i * 13) % 7} for i in range(200)]
+    expected = Clumper(zeros).mutate(s=smoothing(key="a", weight=0.3)).collect()
+    with config_context(n_jobs=4, backend=backend, min_size=10):
+        result = Clumper(zeros).mutate(s=smoothing(key="a", weight=0.3)).collect()
+    assert [d["s"] for d in result] == pytest.approx([d["s"] for d in expected])
+
+
+def test_smoothing_starts_from_zero():
+    """Starting at zero should not restart the smoothing at the next value."""
+    result = Clumper([{"a": 0}, {"a": 4}]).mutate(s=smoothing(key="a", weight=0.5))
+    assert [d["s"] for d in result] == [0, 2]
+
+
+def test_reset_forgets_rows():
+    """After a reset a function should behave as if it was just created."""
+    rn = row_number()
+    Clumper(data).mutate(r=rn)
+    rn.reset()
+    assert Clumper(data).mutate(r=rn).collect()[0]["r"] == 1
+
+
+@pytest.mark.parametrize("backend", ["process", "thread"])
+def test_parallel_mutate_with_state(backend):
+    """Stateful functions in a parallel `mutate` should match the serial results."""
+
+    def make_kwargs():
+        return dict(
+            r=row_number(),
+            w=rolling(window=4, key="a"),
+            e=expanding(key="a"),
+            b=impute("b", strategy="prev", fallback=0),
+            s=lambda d: d["r"] + d["b"],
+        )
+
+    expected = Clumper(data).mutate(**make_kwargs()).collect()
+    kwargs = make_kwargs()
+    with config_context(n_jobs=2, backend=backend, min_size=10):
+        result = Clumper(data).mutate(**kwargs).collect()
+    assert result == expected
+    assert kwargs["r"].get_state() == len(data)
@@ -0,0 +1,85 @@
+import random
+import statistics
+
+import pytest
+
+from clumper import Clumper
+from clumper.sequence import (
+    expanding,
+    cumsum,
+    cummean,
+    cummax,
+    cummin,
+    cumcount,
+    cumvar,
+)
+
+rng = random.Random(42)
+data = [{"a": rng.randint(-20, 20)} for _ in range(200)]
+
+
+def naive(summary):
+    """Calculates the expanding summary the slow way."""
+    values = [d["a"] for d in data]
+    return [summary(values[: i + 1]) for i in range(len(data))]
+
+
+def var(values):
+    """Variance that returns `None` for a single value."""
+    return statistics.variance(values) if len(values) > 1 else None
+
+
+@pytest.mark.parametrize(
+    "func, summary",
+    [
+        (cumsum, sum),
+        (cummean, statistics.mean),
+        (cummax, max),
+        (cummin, min),
+        (cumcount, len),
+    ],
+)
+def test_matches_naive(func, summary):
+    """The cumulative summaries should match a full recalculation."""
+    result = Clumper(data).mutate(r=func(key="a"))
+    assert [d["r"] for d in result] == pytest.approx(naive(summary))
+
+
+def test_cumvar_matches_naive():
+    """The cumulative variance should match a full recalculation."""
+    result = [d["r"] for d in Clumper(data).mutate(r=cumvar(key="a"))]
+    assert result[0] is None
+    assert result[1:] == pytest.approx(naive(var)[1:])
+
+
+def test_cumcount_without_key():
+    """Without a key all rows are counted."""
+    result = Clumper([{"a": 1}, {}, {"a": None}]).mutate(n=cumcount())
+    assert [d["n"] for d in result] == [1, 2, 3]
+
+
+def test_expanding_view_matches_lists():
+    """The read-only views should behave like the lists they replace."""
+    lists = [d["r"] for d in Clumper(data).mutate(r=expanding(key="a"))]
+    views = [d["r"] for d in Clumper(data).mutate(r=expanding(key="a", view=True))]
+    assert views == lists
+    assert all(list(v) == lst for v, lst in zip(views, lists))
+    assert views[3][-1] == data[3]["a"]
+    assert views[3][1:3] == [data[1]["a"], data[2]["a"]]
+    with pytest.raises(IndexError):
+        views[3][4]
+
+
+@pytest.mark.parametrize("func", [cumsum, cummean, cummax, cummin, cumcount, cumvar])
+def test_combined_chunks_match_single_pass(func):
+    """Resuming from combined checkpoints should give the same results."""
+    serial = func(key="a")
+    expected = [serial(d) for d in data]
+    first, second = func(key="a"), func(key="a")
+    for d in data[:70]:
+        first(d)
+    for d in data[70:150]:
+        second(d)
+    resumed = func(key="a")
+    resumed.set_state(resumed.combine(first.get_state(), second.get_state()))
+    assert [resumed(d) for d in data[150:]] == pytest.approx(expected[150:])
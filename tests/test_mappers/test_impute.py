@@ -1,3 +1,5 @@
+import pytest
+
 from clumper import Clumper
 from clumper.sequence import impute
 
@@ -34,3 +36,49 @@ def test_correct_values_value():
     )
 
     assert [d["b"] for d in res] == [2, 3, 0, 6, 0]
+
+
+@pytest.mark.parametrize(
+    "strategy, expected",
+    [
+        ("prev", [-1, 2, 2, 2, 6, 6]),
+        ("next", [2, 2, 6, 6, 6, -1]),
+        ("nearest", [2, 2, 2, 6, 6, 6]),
+        ("linear", [-1, 2, 10 / 3, 14 / 3, 6, -1]),
+        ("value", [-1, 2, -1, -1, 6, -1]),
+    ],
+)
+def test_strategies(strategy, expected):
+    """Check every strategy, including gaps at the start and the end."""
+    list_dicts = [{"a": 0}, {"a": 1, "b": 2}, {"a": 2}, {"a": 3}, {"a": 4, "b": 6}, {}]
+    res = (
+        Clumper(list_dicts)
+        .mutate(b=impute("b", strategy=strategy, fallback=-1))
+        .collect()
+    )
+    assert [d["b"] for d in res] == pytest.approx(expected)
+
+
+def test_prev_keeps_falsy_values():
+    """A previous value of zero is a value, not a gap."""
+    list_dicts = [{"b": 0}, {}, {"b": 1}]
+    res = Clumper(list_dicts).mutate(b=impute("b", fallback=-1)).collect()
+    assert [d["b"] for d in res] == [0, 0, 1]
+
+
+def test_lookahead_per_group():
+    """Strategies that look ahead should stay within their group."""
+    list_dicts = [{"g": 1, "b": 1}, {"g": 1}, {"g": 2}, {"g": 2, "b": 5}]
+    res = (
+        Clumper(list_dicts)
+        .group_by("g")
+        .mutate(b=impute("b", strategy="next", fallback=0))
+        .collect()
+    )
+    assert [d["b"] for d in res] == [1, 0, 5, 5]
+
+
+def test_bad_strategy():
+    """Unknown strategies raise an error."""
+    with pytest.raises(ValueError):
+        impute("b", strategy="mean")
@@ -0,0 +1,53 @@
+import pytest
+
+from clumper import Clumper
+from clumper.parallel import config_context
+from clumper.sequence import lag, lead, over
+
+data = [{"g": "ab"[i % 2], "t": i, "a": i * i} for i in range(40)]
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 50])
+def test_lag_and_lead(n):
+    """Both functions should look up the value `n` rows away or fall back to a default."""
+    result = Clumper(data).mutate(
+        p=lag("a", n=n, default=-1), f=lead("a", n=n, default=-1)
+    )
+    values = [d["a"] for d in data]
+    for i, d in enumerate(result):
+        assert d["p"] == (values[i - n] if i >= n else -1)
+        assert d["f"] == (values[i + n] if i + n < len(values) else -1)
+
+
+def test_work_per_group():
+    """With a group or partition the functions should not cross group boundaries."""
+    grouped = Clumper(data).group_by("g").mutate(p=lag("a"), f=lead("a"))
+    windowed = Clumper(data).mutate(
+        p=over(lag("a"), partition_by="g", order_by="t"),
+        f=over(lead("a"), partition_by="g", order_by="t"),
+    )
+    for result in [grouped, windowed]:
+        for d in result:
+            assert d["p"] == (None if d["t"] < 2 else (d["t"] - 2) ** 2)
+            assert d["f"] == (None if d["t"] >= 38 else (d["t"] + 2) ** 2)
+
+
+def test_lag_in_parallel():
+    """The ring buffer of `lag` can be resumed in parallel chunks."""
+    expected = Clumper(data).mutate(p=lag("a", n=3)).collect()
+    with config_context(n_jobs=2, backend="thread", min_size=10):
+        result = Clumper(data).mutate(p=lag("a", n=3)).collect()
+    assert result == expected
+
+
+def test_lead_needs_all_rows():
+    """A `lead` can't be called one row at a time."""
+    with pytest.raises(ValueError):
+        Clumper(data).map(lead("a"))
+
+
+@pytest.mark.parametrize("func", [lag, lead])
+def test_bad_n(func):
+    """We need to look at least one row away."""
+    with pytest.raises(ValueError):
+        func("a", n=0)
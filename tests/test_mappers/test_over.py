@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from clumper import Clumper
+from clumper.sequence import over, row_number, cumsum, rolling_mean
+
+rng = random.Random(42)
+data = [
+    {"g": rng.choice("abc"), "h": rng.randint(0, 1), "t": i, "v": rng.random()}
+    for i in range(100)
+]
+rng.shuffle(data)
+
+
+def test_row_number_matches_group_by():
+    """Partitioning with `over` should match `group_by`, `sort` and `mutate`."""
+    expected = (
+        Clumper(data)
+        .group_by("g")
+        .sort(lambda d: d["t"])
+        .mutate(r=row_number())
+        .ungroup()
+    )
+    result = Clumper(data).mutate(r=over(row_number(), partition_by="g", order_by="t"))
+    assert result.equals(expected.collect())
+
+
+def test_results_keep_original_positions():
+    """The rows should stay in their original order."""
+    result = Clumper(data).mutate(r=over(row_number(), partition_by="g", order_by="t"))
+    assert [d["t"] for d in result] == [d["t"] for d in data]
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_multiple_keys_and_direction(descending):
+    """Partitions and orders can be defined by multiple keys."""
+    result = Clumper(data).mutate(
+        s=over(
+            cumsum(key="v"),
+            partition_by=["g", "h"],
+            order_by="t",
+            descending=descending,
+        )
+    )
+    for d in result:
+        same_group = [e for e in data if (e["g"], e["h"]) == (d["g"], d["h"])]
+        if descending:
+            partition = [e for e in same_group if e["t"] >= d["t"]]
+        else:
+            partition = [e for e in same_group if e["t"] <= d["t"]]
+        assert d["s"] == pytest.approx(sum(e["v"] for e in partition))
+
+
+def test_factory_and_callable_order():
+    """A class can be passed as a factory and the order can be a function."""
+    result = Clumper(data).mutate(
+        r=over(row_number, partition_by="g", order_by=lambda d: -d["t"])
+    )
+    expected = Clumper(data).mutate(
+        r=over(row_number(), partition_by="g", order_by="t", descending=True)
+    )
+    assert result.collect() == expected.collect()
+
+
+def test_no_partition():
+    """Without a partition the whole collection is ordered."""
+    result = Clumper(data).mutate(r=over(rolling_mean(window=3, key="t"), order_by="t"))
+    for d in result:
+        lower = max(0, d["t"] - 2)
+        assert d["r"] == pytest.approx((lower + d["t"]) / 2)
+
+
+def test_layout_updates_after_overwrite():
+    """Overwriting a partition key between two windows should change the layout."""
+    result = Clumper(data).mutate(
+        r1=over(row_number(), partition_by="g", order_by="t"),
+        g=lambda d: "same",
+        r2=over(row_number(), partition_by="g", order_by="t"),
+    )
+    assert sorted(d["r2"] for d in result) == list(range(1, 101))
+    assert max(d["r1"] for d in result) < 100
+
+
+def test_group_by_resets_functions():
+    """Grouped verbs reset copies of stateful functions per group."""
+    rn = row_number()
+    result = Clumper(data).group_by("g").mutate(r=rn)
+    for grp in "abc":
+        numbers = [d["r"] for d in result if d["g"] == grp]
+        assert numbers == list(range(1, len(numbers) + 1))
+
+
+def test_group_by_leaves_functions_untouched():
+    """The functions that are passed to a grouped verb keep their own state."""
+    rows = [{"g": i % 2, "v": i} for i in range(5)]
+    rn, cs = row_number(), cumsum(key="v")
+    Clumper(rows).group_by("g").mutate(r=rn, c=cs)
+    assert rn.get_state() == 0
+    result = Clumper(rows).mutate(r=rn, c=cs).collect()
+    assert [d["r"] for d in result] == [1, 2, 3, 4, 5]
+    assert [d["c"] for d in result] == [0, 1, 3, 6, 10]
+
+
+def test_group_by_with_a_class():
+    """Passing the class of a stateful function also works in a grouped verb."""
+    result = Clumper(data).group_by("g").mutate(r=over(row_number, order_by="t"))
+    expected = Clumper(data).mutate(r=over(row_number, partition_by="g", order_by="t"))
+    assert result.ungroup().equals(expected.collect())
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from clumper import Clumper
+from clumper.sequence import rank, dense_rank, percent_rank, ntile, over
+
+rng = random.Random(42)
+data = [{"g": rng.choice("ab"), "s": rng.randint(0, 10)} for _ in range(60)]
+
+
+def naive_rank(values, v, ties):
+    """Ranks a single value the slow way."""
+    smaller = sum(1 for x in values if x < v)
+    equal = sum(1 for x in values if x == v)
+    return {
+        "min": smaller + 1,
+        "max": smaller + equal,
+        "average": smaller + (equal + 1) / 2,
+    }[ties]
+
+
+@pytest.mark.parametrize("ties", ["min", "max", "average"])
+def test_rank_matches_naive(ties):
+    """Ranks should match counting the smaller and equal values."""
+    result = Clumper(data).mutate(r=rank("s", ties=ties))
+    values = [d["s"] for d in data]
+    assert [d["r"] for d in result] == [naive_rank(values, v, ties) for v in values]
+
+
+def test_rank_first_is_a_permutation():
+    """With `ties='first'` every rank appears once and ties keep their order."""
+    result = Clumper(data).mutate(r=rank("s", ties="first")).collect()
+    assert sorted(d["r"] for d in result) == list(range(1, 61))
+    for a, b in zip(result, result[1:]):
+        if a["s"] == b["s"]:
+            assert a["r"] < b["r"]
+
+
+def test_dense_and_percent_rank():
+    """Dense ranks have no gaps and percent ranks lie between 0 and 1."""
+    result = Clumper(data).mutate(d=dense_rank("s"), p=percent_rank("s"), r=rank("s"))
+    distinct = sorted({d["s"] for d in data})
+    for d in result:
+        assert d["d"] == distinct.index(d["s"]) + 1
+        assert d["p"] == (d["r"] - 1) / 59
+
+
+@pytest.mark.parametrize("n", [1, 3, 7, 60, 100])
+def test_ntile_sizes(n):
+    """Buckets should differ at most one in size with the larger buckets first."""
+    result = Clumper(data).mutate(q=ntile(n, key="s"))
+    sizes = [sum(1 for d in result if d["q"] == b) for b in range(1, min(n, 60) + 1)]
+    assert sum(sizes) == 60
+    assert sizes == sorted(sizes, reverse=True)
+    assert max(sizes) - min(sizes) <= 1
+    for a in result:
+        for b in result:
+            if a["s"] < b["s"]:
+                assert a["q"] <= b["q"]
+
+
+def test_rank_per_group():
+    """Ranks should restart within groups and partitions."""
+    grouped = Clumper(data).group_by("g").mutate(r=rank("s", descending=True))
+    windowed = Clumper(data).mutate(
+        r=over(rank("s", descending=True), partition_by="g")
+    )
+    for result in [grouped, windowed]:
+        for d in result:
+            others = [e["s"] for e in data if e["g"] == d["g"]]
+            assert d["r"] == sum(1 for x in others if x > d["s"]) + 1
+
+
+def test_bad_ties():
+    """Only known tie-breaking methods are allowed."""
+    with pytest.raises(ValueError):
+        rank("s", ties="random")
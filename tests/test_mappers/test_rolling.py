@@ -0,0 +1,88 @@
+import random
+import statistics
+
+import pytest
+
+from clumper import Clumper
+from clumper.sequence import (
+    rolling,
+    rolling_sum,
+    rolling_mean,
+    rolling_std,
+    rolling_min,
+    rolling_max,
+)
+
+rng = random.Random(42)
+data = [{"a": rng.randint(-20, 20)} for _ in range(300)]
+
+
+def naive(window, summary):
+    """Calculates the rolling summary the slow way."""
+    values = [d["a"] for d in data]
+    return [summary(values[max(0, i - window + 1) : i + 1]) for i in range(len(data))]
+
+
+def std(values):
+    """Standard deviation that returns `None` for a single value."""
+    return statistics.stdev(values) if len(values) > 1 else None
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 50, 500])
+@pytest.mark.parametrize(
+    "func, summary",
+    [
+        (rolling_sum, sum),
+        (rolling_mean, statistics.mean),
+        (rolling_min, min),
+        (rolling_max, max),
+    ],
+)
+def test_matches_naive(window, func, summary):
+    """The incremental summaries should match a full recalculation."""
+    result = Clumper(data).mutate(r=func(window=window, key="a"))
+    assert [d["r"] for d in result] == pytest.approx(naive(window, summary))
+
+
+@pytest.mark.parametrize("window", [2, 7, 50])
+def test_std_matches_naive(window):
+    """The rolling standard deviation should match a full recalculation."""
+    result = [
+        d["r"] for d in Clumper(data).mutate(r=rolling_std(window=window, key="a"))
+    ]
+    expected = naive(window, std)
+    assert result[0] is None
+    assert result[1:] == pytest.approx(expected[1:])
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 500])
+def test_window_matches_naive(window):
+    """The window itself should contain the last `window` values."""
+    result = Clumper(data).mutate(r=rolling(window=window, key="a"))
+    assert [d["r"] for d in result] == naive(window, list)
+
+
+def test_rows_get_their_own_window():
+    """Changing the window later should not affect rows that were already calculated."""
+    result = Clumper(data[:3]).mutate(r=rolling(window=2, key="a")).collect()
+    assert result[0]["r"] == [data[0]["a"]]
+    assert result[2]["r"] == [data[1]["a"], data[2]["a"]]
+
+
+@pytest.mark.parametrize("func", [rolling_sum, rolling_min, rolling_max, rolling_std])
+def test_resume_from_checkpoint(func):
+    """Rolling summaries should be able to continue from a checkpoint."""
+    serial = func(window=5, key="a")
+    expected = [serial(d) for d in data]
+    first = func(window=5, key="a")
+    for d in data[:100]:
+        first(d)
+    resumed = func(window=5, key="a")
+    resumed.set_state(first.get_state())
+    assert [resumed(d) for d in data[100:]] == pytest.approx(expected[100:])
+
+
+def test_bad_window():
+    """A window needs at least one item."""
+    with pytest.raises(ValueError):
+        rolling_sum(window=0, key="a")
@@ -0,0 +1,139 @@
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from clumper import Clumper
+from clumper.parallel import config_context
+from clumper.sequence import (
+    rolling,
+    rolling_sum,
+    rolling_mean,
+    rolling_count,
+    rolling_std,
+    rolling_min,
+    rolling_max,
+)
+
+rng = random.Random(42)
+start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+times, t = [], 0
+for _ in range(200):
+    t += rng.choice([0, 1, 2, 5, 30])
+    times.append(t)
+data = [
+    {"t": t, "dt": start + timedelta(seconds=t), "a": rng.randint(-20, 20)}
+    for t in times
+]
+for d in data:
+    d["iso"] = d["dt"].isoformat().replace("+00:00", "Z")
+
+
+def naive(duration, summary):
+    """Calculates the time based rolling summary the slow way."""
+    return [
+        summary([d["a"] for d in data[: i + 1] if d["t"] > data[i]["t"] - duration])
+        for i in range(len(data))
+    ]
+
+
+def std(values):
+    """Standard deviation that returns `None` for a single value."""
+    return statistics.stdev(values) if len(values) > 1 else None
+
+
+@pytest.mark.parametrize("duration", [1, 3, 10, 60, 10_000])
+@pytest.mark.parametrize(
+    "func, summary",
+    [
+        (rolling_sum, sum),
+        (rolling_mean, statistics.mean),
+        (rolling_count, len),
+        (rolling_min, min),
+        (rolling_max, max),
+    ],
+)
+def test_time_window_matches_naive(func, summary, duration):
+    """Time based windows should contain exactly the rows within `duration`."""
+    result = Clumper(data).mutate(r=func(key="a", duration=duration, time_key="t"))
+    assert [d["r"] for d in result] == pytest.approx(naive(duration, summary))
+
+
+@pytest.mark.parametrize("duration", [1, 10, 60])
+def test_time_window_values(duration):
+    """The rolling window should hold the values within `duration`."""
+    result = Clumper(data).mutate(r=rolling(key="a", duration=duration, time_key="t"))
+    assert [d["r"] for d in result] == naive(duration, list)
+
+
+@pytest.mark.parametrize("duration", [1, 10, 60])
+def test_time_window_std(duration):
+    """The rolling standard deviation should also work on time based windows."""
+    result = Clumper(data).mutate(
+        r=rolling_std(key="a", duration=duration, time_key="t")
+    )
+    for got, expected in zip([d["r"] for d in result], naive(duration, std)):
+        assert (got is None and expected is None) or got == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("time_key", ["t", "dt", "iso", lambda d: d["t"]])
+def test_timestamp_formats(time_key):
+    """Epoch seconds, datetimes, ISO strings and callables should give the same result."""
+    result = Clumper(data).mutate(
+        r=rolling_sum(key="a", duration=timedelta(seconds=10), time_key=time_key)
+    )
+    assert [d["r"] for d in result] == naive(10, sum)
+
+
+def test_unsorted_timestamps():
+    """Timestamps that go back in time cannot be handled by a time window."""
+    with pytest.raises(ValueError):
+        Clumper([{"t": 2, "a": 1}, {"t": 1, "a": 1}]).mutate(
+            r=rolling_sum(key="a", duration=5, time_key="t")
+        )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"duration": 5}, {"duration": 0, "time_key": "t"}, {"window": 0}],
+)
+def test_bad_arguments(kwargs):
+    """Invalid window settings should raise an error."""
+    with pytest.raises(ValueError):
+        rolling_sum(key="a", **kwargs)
+
+
+@pytest.mark.parametrize("split", [1, 17, 100, 199])
+def test_time_window_combine(split):
+    """Checkpoints of a time window can be combined to resume the sequence."""
+    first = rolling_sum(key="a", duration=30, time_key="t")
+    for d in data[:split]:
+        first(d)
+    second = rolling_sum(key="a", duration=30, time_key="t")
+    for d in data[split:]:
+        second(d)
+    resumed = rolling_sum(key="a", duration=30, time_key="t")
+    resumed.set_state(resumed.combine(first.get_state(), second.get_state()))
+    expected = rolling_sum(key="a", duration=30, time_key="t")
+    for d in data:
+        expected(d)
+    nxt = {"t": data[-1]["t"] + 1, "a": 3}
+    assert resumed(nxt) == expected(nxt)
+
+
+@pytest.mark.parametrize("backend", ["process", "thread"])
+def test_parallel_time_key_written_in_mutate(backend):
+    """A `time_key` that the same `mutate` writes should work like in a serial run."""
+    rows = [{"raw": d["t"], "v": d["a"]} for d in data]
+
+    def make_kwargs():
+        return dict(
+            ts=lambda d: d["raw"],
+            r=rolling_sum(key="v", duration=25, time_key="ts"),
+        )
+
+    expected = Clumper(rows).mutate(**make_kwargs()).collect()
+    with config_context(n_jobs=2, backend=backend, min_size=10):
+        result = Clumper(rows).mutate(**make_kwargs()).collect()
+    assert result == expected
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from clumper import Clumper
+from clumper.parallel import config_context, run_tasks
+from clumper.sequence import row_number
+
+data = [
+    {"g": i % 4 if i < 60 else 0, "h": i % 2, "a": (i * 7) % 11} for i in range(100)
+]
+
+
+def grouped_verbs(clump):
+    """Applies a few verbs that are aware of groups."""
+    return {
+        "mutate": clump.mutate(r=row_number(), b=lambda d: d["a"] * 2).collect(),
+        "agg": clump.agg(s=("a", "sum"), n=("a", "count")).collect(),
+        "sort": clump.sort(lambda d: d["a"]).collect(),
+        "transform": clump.transform(m=("a", "max")).collect(),
+    }
+
+
+@pytest.mark.parametrize("backend", ["process", "thread"])
+@pytest.mark.parametrize("groups", [("g",), ("g", "h")])
+def test_parallel_groups_match_serial(backend, groups):
+    """Handling groups in parallel should give the same results in the same order."""
+    expected = grouped_verbs(Clumper(data).group_by(*groups))
+    with config_context(n_jobs=2, backend=backend, min_size=10):
+        result = grouped_verbs(Clumper(data).group_by(*groups))
+    assert result == expected
+
+
+def test_row_number_resets_per_group():
+    """Each group should get its own fresh copy of a stateful function."""
+    with config_context(n_jobs=2, backend="process", min_size=10):
+        result = Clumper(data).group_by("g").mutate(r=row_number())
+    for grp in result.unique("g"):
+        numbers = [d["r"] for d in result if d["g"] == grp]
+        assert numbers == list(range(1, len(numbers) + 1))
+
+
+@pytest.mark.parametrize("backend", ["process", "thread"])
+def test_used_functions_reset_per_group(backend):
+    """A function that already holds state should start fresh per group in parallel too."""
+    used = row_number()
+    Clumper(data[:30]).mutate(r=used)
+    expected = Clumper(data).group_by("g").mutate(r=used).collect()
+    with config_context(n_jobs=2, backend=backend, min_size=10):
+        result = Clumper(data).group_by("g").mutate(r=used).collect()
+    assert result == expected
+    assert used.get_state() == 30
+
+
+def test_largest_tasks_keep_their_position():
+    """Scheduling the largest tasks first should not change the order of the results."""
+    with config_context(n_jobs=2, backend="thread"):
+        result = run_tasks(len, ["a", "bbb", "cc", "dddd"], sizes=[1, 3, 2, 4])
+    assert result == [1, 3, 2, 4]
+
+
+def test_thread_workers_do_not_nest():
+    """Work that is started inside of a worker thread runs serially in that thread."""
+
+    def outer(_):
+        inner = run_tasks(lambda _: threading.get_ident(), [1, 2, 3, 4])
+        return threading.get_ident(), set(inner)
+
+    with config_context(n_jobs=2, backend="thread"):
+        results = run_tasks(outer, [1, 2, 3, 4])
+    assert all(inner == {ident} for ident, inner in results)
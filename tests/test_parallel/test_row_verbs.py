@@ -0,0 +1,67 @@
+import pytest
+
+from clumper import Clumper
+from clumper.parallel import config_context, get_config
+from clumper.sequence import row_number
+
+
+@pytest.fixture
+def data():
+    """A collection that is large enough to be split up into chunks."""
+    return [{"a": i, "b": i % 7, "items": [i, i + 1]} for i in range(103)]
+
+
+@pytest.mark.parametrize("backend", ["process", "thread"])
+def test_mutate_matches_serial(data, backend):
+    """Parallel `mutate` needs to give the exact same result in the same order."""
+    expected = Clumper(data).mutate(c=lambda d: d["a"] * 2, e=lambda d: d["c"] + 1)
+    with config_context(n_jobs=2, backend=backend, min_size=10):
+        result = Clumper(data).mutate(c=lambda d: d["a"] * 2, e=lambda d: d["c"] + 1)
+    assert result.collect() == expected.collect()
+
+
+@pytest.mark.parametrize("backend", ["process", "thread"])
+def test_map_keep_flatmap_match_serial(data, backend):
+    """Parallel `map`, `keep` and `flatmap` need to match the serial results."""
+    c = Clumper(data)
+    expected_map = c.map(lambda d: d["a"] + 1).collect()
+    expected_keep = c.keep(lambda d: d["b"] > 2, lambda d: d["a"] % 2 == 0).collect()
+    expected_flat = Clumper([d["items"] for d in data]).flatmap(lambda x: -x).collect()
+    with config_context(n_jobs=2, backend=backend, min_size=10):
+        assert c.map(lambda d: d["a"] + 1).collect() == expected_map
+        kept = c.keep(lambda d: d["b"] > 2, lambda d: d["a"] % 2 == 0).collect()
+        assert kept == expected_keep
+        flat = Clumper([d["items"] for d in data]).flatmap(lambda x: -x).collect()
+        assert flat == expected_flat
+
+
+def test_small_collections_stay_serial(data):
+    """Collections below `min_size` should still give correct results."""
+    with config_context(n_jobs=2, backend="process", min_size=1000):
+        result = Clumper(data).map(lambda d: d["a"]).collect()
+    assert result == list(range(103))
+
+
+def test_stateful_functions_keep_working(data):
+    """Stateful functions like `row_number` need to see every row in order."""
+    with config_context(n_jobs=2, backend="process", min_size=10):
+        result = Clumper(data).mutate(r=row_number()).collect()
+    assert [d["r"] for d in result] == list(range(1, 104))
+
+
+def test_config_context_restores():
+    """The context manager should restore the previous settings."""
+    before = get_config()
+    with config_context(n_jobs=3, backend="thread", min_size=5):
+        assert get_config() == {"n_jobs": 3, "backend": "thread", "min_size": 5}
+    assert get_config() == before
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"n_jobs": 0}, {"n_jobs": -2}, {"backend": "gpu"}, {"min_size": -1}]
+)
+def test_bad_settings_raise(kwargs):
+    """Invalid settings should raise an error."""
+    with pytest.raises(ValueError):
+        with config_context(**kwargs):
+            pass
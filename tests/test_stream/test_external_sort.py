@@ -0,0 +1,50 @@
+import os
+import random
+
+import pytest
+
+from clumper.stream import external_sort, read_jsonl, write_jsonl
+
+rng = random.Random(42)
+data = [{"i": i, "ts": rng.randint(0, 50)} for i in range(1000)]
+
+
+@pytest.mark.parametrize("run_size", [1, 7, 100, 999, 1000, 5000])
+@pytest.mark.parametrize("reverse", [True, False])
+def test_matches_sorted(run_size, reverse):
+    """The merged runs give the same result as a stable in-memory sort."""
+    result = list(
+        external_sort(iter(data), key="ts", reverse=reverse, run_size=run_size)
+    )
+    assert result == sorted(data, key=lambda d: d["ts"], reverse=reverse)
+
+
+def test_key_function():
+    """The key can also be a function."""
+    result = external_sort(data, key=lambda d: (d["ts"], -d["i"]), run_size=10)
+    assert list(result) == sorted(data, key=lambda d: (d["ts"], -d["i"]))
+
+
+def test_temporary_files_are_removed(tmp_path):
+    """Runs are written to the temporary directory and removed afterwards."""
+    stream = external_sort(data, key="ts", run_size=100, tmpdir=tmp_path)
+    first = next(stream)
+    assert first["ts"] == 0
+    (run_dir,) = os.listdir(tmp_path)
+    assert len(os.listdir(tmp_path / run_dir)) == 10
+    assert len(list(stream)) == len(data) - 1
+    assert os.listdir(tmp_path) == []
+
+
+def test_feeds_writer(tmp_path):
+    """The sorted stream can be written to jsonl directly."""
+    path = tmp_path / "sorted.jsonl"
+    write_jsonl(external_sort(data, key="ts", run_size=64), path)
+    assert [d["ts"] for d in read_jsonl(path)] == sorted(d["ts"] for d in data)
+
+
+@pytest.mark.parametrize("run_size", [0, -1, 1.5])
+def test_bad_run_size(run_size):
+    """The run size must be a positive integer."""
+    with pytest.raises(ValueError):
+        list(external_sort(data, key="ts", run_size=run_size))
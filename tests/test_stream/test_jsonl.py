@@ -0,0 +1,41 @@
+import pytest
+
+from clumper import Clumper
+from clumper.stream import read_jsonl, write_jsonl
+
+
+def test_read_matches_clumper():
+    """The stream should contain the same items as the collection."""
+    expected = Clumper.read_jsonl("tests/data/cards.jsonl").collect()
+    assert list(read_jsonl("tests/data/cards.jsonl")) == expected
+
+
+@pytest.mark.parametrize("n", [1, 5, 1000])
+def test_read_n(n):
+    """Only the first `n` lines are read, across files."""
+    result = list(read_jsonl("tests/data/cards*.jsonl", n=n))
+    expected = Clumper.read_jsonl("tests/data/cards*.jsonl").collect()
+    assert len(result) == min(n, len(expected))
+
+
+def test_read_glob_add_path():
+    """Files matching a wildcard are read in order and can add their path."""
+    result = list(read_jsonl("tests/data/cards*.jsonl", add_path=True))
+    paths = [d["read_path"] for d in result]
+    assert paths == sorted(paths)
+    assert set(paths) == {"tests/data/cards-more.jsonl", "tests/data/cards.jsonl"}
+
+
+def test_read_bad_n():
+    """Reading zero lines is not allowed."""
+    with pytest.raises(ValueError):
+        list(read_jsonl("tests/data/cards.jsonl", n=0))
+
+
+def test_write_roundtrip(tmp_path):
+    """Writing a stream and reading it back gives the same items."""
+    path = tmp_path / "out.jsonl"
+    n = write_jsonl(read_jsonl("tests/data/cards.jsonl"), path)
+    assert n == len(list(read_jsonl(path)))
+    write_jsonl([{"a": 1}], path, mode="a")
+    assert list(read_jsonl(path))[-1] == {"a": 1}
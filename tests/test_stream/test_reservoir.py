@@ -0,0 +1,75 @@
+import collections
+
+import pytest
+
+from clumper import Clumper
+from clumper.stream import reservoir_sample
+
+items = [{"a": i, "w": (i % 5) or None} for i in range(20)]
+
+
+def frequencies(sampler, n_runs=3000):
+    """Counts how often each item is part of the sample over many seeds."""
+    counts = collections.Counter()
+    for seed in range(n_runs):
+        counts.update(d["a"] for d in sampler(seed))
+    return {a: counts[a] / n_runs for a in range(len(items))}
+
+
+def test_uniform_frequencies():
+    """Every item should be part of the sample equally often."""
+    freqs = frequencies(lambda s: reservoir_sample(iter(items), 5, random_state=s))
+    for f in freqs.values():
+        assert f == pytest.approx(5 / 20, abs=0.04)
+
+
+def test_weighted_frequencies():
+    """Weighted reservoirs should match weighted sampling without replacement."""
+    clump = Clumper(items)
+    got = frequencies(
+        lambda s: reservoir_sample(iter(items), 5, weights="w", random_state=s)
+    )
+    expected = frequencies(
+        lambda s: clump.sample(5, replace=False, weights="w", random_state=s)
+    )
+    for a in range(len(items)):
+        assert got[a] == pytest.approx(expected[a], abs=0.05)
+    assert got[0] == 0 and got[5] == 0
+
+
+@pytest.mark.parametrize("weights", [None, "w"])
+@pytest.mark.parametrize("n", [0, 1, 7, 16, 100])
+def test_sample_size(n, weights):
+    """The sample has `n` distinct items or all the eligible items."""
+    sampled = reservoir_sample(iter(items), n, weights=weights, random_state=1)
+    n_eligible = len(items) if weights is None else 16
+    assert len(sampled) == min(n, n_eligible)
+    assert len({d["a"] for d in sampled}) == len(sampled)
+
+
+@pytest.mark.parametrize("weights", [None, "w"])
+def test_random_state(weights):
+    """The same seed gives the same sample."""
+    first = reservoir_sample(items, 5, weights=weights, random_state=0)
+    second = reservoir_sample(items, 5, weights=weights, random_state=0)
+    assert first == second
+
+
+def test_bad_weights():
+    """Missing or negative weights raise an error."""
+    with pytest.raises(KeyError):
+        reservoir_sample([{"a": 1}], 1, weights="w")
+    with pytest.raises(ValueError):
+        reservoir_sample([{"w": -1}], 1, weights="w")
+
+
+def test_read_jsonl_sample():
+    """The reader samples across all files of a wildcard."""
+    seen = set()
+    for seed in range(50):
+        clump = Clumper.read_jsonl_sample(
+            "tests/data/cards*.jsonl", n=2, random_state=seed, add_path=True
+        )
+        assert len(clump) == 2
+        seen.update(d["read_path"] for d in clump)
+    assert seen == {"tests/data/cards.jsonl", "tests/data/cards-more.jsonl"}
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from clumper import Clumper
+from clumper.stream import read_jsonl, write_jsonl
+
+
+@pytest.fixture
+def shards(tmp_path):
+    """Writes five shards that are each sorted on `ts`."""
+    rng = random.Random(42)
+    rows = [{"ts": rng.randint(0, 1000), "i": i} for i in range(500)]
+    for s in range(5):
+        shard = sorted(rows[s::5], key=lambda d: d["ts"])
+        write_jsonl(shard, tmp_path / f"shard-{s}.jsonl")
+    return rows, str(tmp_path / "shard-*.jsonl")
+
+
+def test_stream_merge(shards):
+    """The shards are merged into a single sorted stream."""
+    rows, pattern = shards
+    result = [d["ts"] for d in read_jsonl(pattern, sorted_by="ts")]
+    assert result == sorted(d["ts"] for d in rows)
+
+
+def test_stream_merge_n_and_key_function(shards):
+    """The merge can use a key function and stop after `n` items."""
+    rows, pattern = shards
+    result = list(read_jsonl(pattern, n=10, sorted_by=lambda d: d["ts"]))
+    assert [d["ts"] for d in result] == sorted(d["ts"] for d in rows)[:10]
+
+
+def test_stream_merge_descending(tmp_path):
+    """Shards that are sorted from large to small can be merged too."""
+    write_jsonl([{"ts": 5}, {"ts": 2}], tmp_path / "a.jsonl")
+    write_jsonl([{"ts": 4}, {"ts": 3}], tmp_path / "b.jsonl")
+    stream = read_jsonl(str(tmp_path / "*.jsonl"), sorted_by="ts", ascending=False)
+    assert [d["ts"] for d in stream] == [5, 4, 3, 2]
+
+
+def test_unsorted_shard(tmp_path):
+    """A shard that is not sorted raises an error."""
+    write_jsonl([{"ts": 1}, {"ts": 3}], tmp_path / "a.jsonl")
+    write_jsonl([{"ts": 4}, {"ts": 2}], tmp_path / "b.jsonl")
+    with pytest.raises(ValueError):
+        list(read_jsonl(str(tmp_path / "*.jsonl"), sorted_by="ts"))
+    with pytest.raises(ValueError):
+        Clumper.read_jsonl(str(tmp_path / "*.jsonl"), sorted_by="ts")
+
+
+def test_clumper_reader(shards):
+    """The collection reader merges the shards and marks the result as sorted."""
+    rows, pattern = shards
+    clump = Clumper.read_jsonl(pattern, sorted_by="ts")
+    assert [d["ts"] for d in clump] == sorted(d["ts"] for d in rows)
+    assert clump.sorted_by == ("ts", True)
+    assert clump.between("ts", 100, 200).collect() == [
+        d for d in clump if 100 <= d["ts"] <= 200
+    ]
@@ -0,0 +1,122 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from clumper import Clumper
+from clumper.stream import window_agg
+
+rng = random.Random(42)
+events = sorted(
+    [
+        {"t": rng.randint(0, 1000), "g": rng.choice("abc"), "v": rng.random()}
+        for _ in range(500)
+    ],
+    key=lambda d: d["t"],
+)
+
+
+def naive(rows, size, slide, **aggs):
+    """Calculates the windowed summaries by materialising every window."""
+    result = []
+    for start in range(-size, 1001, slide):
+        inside = [d for d in rows if start <= d["t"] < start + size]
+        if not inside:
+            continue
+        for res in Clumper(inside).group_by("g").agg(**aggs).collect():
+            result.append({"window_start": start, "window_end": start + size, **res})
+    return result
+
+
+@pytest.mark.parametrize("size, slide", [(10, None), (60, 60), (60, 20), (100, 1)])
+@pytest.mark.parametrize(
+    "aggs",
+    [
+        {"n": ("v", "count"), "s": ("v", "sum")},
+        {"m": ("v", "mean"), "lo": ("v", "min"), "hi": ("v", "max")},
+        {"f": ("v", "first"), "la": ("v", "last"), "med": ("v", "median")},
+        {"u": ("g", "n_unique"), "c": ("v", lambda x: round(sum(x), 3))},
+    ],
+)
+def test_matches_naive(size, slide, aggs):
+    """Sorted streams should give the same summaries as materialised windows."""
+    result = list(window_agg(events, "t", size=size, slide=slide, by="g", **aggs))
+    expected = naive(events, size, slide or size, **aggs)
+    key = lambda d: (d["window_start"], d["g"])  # noqa: E731
+    result, expected = sorted(result, key=key), sorted(expected, key=key)
+    assert [key(d) for d in result] == [key(d) for d in expected]
+    for got, want in zip(result, expected):
+        assert got == pytest.approx(want)
+
+
+def test_late_rows_within_lateness():
+    """Rows that are out of order but within the lateness are counted."""
+    rng = random.Random(1)
+    shuffled = [dict(d, t=d["t"] + rng.randint(-20, 0)) for d in events]
+    result = window_agg(shuffled, "t", size=60, lateness=20, n=("v", "count"))
+    assert sum(d["n"] for d in result) == len(events)
+
+
+def test_late_rows_are_dropped():
+    """Rows for windows that are already finished are dropped."""
+    rows = [{"t": 0}, {"t": 130}, {"t": 10}, {"t": 50}, {"t": 140}]
+    result = list(window_agg(rows, "t", size=60, lateness=30, n=("t", "count")))
+    assert result == [
+        {"window_start": 0, "window_end": 60, "n": 1},
+        {"window_start": 120, "window_end": 180, "n": 2},
+    ]
+
+
+def test_window_without_values():
+    """Windows with rows but without the column get `None` as a mean."""
+    rows = [{"t": 0}, {"t": 10, "v": 2}, {"t": 70}]
+    result = list(window_agg(rows, "t", size=60, m=("v", "mean"), n=("t", "count")))
+    assert result == [
+        {"window_start": 0, "window_end": 60, "m": 2, "n": 2},
+        {"window_start": 60, "window_end": 120, "m": None, "n": 1},
+    ]
+
+
+def test_windows_are_emitted_incrementally():
+    """Finished windows are yielded before the stream ends."""
+
+    def rows():
+        yield {"t": 0}
+        yield {"t": 65}
+        raise RuntimeError("the stream should not be read this far")
+
+    stream = window_agg(rows(), "t", size=60, n=("t", "count"))
+    assert next(stream) == {"window_start": 0, "window_end": 60, "n": 1}
+
+
+def test_datetimes():
+    """Datetimes and ISO strings give datetime windows."""
+    start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    rows = [{"t": start + timedelta(seconds=s)} for s in [0, 30, 61, 150]]
+    iso_rows = [{"t": d["t"].isoformat()} for d in rows]
+    for stream in [rows, iso_rows]:
+        result = list(
+            window_agg(stream, "t", size=timedelta(minutes=1), n=("t", "count"))
+        )
+        assert [d["window_start"] for d in result] == [
+            start,
+            start + timedelta(minutes=1),
+            start + timedelta(minutes=2),
+        ]
+        assert [d["n"] for d in result] == [2, 1, 1]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"size": 0}, {"size": 10, "slide": 20}, {"size": 10, "lateness": -1}],
+)
+def test_bad_arguments(kwargs):
+    """Invalid window settings should raise an error."""
+    with pytest.raises(ValueError):
+        list(window_agg(events, "t", n=("v", "count"), **kwargs))
+
+
+def test_unknown_summary():
+    """Unknown summary names should raise an error."""
+    with pytest.raises(ValueError):
+        list(window_agg(events, "t", size=10, n=("v", "foobar")))
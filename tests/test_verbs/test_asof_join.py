@@ -0,0 +1,120 @@
+import datetime as dt
+import random
+
+import pytest
+
+from clumper import Clumper
+
+
+def naive_asof(left, right, direction, tolerance, by=()):
+    """Finds the as-of match for every left item by checking all right items."""
+    result = []
+    for d_i in left:
+        candidates = [d_j for d_j in right if all(d_i.get(k) == d_j.get(k) for k in by)]
+        v = d_i["ts"]
+        before = [d for d in candidates if d["ts"] <= v]
+        after = [d for d in candidates if d["ts"] >= v]
+        b = max(before, key=lambda d: d["ts"]) if before else None
+        # `max` returns the first maximum, the last one in order should win.
+        if b is not None:
+            b = [d for d in before if d["ts"] == b["ts"]][-1]
+        a = min(after, key=lambda d: d["ts"]) if after else None
+        if direction == "backward":
+            match = b
+        elif direction == "forward":
+            match = a
+        elif b is None or (a is not None and a["ts"] - v < v - b["ts"]):
+            match = a
+        else:
+            match = b
+        if match is not None and tolerance is not None:
+            if abs(match["ts"] - v) > tolerance:
+                match = None
+        result.append(match)
+    return result
+
+
+def make_data(seed):
+    """Creates a left and right collection with duplicate timestamps and groups."""
+    rng = random.Random(seed)
+    left = [
+        {"ts": rng.randint(0, 50), "g": rng.choice("ab"), "i": i} for i in range(40)
+    ]
+    right = [
+        {"ts": rng.randint(0, 50), "g": rng.choice("abc"), "x": i} for i in range(25)
+    ]
+    return left, right
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("direction", ["backward", "forward", "nearest"])
+@pytest.mark.parametrize("tolerance", [None, 0, 3])
+@pytest.mark.parametrize("by", [None, "g"])
+def test_asof_matches_naive(seed, direction, tolerance, by):
+    """The merge sweep finds the same matches as checking every pair."""
+    left, right = make_data(seed)
+    result = Clumper(left).asof_join(
+        Clumper(right), on="ts", by=by, direction=direction, tolerance=tolerance
+    )
+    expected = naive_asof(left, right, direction, tolerance, by=(by,) if by else ())
+    assert len(result) == len(left)
+    for d, d_i, match in zip(result, left, expected):
+        assert d["i"] == d_i["i"]
+        assert d["ts"] == d_i["ts"]
+        assert d.get("x") == (None if match is None else match["x"])
+
+
+def test_asof_keeps_left_order_and_unmatched():
+    """Every left item appears once, in order, and unmatched items are unchanged."""
+    left = [{"ts": 5}, {"ts": 0}, {"ts": 3}]
+    right = [{"ts": 1, "v": "a"}, {"ts": 4, "v": "b"}]
+    result = Clumper(left).asof_join(Clumper(right), on="ts").collect()
+    assert result == [{"ts": 5, "v": "b"}, {"ts": 0}, {"ts": 3, "v": "a"}]
+
+
+def test_asof_different_key_names():
+    """With a mapping for `on` the right key is kept."""
+    left = Clumper([{"t": 3}])
+    right = Clumper([{"time": 2, "v": 1}])
+    result = left.asof_join(right, on={"t": "time"}).collect()
+    assert result == [{"t": 3, "time": 2, "v": 1}]
+
+
+def test_asof_by_mapping():
+    """The `by` keys can have different names on both sides."""
+    left = Clumper([{"ts": 3, "user": "a"}, {"ts": 3, "user": "b"}])
+    right = Clumper([{"ts": 1, "name": "a", "v": 1}, {"ts": 2, "name": "b", "v": 2}])
+    result = left.asof_join(right, on="ts", by={"user": "name"}).collect()
+    assert [d["v"] for d in result] == [1, 2]
+
+
+def test_asof_missing_values():
+    """Items without the `on` key, or with `None`, are not matched."""
+    left = Clumper([{"ts": None}, {"other": 1}, {"ts": 2}])
+    right = Clumper([{"ts": 1, "v": 1}, {"v": 2}, {"ts": None, "v": 3}])
+    result = left.asof_join(right, on="ts").collect()
+    assert result == [{"ts": None}, {"other": 1}, {"ts": 2, "v": 1}]
+
+
+def test_asof_datetimes():
+    """Datetimes work with a timedelta as tolerance."""
+    t0 = dt.datetime(2020, 1, 1)
+    left = Clumper([{"ts": t0 + dt.timedelta(minutes=m)} for m in (5, 20)])
+    right = Clumper([{"ts": t0, "v": 1}, {"ts": t0 + dt.timedelta(minutes=10), "v": 2}])
+    result = left.asof_join(right, on="ts", tolerance=dt.timedelta(minutes=7))
+    assert [d.get("v") for d in result] == [1, None]
+
+
+def test_asof_suffix():
+    """Overlapping keys get a suffix."""
+    left = Clumper([{"ts": 2, "v": "l"}])
+    right = Clumper([{"ts": 1, "v": "r"}])
+    result = left.asof_join(right, on="ts").collect()
+    assert result == [{"ts": 2, "v": "l", "v_joined": "r"}]
+
+
+@pytest.mark.parametrize("kwargs", [{"direction": "sideways"}, {"tolerance": -1}])
+def test_asof_bad_arguments(kwargs):
+    """Invalid arguments raise an error."""
+    with pytest.raises(ValueError):
+        Clumper([{"ts": 1}]).asof_join(Clumper([{"ts": 1}]), on="ts", **kwargs)
@@ -0,0 +1,68 @@
+import statistics
+
+import pytest
+
+from clumper import Clumper
+from clumper.parallel import config_context
+
+data = [{"a": (i * 7) % 13, "b": i % 3, "grp": i % 2} for i in range(200)]
+
+
+def test_matches_sample_statistics():
+    """The estimate is the summary of the data and replicates vary around it."""
+    result = (
+        Clumper(data)
+        .bootstrap(n_replicates=500, random_state=1, m=("a", "mean"), s=("a", "std"))
+        .collect()[0]
+    )
+    values = [d["a"] for d in data]
+    assert result["m"] == statistics.mean(values)
+    assert result["m_lower"] < result["m"] < result["m_upper"]
+    assert len(result["m_replicates"]) == 500
+    # The spread of the replicated means approximates the standard error.
+    se = statistics.stdev(values) / len(values) ** 0.5
+    assert statistics.stdev(result["m_replicates"]) == pytest.approx(se, rel=0.15)
+
+
+def test_random_state():
+    """The same seed gives the same replicates."""
+    first = Clumper(data).bootstrap(n_replicates=50, random_state=0, m=("a", "mean"))
+    second = Clumper(data).bootstrap(n_replicates=50, random_state=0, m=("a", "mean"))
+    assert first.collect() == second.collect()
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_parallel_gives_same_result(backend):
+    """Spreading replicates over workers does not change the result."""
+    clump = Clumper(data)
+    expected = clump.bootstrap(n_replicates=40, random_state=3, m=("a", "median"))
+    with config_context(n_jobs=2, backend=backend, min_size=10):
+        result = clump.bootstrap(n_replicates=40, random_state=3, m=("a", "median"))
+    assert result.collect() == expected.collect()
+
+
+def test_grouped():
+    """Every group is bootstrapped separately and keeps its group key."""
+    result = (
+        Clumper(data)
+        .group_by("grp")
+        .bootstrap(n_replicates=20, random_state=1, n=("a", "count"))
+    )
+    assert [d["grp"] for d in result] == [0, 1]
+    assert all(d["n_replicates"] == [100] * 20 for d in result)
+
+
+def test_missing_values():
+    """Rows without the key are ignored, just like in `agg`."""
+    clump = Clumper([{"a": i % 2 * 2 + 1} for i in range(20)] + [{"b": 10}])
+    result = clump.bootstrap(n_replicates=50, random_state=1, n=("a", "max"))
+    row = result.collect()[0]
+    assert row["n"] == 3
+    assert set(row["n_replicates"]) <= {1, 3}
+
+
+@pytest.mark.parametrize("kwargs", [{"n_replicates": 0}, {"ci": 1.5}, {"ci": 0}])
+def test_bad_arguments(kwargs):
+    """Invalid settings raise an error."""
+    with pytest.raises(ValueError):
+        Clumper(data).bootstrap(m=("a", "mean"), **kwargs)
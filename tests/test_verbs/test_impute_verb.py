@@ -0,0 +1,54 @@
+import pytest
+
+from clumper import Clumper
+from clumper.sequence import impute
+
+data = [
+    {"g": "a", "x": 1, "y": 0},
+    {"g": "b"},
+    {"g": "a", "y": 5},
+    {"g": "b", "x": 4},
+    {"g": "a"},
+    {"g": "b", "x": 10, "y": 2},
+]
+
+
+@pytest.mark.parametrize("strategy", ["prev", "next", "nearest", "linear", "value"])
+def test_verb_matches_sequence_function(strategy):
+    """The verb should give the same result as `mutate` with the sequence function."""
+    expected = (
+        Clumper(data)
+        .mutate(
+            x=impute("x", strategy=strategy, fallback=0),
+            y=impute("y", strategy=strategy, fallback=0),
+        )
+        .collect()
+    )
+    result = Clumper(data).impute("x", "y", strategy=strategy, fallback=0).collect()
+    assert result == expected
+
+
+@pytest.mark.parametrize("strategy", ["prev", "next", "nearest", "linear", "value"])
+def test_verb_with_groups(strategy):
+    """With a group active, each group is imputed separately."""
+    expected = (
+        Clumper(data)
+        .group_by("g")
+        .mutate(x=impute("x", strategy=strategy, fallback=0))
+        .collect()
+    )
+    result = Clumper(data).group_by("g").impute("x", strategy=strategy, fallback=0)
+    assert result.collect() == expected
+
+
+def test_original_data_untouched():
+    """Imputing should not change the original items."""
+    c = Clumper(data)
+    c.impute("x", strategy="next")
+    assert "x" not in c.collect()[1]
+
+
+def test_bad_strategy():
+    """Unknown strategies raise an error."""
+    with pytest.raises(ValueError):
+        Clumper(data).impute("x", strategy="mean")
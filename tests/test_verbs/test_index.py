@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from clumper import Clumper
+
+rng = random.Random(42)
+data = [
+    {"i": i, "user": rng.randint(0, 30), "day": rng.choice("mtw")} for i in range(300)
+] + [{"i": -1}]
+
+
+@pytest.mark.parametrize("keys", [("user",), ("user", "day"), ("day", "user")])
+def test_get_matches_scan(keys):
+    """Lookups in the index give the same items as a scan."""
+    clump = Clumper(data).index_on(*keys)
+    for user in range(32):
+        values = {"user": user, "day": "t"}
+        lookup = [values[k] for k in keys]
+        expected = [d for d in data if all(d.get(k) == values[k] for k in keys)]
+        assert clump.get(*lookup, on=keys).collect() == expected
+        assert (
+            clump.where(**values).collect() == Clumper(data).where(**values).collect()
+        )
+
+
+def test_get_needs_a_single_index():
+    """Without `on`, `get` needs exactly one index."""
+    with pytest.raises(ValueError):
+        Clumper(data).get(1)
+    clump = Clumper(data).index_on("user").index_on("day")
+    with pytest.raises(ValueError):
+        clump.get(1)
+    assert len(clump.get("m", on="day")) == len(
+        [d for d in data if d.get("day") == "m"]
+    )
+    with pytest.raises(ValueError):
+        clump.get(1, "m", on="user")
+    with pytest.raises(ValueError):
+        clump.get(1, on="i")
+
+
+def test_derived_collections_have_no_index():
+    """Verbs create new collections that don't carry a possibly outdated index."""
+    clump = Clumper(data).index_on("user")
+    assert clump.mutate(user=lambda d: 0)._indexes == {}
+    assert clump.keep(lambda d: True)._indexes == {}
+    assert Clumper(data)._indexes == {}
+
+
+def test_group_by_keeps_a_valid_index():
+    """Copies of a collection keep an index that points to their own items."""
+    clump = Clumper(data).index_on("user")
+    grouped = clump.group_by("day")
+    assert grouped.get(3).collect() == clump.get(3).collect()
+    assert all(any(d is e for e in grouped.blob) for d in grouped.get(3))
+
+
+@pytest.mark.parametrize("how", ["left_join", "inner_join"])
+def test_join_uses_index(how):
+    """Joining against an indexed collection gives the same result as a naive join."""
+    users = Clumper([{"user": u, "name": f"user-{u}"} for u in range(0, 40, 2)])
+    left = Clumper(data)
+    expected = getattr(left, how)(users, mapping={"user": "user"})
+    indexed = users.index_on("user")
+    for _ in range(2):
+        result = getattr(left, how)(indexed, mapping={"user": "user"})
+        assert result.collect() == expected.collect()
+
+
+def test_index_needs_keys():
+    """An index needs at least one key."""
+    with pytest.raises(ValueError):
+        Clumper(data).index_on()
@@ -0,0 +1,140 @@
+import random
+
+import pytest
+
+from clumper import Clumper
+
+
+def naive_matches(left, right, mapping):
+    """Returns the matching right items for every left item by comparing all pairs."""
+    result = []
+    for d_i in left:
+        matches = []
+        for d_j in right:
+            if all(k in d_i for k in mapping.keys()) and all(
+                v in d_j for v in mapping.values()
+            ):
+                if all(d_i[k] == d_j[v] for k, v in mapping.items()):
+                    matches.append(d_j)
+        result.append(matches)
+    return result
+
+
+@pytest.fixture()
+def left():
+    """Left collection with duplicates and a missing key."""
+    rng = random.Random(42)
+    return [{"k": rng.randint(0, 5), "l": i} for i in range(30)] + [{"l": -1}]
+
+
+@pytest.fixture()
+def right():
+    """Right collection with duplicates and a missing key."""
+    rng = random.Random(1)
+    return [{"key": rng.randint(2, 8), "r": i} for i in range(20)] + [{"r": -1}]
+
+
+def test_semi_join(left, right):
+    """semi_join keeps the left items that have at least one match."""
+    result = Clumper(left).semi_join(Clumper(right), mapping={"k": "key"})
+    matches = naive_matches(left, right, {"k": "key"})
+    assert result.collect() == [d for d, m in zip(left, matches) if m]
+
+
+def test_anti_join(left, right):
+    """anti_join keeps the left items without a match, including those missing a key."""
+    result = Clumper(left).anti_join(Clumper(right), mapping={"k": "key"})
+    matches = naive_matches(left, right, {"k": "key"})
+    assert result.collect() == [d for d, m in zip(left, matches) if not m]
+    assert {"l": -1} in result.collect()
+
+
+def test_semi_anti_partition(left, right):
+    """Together semi_join and anti_join contain every left item exactly once."""
+    c = Clumper(left)
+    semi = c.semi_join(Clumper(right), mapping={"k": "key"})
+    anti = c.anti_join(Clumper(right), mapping={"k": "key"})
+    assert len(semi) + len(anti) == len(c)
+
+
+def test_semi_join_no_copies(left, right):
+    """semi_join returns the original items, not merged copies."""
+    result = Clumper(left).semi_join(Clumper(right), mapping={"k": "key"})
+    ids = {id(d) for d in left}
+    assert all(id(d) in ids for d in result)
+
+
+def test_semi_join_uses_index(left, right):
+    """A prebuilt index on the right collection gives the same result."""
+    indexed = Clumper(right).index_on("key")
+    result = Clumper(left).semi_join(indexed, mapping={"k": "key"})
+    expected = Clumper(left).semi_join(Clumper(right), mapping={"k": "key"})
+    assert result.collect() == expected.collect()
+
+
+def test_outer_join(left, right):
+    """outer_join is a left_join followed by the unmatched right items."""
+    result = Clumper(left).outer_join(Clumper(right), mapping={"k": "key"})
+    joined = Clumper(left).left_join(Clumper(right), mapping={"k": "key"}).collect()
+    matched = {id(d) for m in naive_matches(left, right, {"k": "key"}) for d in m}
+    unmatched = [d for d in right if id(d) not in matched]
+    assert result.collect() == joined + unmatched
+    assert {"r": -1} in result.collect()
+
+
+def test_outer_join_sizes():
+    """Items without any overlap all appear in the outer join."""
+    left = Clumper([{"a": 1}, {"a": 2}])
+    right = Clumper([{"b": 3}, {"b": 4}, {"b": 5}])
+    assert len(left.outer_join(right, mapping={"a": "b"})) == 5
+
+
+@pytest.mark.parametrize("how", ["left_join", "inner_join"])
+def test_hash_join_matches_naive(left, right, how):
+    """The hash join gives the same rows, in the same order, as comparing all pairs."""
+    result = getattr(Clumper(left), how)(Clumper(right), mapping={"k": "key"})
+    expected = []
+    for d_i, matches in zip(left, naive_matches(left, right, {"k": "key"})):
+        for d_j in matches:
+            expected.append({**d_i, **d_j})
+        if not matches and how == "left_join":
+            expected.append(d_i)
+    assert result.collect() == expected
+
+
+def test_hash_join_multiple_keys():
+    """Joins on multiple keys only match when all the keys are equal."""
+    left = Clumper([{"a": 1, "b": 1}, {"a": 1, "b": 2}])
+    right = Clumper([{"x": 1, "y": 2, "z": "hit"}])
+    result = left.inner_join(right, mapping={"a": "x", "b": "y"})
+    assert result.collect() == [{"a": 1, "b": 2, "x": 1, "y": 2, "z": "hit"}]
+
+
+@pytest.mark.parametrize(
+    "how", ["left_join", "inner_join", "semi_join", "anti_join", "outer_join"]
+)
+def test_unhashable_keys(how):
+    """Keys that can't be hashed fall back to comparing all the pairs."""
+    left = Clumper([{"k": [1, 2], "l": 1}, {"k": [3], "l": 2}])
+    right = Clumper([{"k": [1, 2], "r": 1}, {"k": [4], "r": 2}])
+    result = getattr(left, how)(right, mapping={"k": "k"}).collect()
+    expected = {
+        "left_join": [{"k": [1, 2], "l": 1, "r": 1}, {"k": [3], "l": 2}],
+        "inner_join": [{"k": [1, 2], "l": 1, "r": 1}],
+        "semi_join": [{"k": [1, 2], "l": 1}],
+        "anti_join": [{"k": [3], "l": 2}],
+        "outer_join": [
+            {"k": [1, 2], "l": 1, "r": 1},
+            {"k": [3], "l": 2},
+            {"k": [4], "r": 2},
+        ],
+    }
+    assert result == expected[how]
+
+
+def test_semi_join_keeps_sortedness():
+    """semi_join and anti_join keep the order, so sortedness is kept."""
+    c = Clumper([{"a": i} for i in range(10)]).sort(by="a")
+    other = Clumper([{"a": 2}, {"a": 5}])
+    assert c.semi_join(other, mapping={"a": "a"}).sorted_by == c.sorted_by
+    assert c.anti_join(other, mapping={"a": "a"}).sorted_by == c.sorted_by
@@ -1,3 +1,6 @@
+import collections
+import random
+
 from clumper.clump import Clumper
 import pytest
 import itertools
@@ -88,3 +91,95 @@ def test_weighted_sampling(replace, weights):
         assert (
             has_duplicate(sampled.collect()) is False
         ), "Found duplicate elements in weighted sampling without replacement"
+
+
+@pytest.mark.parametrize("replace", [True, False])
+@pytest.mark.parametrize("weights", [None, "w"])
+def test_random_state(replace, weights):
+    """The same `random_state`, including zero, gives the same sample."""
+    clump = Clumper([{"a": i, "w": i % 4} for i in range(100)])
+    for seed in [0, 42]:
+        first = clump.sample(20, replace=replace, weights=weights, random_state=seed)
+        second = clump.sample(20, replace=replace, weights=weights, random_state=seed)
+        assert first.collect() == second.collect()
+
+
+def test_global_random_untouched():
+    """Sampling with a seed should not reseed the global random module."""
+    random.seed(1)
+    expected = [random.random() for _ in range(3)]
+    random.seed(1)
+    Clumper([{"a": i} for i in range(10)]).sample(3, replace=False, random_state=42)
+    assert [random.random() for _ in range(3)] == expected
+
+
+@pytest.mark.parametrize("replace", [True, False])
+def test_weighted_frequencies(replace):
+    """Items should be drawn about as often as their weights imply."""
+    clump = Clumper([{"a": i, "w": w} for i, w in enumerate([1, 2, 3, 4, None])])
+    counts = collections.Counter()
+    for seed in range(2000):
+        sampled = clump.sample(1, replace=replace, weights="w", random_state=seed)
+        counts.update(d["a"] for d in sampled)
+    assert counts[4] == 0
+    for i, w in enumerate([1, 2, 3, 4]):
+        assert counts[i] / 2000 == pytest.approx(w / 10, abs=0.03)
+
+
+def test_weighted_order_without_replacement():
+    """Items with a much larger weight are drawn first."""
+    clump = Clumper([{"a": i, "w": 1000**i} for i in range(5)])
+    sampled = clump.sample(5, replace=False, weights="w", random_state=42)
+    assert [d["a"] for d in sampled] == [4, 3, 2, 1, 0]
+
+
+def test_zero_weights_without_replacement():
+    """Items without weight cannot be sampled without replacement."""
+    clump = Clumper([{"w": 1}, {"w": 0}, {"w": None}])
+    assert clump.sample(1, replace=False, weights="w").collect() == [{"w": 1}]
+    with pytest.raises(ValueError):
+        clump.sample(2, replace=False, weights="w")
+
+
+labelled = Clumper(
+    [{"a": i, "label": "rare" if i % 10 == 0 else "common"} for i in range(1000)]
+)
+
+
+@pytest.mark.parametrize("frac", [0.01, 0.1, 0.25, 0.333, 1.0])
+def test_grouped_sample_frac_is_proportional(frac):
+    """Every group is sampled in proportion to its size."""
+    sampled = labelled.group_by("label").sample_frac(frac, random_state=1)
+    assert len(sampled) == int(frac * len(labelled))
+    n_rare = len(sampled.keep(lambda d: d["label"] == "rare"))
+    assert abs(n_rare - frac * 100) <= 1
+    assert sampled.groups == ("label",)
+    assert has_duplicate(sampled.collect()) is False
+
+
+@pytest.mark.parametrize("replace", [True, False])
+def test_grouped_sample_fixed_n(replace):
+    """Every group gets `n` items when sampling a fixed number."""
+    sampled = labelled.group_by("label").sample(50, replace=replace, random_state=1)
+    counts = collections.Counter(d["label"] for d in sampled)
+    assert counts == {"rare": 50, "common": 50}
+
+
+def test_grouped_sample_weights():
+    """Weights are applied within every group."""
+    clump = labelled.mutate(w=lambda d: int(d["a"] % 4 != 2))
+    sampled = clump.group_by("label").sample_frac(0.2, weights="w", random_state=1)
+    assert all(d["w"] == 1 for d in sampled)
+
+
+def test_grouped_sample_too_large():
+    """Sampling more than a group has without replacement raises an error."""
+    with pytest.raises(ValueError):
+        labelled.group_by("label").sample(101)
+
+
+def test_grouped_sample_random_state():
+    """A grouped sample is reproducible with a `random_state`."""
+    first = labelled.group_by("label").sample_frac(0.1, random_state=0)
+    second = labelled.group_by("label").sample_frac(0.1, random_state=0)
+    assert first.collect() == second.collect()
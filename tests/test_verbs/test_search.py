@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from clumper import Clumper
+
+rng = random.Random(42)
+words = ["timeout", "Timeout", "disk", "full", "user", "login", "failed", "ok", "42"]
+logs = [
+    {"i": i, "message": " ".join(rng.choices(words, k=rng.randint(1, 6)))}
+    for i in range(400)
+] + [{"i": -1}, {"i": -2, "message": None}]
+
+
+@pytest.mark.parametrize("query", ["timeout", "disk full", "FAILED login", "nope", ""])
+def test_token_search_matches_scan(query):
+    """Searching with an index gives the same items as without one."""
+    expected = Clumper(logs).search("message", query)
+    result = Clumper(logs).index_text("message").search("message", query)
+    assert result.collect() == expected.collect()
+    tokens = set(query.lower().split())
+    for d in result:
+        assert tokens <= set(d["message"].lower().split())
+
+
+@pytest.mark.parametrize("ngram", [1, 2, 3, 5])
+@pytest.mark.parametrize("query", ["Time", "imeo", "k fu", "t", "out Time", "xyz"])
+def test_substring_search_matches_in(ngram, query):
+    """Substring searches match `query in text`, with and without an index."""
+    expected = [
+        d for d in logs if isinstance(d.get("message"), str) and query in d["message"]
+    ]
+    clump = Clumper(logs)
+    assert clump.search("message", query, substring=True).collect() == expected
+    indexed = clump.index_text("message", ngram=ngram)
+    assert indexed.search("message", query, substring=True).collect() == expected
+
+
+def test_roundtrip(tmp_path):
+    """A stored index can be loaded for the same data."""
+    path = tmp_path / "logs.index.json"
+    Clumper(logs).index_text("message").write_text_index(path)
+    reloaded = Clumper(logs).read_text_index(path)
+    assert reloaded._text_indexes == Clumper(logs).index_text("message")._text_indexes
+    assert reloaded.search("message", "disk").collect() == (
+        Clumper(logs).search("message", "disk").collect()
+    )
+
+
+def test_stale_index(tmp_path):
+    """Loading an index for data that changed raises an error."""
+    path = tmp_path / "logs.index.json"
+    Clumper(logs).index_text("message").write_text_index(path)
+    with pytest.raises(ValueError):
+        Clumper(logs[1:]).read_text_index(path)
+
+
+def test_indexes_are_kept_together():
+    """Building a hash index keeps the text index and the other way around."""
+    clump = Clumper(logs).index_text("message").index_on("i").index_text("i")
+    assert set(clump._text_indexes) == {"message", "i"}
+    assert ("i",) in clump._indexes
+    assert clump.keep(lambda d: True)._text_indexes == {}
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"ngram": 0}])
+def test_bad_arguments(kwargs):
+    """An index needs keys and a positive n-gram length."""
+    keys = () if not kwargs else ("message",)
+    with pytest.raises(ValueError):
+        Clumper(logs).index_text(*keys, **kwargs)
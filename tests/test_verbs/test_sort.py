@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from clumper import Clumper
+
+rng = random.Random(42)
+data = [
+    {"i": i, "a": rng.randint(0, 5), "b": rng.choice("xyz"), "g": i % 3}
+    for i in range(200)
+]
+with_missing = [
+    {k: v for k, v in d.items() if not (k == "a" and d["i"] % 7 == 0)} for d in data
+]
+
+
+@pytest.mark.parametrize("ascending", [True, False, [True, False], [False, True]])
+def test_sort_by_matches_key_function(ascending):
+    """Sorting by keys gives the same result as a stable sort with key functions."""
+    asc = [ascending] * 2 if isinstance(ascending, bool) else ascending
+    expected = sorted(data, key=lambda d: d["b"], reverse=not asc[1])
+    expected = sorted(expected, key=lambda d: d["a"], reverse=not asc[0])
+    result = Clumper(data).sort(by=["a", "b"], ascending=ascending)
+    assert result.collect() == expected
+
+
+@pytest.mark.parametrize("na_position", ["first", "last"])
+def test_sort_missing_values(na_position):
+    """Missing values and `None` are put first or last."""
+    rows = with_missing + [{"i": -1, "a": None}]
+    result = Clumper(rows).sort(by="a", na_position=na_position).collect()
+    missing = [d for d in result if d.get("a") is None]
+    assert len(missing) == 30
+    if na_position == "first":
+        assert result[:30] == missing
+    else:
+        assert result[-30:] == missing
+    present = [d["a"] for d in result if d.get("a") is not None]
+    assert present == sorted(present)
+
+
+def test_grouped_sort_is_global():
+    """A grouped sort keeps the groups together and sorts within every group."""
+    clump = Clumper(data).group_by("g")
+    result = clump.sort(by="a", ascending=False)
+    expected = [
+        d
+        for _, subset in clump._partition()
+        for d in sorted(subset, key=lambda d: d["a"], reverse=True)
+    ]
+    assert result.collect() == expected
+    assert result.groups == ("g",)
+    assert clump.sort(lambda d: -d["a"]).collect() == expected
+
+
+def test_key_and_by():
+    """Either a key function or keys to sort by must be given."""
+    with pytest.raises(ValueError):
+        Clumper(data).sort()
+    with pytest.raises(ValueError):
+        Clumper(data).sort(lambda d: d["a"], by="a")
+
+
+@pytest.mark.parametrize("kwargs", [{"ascending": [True]}, {"na_position": "middle"}])
+def test_bad_arguments(kwargs):
+    """Invalid settings raise an error."""
+    with pytest.raises(ValueError):
+        Clumper(data).sort(by=["a", "b"], **kwargs)
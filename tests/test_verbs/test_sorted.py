@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from clumper import Clumper
+
+rng = random.Random(42)
+data = [{"i": i, "ts": rng.randint(0, 100), "u": i % 4} for i in range(300)]
+
+
+def unsorted(clump):
+    """Returns the same collection without sortedness, to compare to the slow path."""
+    return Clumper(clump.collect(), groups=clump.groups)
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+@pytest.mark.parametrize("inclusive", ["both", "left", "right", "neither"])
+@pytest.mark.parametrize(
+    "lower, upper", [(10, 20), (None, 50), (50, None), (-5, 200), (30, 30), (40, 20)]
+)
+def test_between_matches_scan(ascending, inclusive, lower, upper):
+    """The binary search gives the same items as checking every item."""
+    clump = Clumper(data).sort(by="ts", ascending=ascending)
+    assert clump.sorted_by == ("ts", ascending)
+    result = clump.between("ts", lower, upper, inclusive=inclusive)
+    expected = unsorted(clump).between("ts", lower, upper, inclusive=inclusive)
+    assert result.collect() == expected.collect()
+    assert result.sorted_by == ("ts", ascending)
+
+
+def test_where_matches_scan():
+    """Equality filters on the sorted key give the same items as checking every item."""
+    clump = Clumper(data).sort(by="ts")
+    for ts in range(0, 101, 7):
+        result = clump.where(ts=ts, u=1)
+        assert result.collect() == [d for d in clump if d["ts"] == ts and d["u"] == 1]
+
+
+@pytest.mark.parametrize(
+    "verb, keeps",
+    [
+        (lambda c: c.keep(lambda d: d["u"] == 1), True),
+        (lambda c: c.head(10), True),
+        (lambda c: c.tail(10), True),
+        (lambda c: c.select("ts"), True),
+        (lambda c: c.select("i"), False),
+        (lambda c: c.drop("u"), True),
+        (lambda c: c.drop("ts"), False),
+        (lambda c: c.mutate(v=lambda d: d["ts"] * 2), True),
+        (lambda c: c.mutate(ts=lambda d: -d["ts"]), False),
+        (lambda c: c.copy(), True),
+        (lambda c: c.group_by("u"), True),
+        (lambda c: c.sample(10), False),
+        (lambda c: c.map(lambda d: d), False),
+    ],
+)
+def test_sortedness_is_passed_along(verb, keeps):
+    """Verbs that keep the order and the sorted key keep the sortedness."""
+    clump = Clumper(data).sort(by="ts")
+    assert (verb(clump).sorted_by == ("ts", True)) is keeps
+
+
+def test_rename_keeps_sortedness():
+    """Renaming the sorted key moves the sortedness to the new name."""
+    clump = Clumper(data).sort(by="ts", ascending=False).rename(time="ts")
+    assert clump.sorted_by == ("time", False)
+
+
+def test_not_marked_as_sorted():
+    """Missing values, groups or key functions don't mark a collection as sorted."""
+    assert Clumper(data + [{"i": -1}]).sort(by="ts").sorted_by is None
+    assert Clumper(data).group_by("u").sort(by="ts").sorted_by is None
+    assert Clumper(data).sort(lambda d: d["ts"]).sorted_by is None
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+@pytest.mark.parametrize("how", ["left_join", "inner_join"])
+def test_merge_join_matches_naive_join(ascending, how):
+    """Joining two sorted collections gives the same result as the naive join."""
+    rng = random.Random(1)
+    left = Clumper(data).sort(by="ts", ascending=ascending)
+    right = Clumper([{"t": rng.randint(0, 120), "j": j} for j in range(100)]).sort(
+        by="t", ascending=ascending
+    )
+    result = getattr(left, how)(right, mapping={"ts": "t"})
+    expected = getattr(unsorted(left), how)(unsorted(right), mapping={"ts": "t"})
+    assert result.collect() == expected.collect()
+
+
+def test_bad_inclusive():
+    """Unknown settings for `inclusive` raise an error."""
+    with pytest.raises(ValueError):
+        Clumper(data).between("ts", 1, 2, inclusive="all")
+
+
+def test_where_other_type_matches_scan():
+    """A lookup value of another type gives the same result as on an unsorted collection."""
+    clump = Clumper(data)
+    assert clump.sort(by="ts").where(ts="x").collect() == []
+    assert clump.where(ts="x").collect() == []
+    with pytest.raises(TypeError):
+        clump.between("ts", "x")
+    with pytest.raises(TypeError):
+        clump.sort(by="ts").between("ts", "x")
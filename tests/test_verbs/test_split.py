@@ -0,0 +1,77 @@
+import pytest
+
+from clumper import Clumper
+from clumper.stream import assign_fold, assign_split
+
+clump = Clumper([{"user": i % 300, "i": i} for i in range(3000)])
+
+
+@pytest.mark.parametrize("frac", [0.0, 0.2, 0.5, 0.8, 1.0])
+def test_split_sizes(frac):
+    """The split keeps every item once and is roughly of the requested size."""
+    train, test = clump.split(frac=frac, key="user")
+    assert len(train) + len(test) == len(clump)
+    assert len(train) / len(clump) == pytest.approx(frac, abs=0.06)
+
+
+def test_split_keeps_keys_together():
+    """Items with the same key always end up on the same side."""
+    train, test = clump.split(frac=0.7, key="user")
+    assert not set(train.unique("user")) & set(test.unique("user"))
+
+
+def test_split_is_stable():
+    """Adding data does not move existing items to the other side."""
+    train, _ = clump.split(frac=0.7, key="user")
+    more = clump.concat(Clumper([{"user": 1000 + i, "i": -1} for i in range(100)]))
+    more_train, _ = more.split(frac=0.7, key="user")
+    assert more_train.keep(lambda d: d["user"] < 1000).collect() == train.collect()
+
+
+def test_split_salt():
+    """A different salt gives a different split."""
+    first, _ = clump.split(frac=0.5, key="user")
+    second, _ = clump.split(frac=0.5, key="user", salt="other")
+    assert first.collect() != second.collect()
+
+
+def test_split_known_value():
+    """The hash does not depend on the process or machine, so the assignment is fixed."""
+    users = [{"user": i} for i in range(8)]
+    result = [d["split"] for d in assign_split(users, frac=0.5, key="user")]
+    assert result == ["test", "test", "train", "test", "train", "test", "train", "test"]
+    train, _ = Clumper(users).split(0.5, key="user")
+    assert [d["user"] for d in train] == [2, 4, 6]
+
+
+@pytest.mark.parametrize("key", [None, "user", ["user", "i"], lambda d: d["i"] % 7])
+def test_kfold(key):
+    """Every item is in exactly one test fold."""
+    folds = clump.kfold(k=4, key=key)
+    assert len(folds) == 4
+    tests = [d["i"] for _, test in folds for d in test]
+    assert sorted(tests) == list(range(len(clump)))
+    for train, test in folds:
+        assert len(train) + len(test) == len(clump)
+
+
+def test_kfold_matches_assign_fold():
+    """The verb and the streaming function assign the same folds."""
+    folds = clump.kfold(k=3, key="user")
+    assigned = list(assign_fold(clump, k=3, key="user"))
+    for i, (_, test) in enumerate(folds):
+        assert [d["i"] for d in test] == [d["i"] for d in assigned if d["fold"] == i]
+
+
+@pytest.mark.parametrize("k", [0, 1, 2.5])
+def test_kfold_bad_k(k):
+    """At least two folds are needed."""
+    with pytest.raises(ValueError):
+        clump.kfold(k=k)
+
+
+@pytest.mark.parametrize("frac", [-0.1, 1.1])
+def test_split_bad_frac(frac):
+    """The fraction must be between 0 and 1."""
+    with pytest.raises(ValueError):
+        clump.split(frac=frac)
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from clumper import Clumper
+from clumper.stream import bottom_k, top_k
+
+rng = random.Random(42)
+data = [
+    {"i": i, "score": rng.randint(0, 20), "grp": rng.choice("abc")} for i in range(300)
+]
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 100, 500])
+def test_top_k_matches_sort(n):
+    """Selecting the top items gives the same result as a stable sort."""
+    expected = sorted(data, key=lambda d: d["score"], reverse=True)[:n]
+    assert Clumper(data).top_k(n, "score").collect() == expected
+    assert top_k(iter(data), n, "score") == expected
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 100, 500])
+def test_bottom_k_matches_sort(n):
+    """Selecting the bottom items gives the same result as a stable sort."""
+    expected = sorted(data, key=lambda d: d["score"])[:n]
+    assert Clumper(data).bottom_k(n, lambda d: d["score"]).collect() == expected
+    assert bottom_k(iter(data), n, "score") == expected
+
+
+@pytest.mark.parametrize("n", [1, 3, 200])
+def test_grouped_matches_sort(n):
+    """Under a group every group keeps its own top items."""
+    result = Clumper(data).group_by("grp").top_k(n, "score")
+    expected = []
+    for grp in Clumper(data).unique("grp"):
+        subset = [d for d in data if d["grp"] == grp]
+        expected += sorted(subset, key=lambda d: d["score"], reverse=True)[:n]
+    assert result.collect() == expected
+    assert result.groups == ("grp",)
+
+
+def test_missing_keys_are_skipped():
+    """Items without the key are not selected."""
+    clump = Clumper([{"a": 1}, {"b": 5}, {"a": 2}])
+    assert clump.top_k(5, "a").collect() == [{"a": 2}, {"a": 1}]
+
+
+def test_bad_n():
+    """A negative number of items raises an error."""
+    with pytest.raises(ValueError):
+        Clumper(data).top_k(-1, "score")